@@ -0,0 +1,134 @@
+"""
+Content-hashed, precompressed copies of the public data files plus a
+manifest, so the service worker (public/sw.js) can cache them for good and
+only fetch what changed after a redeploy.
+
+    public/data/manifest.json           {"version": 1, "files": {name: entry, ...}}
+    public/data/<stem>.<hash>.<ext>     the file, named by its content
+    public/data/<stem>.<hash>.<ext>.gz  gzip -9
+    public/data/<stem>.<hash>.<ext>.br  brotli (only if the brotli package is installed)
+
+`name` is the file's path under public/ ("ibsen_networks.json",
+"plays/Brand_1866.json", ...); the hashed copies are flat, with "/" turned
+into "." (plays.Brand_1866.<hash>.json). An entry holds file, sha256, size
+and the gzip/br file names and sizes. A hashed file is written only when no
+file of that name exists yet, so an unchanged shard is neither recompressed
+nor re-uploaded, and files no longer in the manifest are removed.
+
+parse_tei.py --copy-to-public --hashed does this for the files that run
+copied. Run on its own, it publishes whatever matches PUBLIC_PATTERNS in
+public/:
+    python data/scripts/artifacts.py [public/]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Tuple
+
+from shards import dumps_compact
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+ROOT = Path(__file__).resolve().parents[2]
+PUBLIC_DIR = ROOT / "public"
+ARTIFACT_DIR = PUBLIC_DIR / "data"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+HASH_LEN = 12
+
+# what --copy-to-public puts in public/
+PUBLIC_PATTERNS = ("ibsen_networks.json", "ibsen_networks.bin", "plays/*.json", "turns/*.json", "layout/*.json")
+
+
+def hashed_name(name: str, digest: str) -> str:
+    """'plays/Brand_1866.json' -> 'plays.Brand_1866.<hash>.json' (flat, one directory)."""
+    stem, dot, ext = name.replace("/", ".").rpartition(".")
+    return f"{stem}.{digest[:HASH_LEN]}{dot}{ext}" if dot else f"{ext}.{digest[:HASH_LEN]}"
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def publish(files: Iterable[Tuple[str, Path]], out_dir: Path = ARTIFACT_DIR) -> Dict[str, Any]:
+    """
+    Write hashed + compressed copies of (name, path) pairs to out_dir and
+    the manifest last; returns the manifest.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    entries: Dict[str, Dict[str, Any]] = {}
+    keep = {MANIFEST_NAME}
+    for name, path in sorted(files):
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        file = hashed_name(name, digest)
+        entry: Dict[str, Any] = {"file": file, "sha256": digest, "size": len(data)}
+        variants = [("gzip", ".gz", lambda: gzip.compress(data, 9, mtime=0))]
+        if brotli is not None:
+            variants.append(("br", ".br", lambda: brotli.compress(data)))
+        if not (out_dir / file).exists():
+            _write_atomic(out_dir / file, data)
+        keep.add(file)
+        for encoding, suffix, compress in variants:
+            target = out_dir / (file + suffix)
+            if not target.exists():
+                _write_atomic(target, compress())
+            entry[encoding] = target.name
+            entry[f"{encoding}_size"] = target.stat().st_size
+            keep.add(target.name)
+        entries[name] = entry
+
+    manifest = {"version": MANIFEST_VERSION, "files": entries}
+    _write_atomic(out_dir / MANIFEST_NAME, dumps_compact(manifest).encode("utf-8"))
+    for stale in out_dir.iterdir():
+        if stale.is_file() and stale.name not in keep:
+            stale.unlink()
+    return manifest
+
+
+def unpublish(out_dir: Path = ARTIFACT_DIR) -> bool:
+    """
+    Remove the manifest (first, so the service worker stops answering from
+    it) and the hashed copies; returns whether there was anything to remove.
+    Used by builds without --hashed, whose new public files the old manifest
+    would otherwise hide.
+    """
+    if not out_dir.exists():
+        return False
+    (out_dir / MANIFEST_NAME).unlink(missing_ok=True)
+    for path in out_dir.iterdir():
+        if path.is_file():
+            path.unlink()
+    try:
+        out_dir.rmdir()
+    except OSError:  # not empty: something else lives there
+        pass
+    return True
+
+
+def public_files(public_dir: Path = PUBLIC_DIR) -> Iterable[Tuple[str, Path]]:
+    """(name under public/, path) for the data files --copy-to-public wrote."""
+    for pattern in PUBLIC_PATTERNS:
+        for path in sorted(public_dir.glob(pattern)):
+            yield path.relative_to(public_dir).as_posix(), path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("public_dir", nargs="?", type=Path, default=PUBLIC_DIR)
+    args = parser.parse_args()
+
+    manifest = publish(public_files(args.public_dir), args.public_dir / "data")
+    raw = sum(e["size"] for e in manifest["files"].values())
+    packed = sum(e["gzip_size"] for e in manifest["files"].values())
+    print(f"Wrote {len(manifest['files'])} files ({raw} bytes, {packed} gzip) + {args.public_dir / 'data' / MANIFEST_NAME}")
@@ -0,0 +1,183 @@
+"""
+Bechdel/dialog parameter sweeps in one pass over the speech table.
+
+compute_dialogs_for_play + summarize_bechdel answer one setting (min_len=4,
+MALE_PRONOUNS/FEMALE_PRONOUNS, FEMALE_CHARACTERS). This module evaluates a
+grid of settings at once:
+
+- min_len      minimum (KQ)^n run length
+- lexicons     named {"male": [...], "female": [...]} pronoun lists
+- genders      who counts as female: "export" (FEMALE_CHARACTERS, as in the
+               export), "per_play" (gender_of, per-play mapping first), or a
+               path to a gender JSON in the gendered_ibsen.json format
+
+Per-speech pronoun counts come from the token index (one postings walk per
+lexicon term), runs from scene_kernels.pair_runs once per scene and min_len,
+and every (lexicon, gender source) pair is then a few prefix-sum lookups
+per run. The result is a compact table: one row per play and setting with
+dialogs, female_dialogs, female_dialogs_no_male_pron and passes, the same
+fields summarize_bechdel gives.
+
+Run:
+    python data/scripts/bechdel_sweep.py
+    python data/scripts/bechdel_sweep.py --grid grid.json --out sweep.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from ibsen_networks_acts import (
+    FEMALE_PRONOUNS,
+    MALE_PRONOUNS,
+    _load_gender_file,
+    female_characters,
+    gender_of,
+)
+from scene_kernels import pair_runs
+from speech_table import NO_SPEAKER, SpeechTable
+from token_index import TokenIndex, build_token_index
+
+OUT_DIR = Path(__file__).resolve().parents[2] / "data" / "output"
+
+DEFAULT_GRID: Dict[str, Any] = {
+    "min_len": [3, 4, 5, 6],
+    "lexicons": {
+        "standard": {"male": sorted(MALE_PRONOUNS), "female": sorted(FEMALE_PRONOUNS)},
+        "med_possessiv": {
+            "male": sorted(MALE_PRONOUNS | {"hans"}),
+            "female": sorted(FEMALE_PRONOUNS | {"hendes", "hennes"}),
+        },
+    },
+    "genders": ["export", "per_play"],
+}
+
+RESULT_COLUMNS = ("dialogs", "female_dialogs", "female_dialogs_no_male_pron", "passes")
+
+
+def gender_source(spec: str) -> Callable[[str, str], bool]:
+    """is_female(name, play_id) for a gender source name or JSON path."""
+    if spec == "export":
+        female = female_characters()
+        return lambda name, play_id: bool(female.get(name, False))
+    if spec == "per_play":
+        return lambda name, play_id: gender_of(name, play_id) == "F"
+    flat, per_play = _load_gender_file(Path(spec))
+
+    def is_female(name: str, play_id: str) -> bool:
+        mapping = per_play.get(play_id, {})
+        if name in mapping:
+            return mapping[name]
+        return bool(flat.get(name, False))
+
+    return is_female
+
+
+def lexicon_prefix(table: SpeechTable, index: TokenIndex, terms: Sequence[str]) -> List[int]:
+    """Prefix sums over all rows of how often `terms` occur; speaker-less rows count 0."""
+    counts = [0] * len(table)
+    for term in terms:
+        rows, _ = index.occurrences(term)
+        for r in rows:
+            counts[r] += 1
+    norm = table["speaker_norm"]
+    for r in range(len(counts)):
+        if norm[r] == NO_SPEAKER:
+            counts[r] = 0
+    return list(accumulate(counts, initial=0))
+
+
+def sweep(table: SpeechTable, index: TokenIndex, grid: Dict[str, Any]) -> Dict[str, Any]:
+    """Evaluate every (min_len, lexicon, gender source) of `grid` for every play."""
+    min_lens: List[int] = list(grid["min_len"])
+    lexicons: Dict[str, Dict[str, List[str]]] = grid["lexicons"]
+    gender_specs: List[str] = list(grid["genders"])
+
+    # per lexicon: (male prefix, female prefix) over table rows
+    prefixes = {
+        name: (lexicon_prefix(table, index, lex["male"]), lexicon_prefix(table, index, lex["female"]))
+        for name, lex in lexicons.items()
+    }
+    sources = [gender_source(spec) for spec in gender_specs]
+    settings = [
+        (m, lex, g) for m in range(len(min_lens)) for lex in lexicons for g in range(len(gender_specs))
+    ]
+
+    s = table.strings
+    norm = table["speaker_norm"]
+    play_acts, act_scenes, scene_speeches = table["play_acts"], table["act_scenes"], table["scene_speeches"]
+    rows_out: List[List[Any]] = []
+
+    for p in range(table.n_plays):
+        play_id = s[table["play_title"][p]]
+        female: Dict[Tuple[int, int], bool] = {}
+        # [dialogs, female_dialogs, female_no_male, passes] per setting
+        acc = {key: [0, 0, 0, False] for key in settings}
+
+        first_scene, last_scene = act_scenes[play_acts[p]], act_scenes[play_acts[p + 1]]
+        for sc in range(first_scene, last_scene):
+            rows = [r for r in range(scene_speeches[sc], scene_speeches[sc + 1]) if norm[r] != NO_SPEAKER]
+            speakers = [norm[r] for r in rows]
+            for m, min_len in enumerate(min_lens):
+                for start, end in pair_runs(speakers, min_len):
+                    a, b = speakers[start], speakers[start + 1]
+                    lo, hi = rows[start], rows[end] + 1
+                    for g, is_female in enumerate(sources):
+                        pair = []
+                        for sid in (a, b):
+                            if (g, sid) not in female:
+                                female[(g, sid)] = is_female(s[sid], play_id)
+                            pair.append(female[(g, sid)])
+                        for lex, (male_sum, female_sum) in prefixes.items():
+                            cell = acc[(m, lex, g)]
+                            cell[0] += 1
+                            if not all(pair):
+                                continue
+                            cell[1] += 1
+                            if male_sum[hi] - male_sum[lo] == 0:
+                                cell[2] += 1
+                                if female_sum[hi] - female_sum[lo] > 0:
+                                    cell[3] = True
+
+        for m, lex, g in settings:
+            rows_out.append([play_id, min_lens[m], lex, gender_specs[g], *acc[(m, lex, g)]])
+
+    return {
+        "grid": {"min_len": min_lens, "lexicons": lexicons, "genders": gender_specs},
+        "columns": ["play", "min_len", "lexicon", "genders", *RESULT_COLUMNS],
+        "rows": rows_out,
+    }
+
+
+def summarize(result: Dict[str, Any]) -> List[Tuple[int, str, str, int]]:
+    """(min_len, lexicon, genders, plays passing) per setting."""
+    passing: Dict[Tuple[int, str, str], int] = {}
+    for _play, min_len, lex, genders, *_counts, passes in result["rows"]:
+        key = (min_len, lex, genders)
+        passing[key] = passing.get(key, 0) + int(passes)
+    return [(*key, n) for key, n in passing.items()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--grid", type=Path, default=None, help="JSON file with min_len, lexicons and genders (default: DEFAULT_GRID)")
+    parser.add_argument("--table", type=Path, default=OUT_DIR / "ibsen_speeches.bin")
+    parser.add_argument("--index", type=Path, default=OUT_DIR / "ibsen_tokens.bin")
+    parser.add_argument("--out", type=Path, default=OUT_DIR / "bechdel_sweep.json")
+    args = parser.parse_args()
+
+    grid = json.loads(args.grid.read_text(encoding="utf-8")) if args.grid else DEFAULT_GRID
+    with SpeechTable(args.table) as table:
+        if not args.index.exists():
+            build_token_index(table, args.index)
+        with TokenIndex(args.index, table) as index:
+            result = sweep(table, index, grid)
+
+    args.out.write_text(json.dumps(result, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    for min_len, lex, genders, n in summarize(result):
+        print(f"min_len={min_len:<3} {lex:<15} {genders:<10} {n} stykker består")
+    print(f"Wrote sweep: {args.out}")
@@ -0,0 +1,267 @@
+"""
+Benchmark the TEI -> networks pipeline stage by stage.
+
+Each stage is timed (wall + CPU, best of --repeat runs) and memory-profiled
+(tracemalloc peak, one extra run) on:
+- the real corpus in data/raw/plays/
+- synthetic TEI plays at the --scales given (default 10x and 100x a
+  mid-sized play), with proportionally more speakers and scenes
+
+Stages: xml_parse (ET.parse), extract (parse_play), speech_network,
+act_networks, cooccurrence, word_counts, dialogs, scene_turns,
+analyze_play, export_play, json_write.
+
+Results are written as JSON to data/output/bench/<timestamp>.json (or --out);
+a default run also refreshes data/output/bench/last.json. With --compare
+OLD.json, stages that got slower than --threshold are listed and the exit
+code is 1, so a run can gate a regeneration job.
+
+Run:
+    python data/scripts/bench_pipeline.py
+    python data/scripts/bench_pipeline.py --scales 10 --compare data/output/bench/last.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+sys.path.append(str(Path(__file__).parent))
+from ibsen_networks_acts import (  # noqa: E402
+    analyze_play,
+    build_cooccurrence_network,
+    build_scene_turns,
+    build_speech_network_and_transitions,
+    build_speech_network_for_act,
+    compute_dialogs_for_play,
+    compute_word_counts,
+    export_play,
+)
+from json_writer import PlaysJsonWriter, fragment  # noqa: E402
+from parse_tei import RAW_DIR, ROOT, parse_play  # noqa: E402
+
+BENCH_DIR = ROOT / "data" / "output" / "bench"
+LAST_NAME = "last.json"
+
+# Size of the 1x synthetic play, roughly a mid-sized Ibsen play.
+BASE_ACTS = 5
+BASE_SCENES_PER_ACT = 6
+BASE_SPEAKERS = 15
+SPEECHES_PER_SCENE = 40
+CAST_PER_SCENE = 8
+WORDS_PER_SPEECH = 25
+
+# Stages faster than this are too noisy to flag in --compare.
+MIN_COMPARE_S = 0.01
+
+_WORDS = (
+    "og i jeg det at en til er som på de med han af for ikke der var mig "
+    "sig men et har om vi min havde ham hun nu over da ved fra du ud sin dem "
+    "os op man hans hvor eller hvad skal selv her alle vil blev kunde ind "
+    "naar være dog noget ville jo deres efter ned skulde denne end dette mit "
+    "også under have dig anden hende mine alt meget sit sine vor mod disse "
+    "hvis din nogle hos blive mange ad bliver hendes været thi jer sådan"
+).split()
+
+
+# ---------------------------------------------------------------------------
+# Syntetiske TEI-stykker
+# ---------------------------------------------------------------------------
+
+def synthetic_play_xml(scale: int, seed: int = 0) -> str:
+    """A TEI play with scale x the scenes and speakers of the 1x base play."""
+    rng = random.Random(seed)
+    n_speakers = BASE_SPEAKERS * scale
+    speakers = [f"PERSON {i}" for i in range(n_speakers)]
+    out: List[str] = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<TEI xmlns="http://www.tei-c.org/ns/1.0" xmlns:HIS="http://www.example.org/ns/HIS">',
+        "<teiHeader><fileDesc><titleStmt>",
+        f"<title>Syntetisk x{scale}</title>",
+        "</titleStmt><sourceDesc>",
+        "".join(f"<p>Kildebeskrivelse {i}: {' '.join(rng.choices(_WORDS, k=30))}</p>" for i in range(50)),
+        "</sourceDesc></fileDesc></teiHeader>",
+        "<text><body>",
+    ]
+    for act in range(1, BASE_ACTS + 1):
+        out.append(f'<div type="act" n="{act}"><head>AKT {act}</head>')
+        for scene in range(1, BASE_SCENES_PER_ACT * scale + 1):
+            cast = rng.sample(speakers, min(CAST_PER_SCENE, n_speakers))
+            out.append(f'<div type="scene" n="{scene}"><stage>{" ".join(rng.choices(_WORDS, k=12))}</stage>')
+            for _ in range(SPEECHES_PER_SCENE):
+                who = rng.choice(cast)
+                text = " ".join(rng.choices(_WORDS, k=rng.randint(1, 2 * WORDS_PER_SPEECH)))
+                out.append(
+                    f'<HIS:hisSp who="{who}"><HIS:spOpener><speaker>{who}</speaker>'
+                    f"<HIS:hisStage>{' '.join(rng.choices(_WORDS, k=3))}</HIS:hisStage></HIS:spOpener>"
+                    f'<p>{text}<note type="k">{" ".join(rng.choices(_WORDS, k=5))}</note></p></HIS:hisSp>'
+                )
+            out.append("</div>")
+        out.append("</div>")
+    out.append("</body></text></TEI>")
+    return "\n".join(out)
+
+
+def write_synthetic_corpus(out_dir: Path, scale: int, n_plays: int = 1) -> List[Path]:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(n_plays):
+        path = out_dir / f"Syntetisk_x{scale}_{i}_1900.xml"
+        path.write_text(synthetic_play_xml(scale, seed=i), encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+# ---------------------------------------------------------------------------
+# Måling
+# ---------------------------------------------------------------------------
+
+def measure(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    wall = cpu = float("inf")
+    for _ in range(repeat):
+        t0, c0 = time.perf_counter(), time.process_time()
+        fn()
+        wall = min(wall, time.perf_counter() - t0)
+        cpu = min(cpu, time.process_time() - c0)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"wall_s": round(wall, 6), "cpu_s": round(cpu, 6), "peak_kb": peak // 1024}
+
+
+def bench_corpus(xml_files: List[Path], repeat: int) -> Dict[str, Any]:
+    plays = [parse_play(xml) for xml in xml_files]
+    n_speeches = sum(
+        len(scene["speeches"]) for play in plays for act in play["acts"] for scene in act["scenes"]
+    )
+
+    def each_play(fn: Callable[[Dict[str, Any]], Any]) -> Callable[[], None]:
+        return lambda: [fn(play) for play in plays]
+
+    def act_networks(play: Dict[str, Any]) -> None:
+        for act in play["acts"]:
+            build_speech_network_for_act(act)
+
+    def json_write() -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            with PlaysJsonWriter(Path(tmp) / "parsed.json") as out:
+                for play in plays:
+                    out.add(fragment(play))
+            with PlaysJsonWriter(Path(tmp) / "networks.json") as out:
+                for play in plays:
+                    out.add(fragment(export_play(play)))
+
+    stages: Dict[str, Callable[[], Any]] = {
+        "xml_parse": lambda: [ET.parse(xml) for xml in xml_files],
+        "extract": lambda: [parse_play(xml) for xml in xml_files],
+        "speech_network": each_play(build_speech_network_and_transitions),
+        "act_networks": each_play(act_networks),
+        "cooccurrence": each_play(build_cooccurrence_network),
+        "word_counts": each_play(compute_word_counts),
+        "dialogs": each_play(compute_dialogs_for_play),
+        "scene_turns": each_play(build_scene_turns),
+        "analyze_play": each_play(analyze_play),
+        "export_play": each_play(export_play),
+        "json_write": json_write,
+    }
+
+    results = {}
+    for name, fn in stages.items():
+        results[name] = measure(fn, repeat)
+        print(f"  {name:<15} {results[name]['wall_s']:8.3f}s  {results[name]['peak_kb']:>8} KB", flush=True)
+
+    return {
+        "files": len(xml_files),
+        "bytes": sum(xml.stat().st_size for xml in xml_files),
+        "speeches": n_speeches,
+        "stages": results,
+    }
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any], threshold: float) -> List[str]:
+    """Stages whose wall time grew by more than `threshold` (fraction)."""
+    regressions = []
+    for corpus, result in new["corpora"].items():
+        old_stages = old.get("corpora", {}).get(corpus, {}).get("stages", {})
+        for stage, m in result["stages"].items():
+            before = old_stages.get(stage, {}).get("wall_s")
+            if not before or max(before, m["wall_s"]) < MIN_COMPARE_S:
+                continue
+            ratio = m["wall_s"] / before
+            if ratio > 1 + threshold:
+                regressions.append(f"{corpus}/{stage}: {before:.3f}s -> {m['wall_s']:.3f}s ({ratio:.2f}x)")
+    return regressions
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        return ""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", default="10,100", help="Comma-separated synthetic scales (empty to skip)")
+    parser.add_argument("--no-real", action="store_true", help="Skip the real corpus in data/raw/plays")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage (best is kept)")
+    parser.add_argument("--out", type=Path, default=None, help="Result file (default: data/output/bench/<timestamp>.json, copied to last.json)")
+    parser.add_argument("--compare", type=Path, default=None, help="Earlier result file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown per stage for --compare")
+    args = parser.parse_args()
+    # read before this run's results can replace it (--compare .../last.json)
+    old = json.loads(args.compare.read_text(encoding="utf-8")) if args.compare else None
+
+    now = datetime.now(timezone.utc)
+    report: Dict[str, Any] = {
+        "meta": {
+            "timestamp": now.isoformat(timespec="seconds"),
+            "git_rev": _git_rev(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "corpora": {},
+    }
+
+    if not args.no_real:
+        print(f"real corpus ({RAW_DIR})")
+        report["corpora"]["real"] = bench_corpus(sorted(RAW_DIR.glob("*.xml")), args.repeat)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in (int(s) for s in args.scales.split(",") if s.strip()):
+            print(f"synthetic x{scale}")
+            files = write_synthetic_corpus(Path(tmp) / f"x{scale}", scale)
+            report["corpora"][f"synthetic_x{scale}"] = bench_corpus(files, args.repeat)
+
+    out = args.out or BENCH_DIR / f"{now.strftime('%Y%m%dT%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    out.write_text(text, encoding="utf-8")
+    print(f"Wrote benchmark: {out}")
+    if args.out is None:
+        (BENCH_DIR / LAST_NAME).write_text(text, encoding="utf-8")
+
+    if old is not None:
+        regressions = compare(old, report, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,444 @@
+"""
+Compact binary variant of ibsen_networks.json (ibsen_networks.bin).
+
+Layout (little-endian, every array 8-byte aligned so it can be viewed as a
+typed array directly, e.g. new Uint32Array(buf, offset, n) in the browser):
+
+    header   magic "IBNB", u32 version, u32 n_plays, u32 0,
+             u64 strings_offset, u64 index_offset, u64 female_offset
+    plays    one record per play (see _write_play), at index[i]
+    female   FEMALE_CHARACTERS: str[] names, u8[] values
+    strings  u32[] offsets (n + 1), then the UTF-8 blob
+    index    u64[] play offsets (n_plays + 1, last = end of plays)
+
+An array is a u32 length, padding to 8 bytes, then the items. Strings are
+u32 indices into the shared string table, so each speaker name, act and
+scene label is stored once. Speech turns are flat speaker/word arrays with
+per-scene offsets. Node metrics (degree, betweenness, community) are f64/u32
+arrays beside the node ids; each network's metrics summary follows its
+edges. read_binary() rebuilds dicts equal to the JSON export.
+"""
+
+from __future__ import annotations
+
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Union
+
+MAGIC = b"IBNB"
+VERSION = 2
+_HEADER = struct.Struct("<4sIIIQQQ")
+
+assert array("I").itemsize == 4 and array("d").itemsize == 8
+
+
+def _pad(n: int) -> int:
+    return -n % 8
+
+
+class _Writer:
+    def __init__(self, strings: Dict[str, int]) -> None:
+        self.buf = bytearray()
+        self.strings = strings
+
+    def sid(self, s: str) -> int:
+        idx = self.strings.get(s)
+        if idx is None:
+            idx = len(self.strings)
+            self.strings[s] = idx
+        return idx
+
+    def u32(self, v: int) -> None:
+        self.buf += struct.pack("<I", v)
+
+    def f64(self, v: float) -> None:
+        self.buf += struct.pack("<d", v)
+
+    def arr(self, typecode: str, values: Iterable[Any]) -> None:
+        a = array(typecode, values)
+        if sys.byteorder == "big":
+            a.byteswap()
+        self.u32(len(a))
+        self.buf += bytes(_pad(len(self.buf)))
+        self.buf += a.tobytes()
+
+    def strs(self, values: Iterable[str]) -> None:
+        self.arr("I", (self.sid(v) for v in values))
+
+    def align(self) -> None:
+        self.buf += bytes(_pad(len(self.buf)))
+
+
+class _Reader:
+    def __init__(self, data: memoryview, strings: List[str], pos: int = 0) -> None:
+        self.data = data
+        self.strings = strings
+        self.pos = pos
+
+    def u32(self) -> int:
+        (v,) = struct.unpack_from("<I", self.data, self.pos)
+        self.pos += 4
+        return v
+
+    def f64(self) -> float:
+        (v,) = struct.unpack_from("<d", self.data, self.pos)
+        self.pos += 8
+        return v
+
+    def arr(self, typecode: str) -> Sequence[Any]:
+        n = self.u32()
+        self.pos += _pad(self.pos)
+        size = array(typecode).itemsize * n
+        raw = self.data[self.pos:self.pos + size]
+        self.pos += size
+        if sys.byteorder == "little":
+            return raw.cast(typecode)
+        a = array(typecode, raw.tobytes())
+        a.byteswap()
+        return a
+
+    def strs(self) -> List[str]:
+        return [self.strings[i] for i in self.arr("I")]
+
+
+# ---------------------------------------------------------------------------
+# Skriving
+# ---------------------------------------------------------------------------
+
+def _write_nodes(w: _Writer, nodes: List[Dict[str, Any]], community: bool = False) -> None:
+    w.strs(n["id"] for n in nodes)
+    w.arr("B", (ord(n["gender"]) for n in nodes))
+    w.arr("d", (n["degree"] for n in nodes))
+    w.arr("d", (n["betweenness"] for n in nodes))
+    if community:
+        w.arr("I", (n["community"] for n in nodes))
+
+
+def _write_metrics(w: _Writer, metrics: Dict[str, Any], community: bool = False) -> None:
+    w.u32(metrics["n_nodes"])
+    w.u32(metrics["n_edges"])
+    w.f64(metrics["density"])
+    if community:
+        w.u32(metrics["n_communities"])
+
+
+def _write_speech_network(w: _Writer, net: Dict[str, Any]) -> None:
+    _write_nodes(w, net["nodes"])
+    edges = net["edges"]
+    w.strs(e["source"] for e in edges)
+    w.strs(e["target"] for e in edges)
+    w.arr("I", (e["count"] for e in edges))
+    w.arr("d", (e["avg_len_A"] for e in edges))
+    w.arr("d", (e["avg_len_B"] for e in edges))
+    _write_metrics(w, net["metrics"])
+
+
+def _write_word_counts(w: _Writer, counts: List[Dict[str, Any]]) -> None:
+    w.strs(c["character"] for c in counts)
+    w.arr("I", (c["words"] for c in counts))
+
+
+def _write_play(w: _Writer, play: Dict[str, Any]) -> None:
+    w.u32(w.sid(play["id"]))
+    w.u32(w.sid(play["title"]))
+
+    _write_speech_network(w, play["speech_network"])
+
+    co = play["co_network"]
+    _write_nodes(w, co["nodes"], community=True)
+    w.strs(e["source"] for e in co["edges"])
+    w.strs(e["target"] for e in co["edges"])
+    w.arr("I", (e["weight"] for e in co["edges"]))
+    _write_metrics(w, co["metrics"], community=True)
+
+    w.u32(len(play["acts"]))
+    for act in play["acts"]:
+        w.u32(w.sid(act["act_n"]))
+        _write_speech_network(w, act["speech_network"])
+        _write_word_counts(w, act["word_counts"])
+
+    _write_word_counts(w, play["word_counts"])
+
+    w.u32(len(play["act_word_counts"]))
+    for act_n, counts in play["act_word_counts"].items():
+        w.u32(w.sid(act_n))
+        _write_word_counts(w, counts)
+
+    dialogs = play["dialogs"]
+    for key in ("play", "act", "scene"):
+        w.strs(d[key] for d in dialogs)
+    w.strs(d["speakers"][0] for d in dialogs)
+    w.strs(d["speakers"][1] for d in dialogs)
+    for key in ("length", "start_index", "end_index", "male_pron", "female_pron", "total_words"):
+        w.arr("I", (d[key] for d in dialogs))
+    w.arr("B", (d["female_pair"] for d in dialogs))
+
+    scene_turns = play["scene_turns"]
+    w.strs(st["act"] for st in scene_turns)
+    w.strs(st["scene"] for st in scene_turns)
+    offsets = [0]
+    for st in scene_turns:
+        offsets.append(offsets[-1] + len(st["turns"]))
+    w.arr("I", offsets)
+    w.strs(t["speaker"] for st in scene_turns for t in st["turns"])
+    w.arr("I", (t["words"] for st in scene_turns for t in st["turns"]))
+
+    bechdel = play["bechdel"]
+    w.u32(int(bechdel["passes"]))
+    w.u32(bechdel["female_dialog_count"])
+    w.u32(bechdel["female_dialogs_no_male_pron"])
+    w.align()
+
+
+class BinaryWriter:
+    """
+    Incremental writer: each add() encodes one export block and writes it
+    straight to the file; only the string table and offsets stay in memory.
+    """
+
+    def __init__(self, path: Union[str, Path], female_characters: Dict[str, bool]) -> None:
+        self.f = open(path, "wb")
+        self.female_characters = female_characters
+        self.strings: Dict[str, int] = {}
+        self.index: List[int] = []
+        self.offset = _HEADER.size + _pad(_HEADER.size)
+        self.f.write(bytes(self.offset))
+
+    def _emit(self, w: _Writer) -> int:
+        start = self.offset
+        self.f.write(w.buf)
+        self.offset += len(w.buf)
+        return start
+
+    def add(self, play: Dict[str, Any]) -> None:
+        w = _Writer(self.strings)
+        _write_play(w, play)
+        self.index.append(self._emit(w))
+
+    def close(self) -> None:
+        if self.f.closed:
+            return
+        self.index.append(self.offset)
+
+        w = _Writer(self.strings)
+        w.strs(self.female_characters.keys())
+        w.arr("B", (bool(v) for v in self.female_characters.values()))
+        w.align()
+        female_offset = self._emit(w)
+
+        w = _Writer(self.strings)
+        blob = bytearray()
+        str_offsets = [0]
+        for s in self.strings:
+            blob += s.encode("utf-8")
+            str_offsets.append(len(blob))
+        w.arr("I", str_offsets)
+        w.u32(len(blob))
+        w.buf += blob
+        w.align()
+        strings_offset = self._emit(w)
+
+        w = _Writer(self.strings)
+        w.arr("Q", self.index)
+        index_offset = self._emit(w)
+
+        self.f.seek(0)
+        self.f.write(
+            _HEADER.pack(
+                MAGIC, VERSION, len(self.index) - 1, 0, strings_offset, index_offset, female_offset
+            )
+        )
+        self.f.close()
+
+    def __enter__(self) -> "BinaryWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, *exc: Any) -> None:
+        if exc_type is not None:
+            self.f.close()
+        self.close()
+
+
+def write_binary(
+    path: Union[str, Path],
+    female_characters: Dict[str, bool],
+    plays: Iterable[Dict[str, Any]],
+) -> None:
+    """Write export blocks (export_play output) to the binary format."""
+    with BinaryWriter(path, female_characters) as out:
+        for play in plays:
+            out.add(play)
+
+
+# ---------------------------------------------------------------------------
+# Lesing
+# ---------------------------------------------------------------------------
+
+def _read_nodes(r: _Reader, community: bool = False) -> List[Dict[str, Any]]:
+    ids = r.strs()
+    genders, degree, betweenness = r.arr("B"), r.arr("d"), r.arr("d")
+    nodes = [
+        {"id": n, "gender": chr(g), "degree": d, "betweenness": b}
+        for n, g, d, b in zip(ids, genders, degree, betweenness)
+    ]
+    if community:
+        for node, c in zip(nodes, r.arr("I")):
+            node["community"] = c
+    return nodes
+
+
+def _read_metrics(r: _Reader, community: bool = False) -> Dict[str, Any]:
+    metrics = {"n_nodes": r.u32(), "n_edges": r.u32(), "density": r.f64()}
+    if community:
+        metrics["n_communities"] = r.u32()
+    return metrics
+
+
+def _read_speech_network(r: _Reader) -> Dict[str, Any]:
+    nodes = _read_nodes(r)
+    sources, targets = r.strs(), r.strs()
+    counts, avg_a, avg_b = r.arr("I"), r.arr("d"), r.arr("d")
+    edges = [
+        {"source": s, "target": t, "count": c, "avg_len_A": a, "avg_len_B": b}
+        for s, t, c, a, b in zip(sources, targets, counts, avg_a, avg_b)
+    ]
+    return {"nodes": nodes, "edges": edges, "metrics": _read_metrics(r)}
+
+
+def _read_word_counts(r: _Reader) -> List[Dict[str, Any]]:
+    chars, words = r.strs(), r.arr("I")
+    return [{"character": c, "words": w} for c, w in zip(chars, words)]
+
+
+def _read_play(r: _Reader) -> Dict[str, Any]:
+    play_id = r.strings[r.u32()]
+    title = r.strings[r.u32()]
+
+    speech_network = _read_speech_network(r)
+
+    co_nodes = _read_nodes(r, community=True)
+    sources, targets, weights = r.strs(), r.strs(), r.arr("I")
+    co_edges = [
+        {"source": s, "target": t, "weight": w}
+        for s, t, w in zip(sources, targets, weights)
+    ]
+    co_metrics = _read_metrics(r, community=True)
+
+    acts = []
+    for _ in range(r.u32()):
+        act_n = r.strings[r.u32()]
+        net = _read_speech_network(r)
+        acts.append({"act_n": act_n, "speech_network": net, "word_counts": _read_word_counts(r)})
+
+    word_counts = _read_word_counts(r)
+
+    act_word_counts = {}
+    for _ in range(r.u32()):
+        act_n = r.strings[r.u32()]
+        act_word_counts[act_n] = _read_word_counts(r)
+
+    d_play, d_act, d_scene, d_a, d_b = (r.strs() for _ in range(5))
+    d_ints = [r.arr("I") for _ in range(6)]
+    d_female = r.arr("B")
+    dialogs = [
+        {
+            "play": d_play[k],
+            "act": d_act[k],
+            "scene": d_scene[k],
+            "speakers": [d_a[k], d_b[k]],
+            "length": d_ints[0][k],
+            "start_index": d_ints[1][k],
+            "end_index": d_ints[2][k],
+            "male_pron": d_ints[3][k],
+            "female_pron": d_ints[4][k],
+            "total_words": d_ints[5][k],
+            "female_pair": bool(d_female[k]),
+        }
+        for k in range(len(d_play))
+    ]
+
+    st_act, st_scene, offsets = r.strs(), r.strs(), r.arr("I")
+    speakers, words = r.strs(), r.arr("I")
+    scene_turns = [
+        {
+            "act": st_act[k],
+            "scene": st_scene[k],
+            "turns": [
+                {"speaker": speakers[t], "words": words[t]}
+                for t in range(offsets[k], offsets[k + 1])
+            ],
+        }
+        for k in range(len(st_act))
+    ]
+
+    bechdel = {
+        "passes": bool(r.u32()),
+        "female_dialog_count": r.u32(),
+        "female_dialogs_no_male_pron": r.u32(),
+    }
+
+    return {
+        "id": play_id,
+        "title": title,
+        "speech_network": speech_network,
+        "co_network": {"nodes": co_nodes, "edges": co_edges, "metrics": co_metrics},
+        "acts": acts,
+        "word_counts": word_counts,
+        "act_word_counts": act_word_counts,
+        "dialogs": dialogs,
+        "scene_turns": scene_turns,
+        "bechdel": bechdel,
+    }
+
+
+class BinaryNetworks:
+    """Random access to the plays in an ibsen_networks.bin file."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.data = memoryview(Path(path).read_bytes())
+        if len(self.data) < _HEADER.size:
+            raise ValueError(f"Truncated ibsen_networks.bin file: {path}")
+        magic, version, n_plays, _, strings_offset, index_offset, female_offset = _HEADER.unpack_from(
+            self.data, 0
+        )
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not an ibsen_networks.bin v{VERSION} file: {path}")
+        # the index (u32 length, padding, u64[n_plays + 1]) ends the file
+        if len(self.data) != index_offset + 8 + 8 * (n_plays + 1):
+            raise ValueError(f"Truncated ibsen_networks.bin file: {path}")
+        self.n_plays = n_plays
+
+        r = _Reader(self.data, [], strings_offset)
+        str_offsets = r.arr("I")
+        r.u32()
+        blob = bytes(self.data[r.pos:r.pos + str_offsets[-1]])
+        self.strings = [
+            blob[str_offsets[k]:str_offsets[k + 1]].decode("utf-8")
+            for k in range(len(str_offsets) - 1)
+        ]
+        self.index = _Reader(self.data, self.strings, index_offset).arr("Q")
+        self._female_offset = female_offset
+
+    def __len__(self) -> int:
+        return self.n_plays
+
+    def play(self, i: int) -> Dict[str, Any]:
+        return _read_play(_Reader(self.data, self.strings, self.index[i]))
+
+    def female_characters(self) -> Dict[str, bool]:
+        r = _Reader(self.data, self.strings, self._female_offset)
+        names = r.strs()
+        return {n: bool(v) for n, v in zip(names, r.arr("B"))}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "FEMALE_CHARACTERS": self.female_characters(),
+            "plays": [self.play(i) for i in range(self.n_plays)],
+        }
+
+
+def read_binary(path: Union[str, Path]) -> Dict[str, Any]:
+    """Read the whole file back into the ibsen_networks.json structure."""
+    return BinaryNetworks(path).to_dict()
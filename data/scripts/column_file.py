@@ -0,0 +1,124 @@
+"""
+Shared on-disk layout for the memory-mapped column files (speech_table.py,
+token_index.py): a header, a directory of named typed columns, then the
+columns, each 8-byte aligned so it can be viewed in place.
+
+    header     magic (4 bytes), u32 version, u32 n_columns, u32 0
+    directory  per column: 16-byte name, u8 typecode, 7 pad, u64 offset, u64 n
+    columns    little-endian
+
+Strings are stored once in a table (str_off: n + 1 offsets, str_blob: UTF-8)
+and referenced by u32 index.
+"""
+
+from __future__ import annotations
+
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Union
+
+_HEADER = struct.Struct("<4sIII")
+_ENTRY = struct.Struct("<16sB7xQQ")
+
+
+def _pad(n: int) -> int:
+    return -n % 8
+
+
+def string_columns(strings: Iterable[str]) -> Dict[str, array]:
+    blob = bytearray()
+    str_off = array("I", [0])
+    for s in strings:
+        blob += s.encode("utf-8")
+        str_off.append(len(blob))
+    return {"str_off": str_off, "str_blob": array("B", blob)}
+
+
+def write_columns(path: Union[str, Path], magic: bytes, version: int, columns: Dict[str, array]) -> None:
+    start = _HEADER.size + _ENTRY.size * len(columns)
+    directory = bytearray(_HEADER.pack(magic, version, len(columns), 0))
+    body = bytearray()
+    for name, col in columns.items():
+        body += bytes(_pad(start + len(body)))
+        directory += _ENTRY.pack(name.encode("ascii"), ord(col.typecode), start + len(body), len(col))
+        if sys.byteorder == "big":
+            col = array(col.typecode, col)
+            col.byteswap()
+        body += col.tobytes()
+    Path(path).write_bytes(directory + body)
+
+
+class MappedFile:
+    """A read-only mmap of a file, as a memoryview (empty files allowed)."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.f = open(path, "rb")
+        # mmap refuses empty files
+        self.map: Union[mmap.mmap, bytes] = (
+            mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ) if self.f.seek(0, 2) else b""
+        )
+        self.view = memoryview(self.map)
+
+    def close(self) -> None:
+        self.view.release()
+        if isinstance(self.map, mmap.mmap):
+            try:
+                self.map.close()
+            except BufferError:
+                # a caller still holds a slice; the map is unmapped with it
+                pass
+        self.f.close()
+
+
+class ColumnFile(MappedFile):
+    """Columns of a file written by write_columns, zero-copy on little-endian hosts."""
+
+    def __init__(self, path: Union[str, Path], magic: bytes, version: int) -> None:
+        super().__init__(path)
+        data = self.view
+        if len(data) < _HEADER.size:
+            self.close()
+            raise ValueError(f"Truncated {magic.decode()} file: {path}")
+        file_magic, file_version, n_columns, _ = _HEADER.unpack_from(data, 0)
+        if file_magic != magic or file_version != version:
+            self.close()
+            raise ValueError(f"Not a {magic.decode()} v{version} file: {path}")
+        if len(data) < _HEADER.size + n_columns * _ENTRY.size:
+            self.close()
+            raise ValueError(f"Truncated {magic.decode()} file: {path}")
+        self.columns: Dict[str, Sequence[int]] = {}
+        for k in range(n_columns):
+            name, typecode, offset, n = _ENTRY.unpack_from(data, _HEADER.size + k * _ENTRY.size)
+            typecode = chr(typecode)
+            end = offset + n * array(typecode).itemsize
+            if end > len(data):
+                self.close()
+                raise ValueError(f"Truncated {magic.decode()} file: {path}")
+            raw = data[offset:end]
+            if sys.byteorder == "little":
+                col: Sequence[int] = raw.cast(typecode)
+            else:
+                col = array(typecode, raw.tobytes())
+                col.byteswap()
+            self.columns[name.rstrip(b"\0").decode("ascii")] = col
+
+    def strings(self) -> List[str]:
+        str_off, blob = self.columns["str_off"], self.columns["str_blob"]
+        return [bytes(blob[str_off[k]:str_off[k + 1]]).decode("utf-8") for k in range(len(str_off) - 1)]
+
+    def close(self) -> None:
+        # views into the map must be released before the map can close
+        for col in getattr(self, "columns", {}).values():
+            if isinstance(col, memoryview):
+                col.release()
+        self.columns = {}
+        super().close()
+
+    def __enter__(self) -> "ColumnFile":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
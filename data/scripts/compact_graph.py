@@ -0,0 +1,117 @@
+"""
+Lightweight graph for the network builders in ibsen_networks_acts.py.
+
+Nodes are integer speaker ids (see ibsen_networks_acts.speaker_of), edges are
+rows in flat `array` columns (source, target and one integer accumulator per
+attribute), so an edge costs a few machine words instead of a networkx
+dict-of-dicts. `edges()` yields edges in the same order as networkx would for
+the same sequence of insertions, which keeps the JSON export stable.
+
+networkx is only imported by `to_networkx()`, for notebook use.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+
+class CompactGraph:
+    def __init__(
+        self,
+        directed: bool = True,
+        attrs: Sequence[str] = ("weight",),
+        labels: Optional[Sequence[str]] = None,
+    ) -> None:
+        self.directed = directed
+        self.attrs = tuple(attrs)
+        self.labels = labels
+        self.nodes = array("l")
+        self.src = array("l")
+        self.dst = array("l")
+        self.columns = [array("q") for _ in self.attrs]
+        self._node_index: Dict[int, int] = {}
+        self._edge_index: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __contains__(self, node: int) -> bool:
+        return node in self._node_index
+
+    def number_of_nodes(self) -> int:
+        return len(self.nodes)
+
+    def number_of_edges(self) -> int:
+        return len(self.src)
+
+    def add_node(self, node: int) -> None:
+        if node not in self._node_index:
+            self._node_index[node] = len(self.nodes)
+            self.nodes.append(node)
+
+    def _key(self, u: int, v: int) -> int:
+        if not self.directed and u > v:
+            u, v = v, u
+        return (u << 32) | v
+
+    def has_edge(self, u: int, v: int) -> bool:
+        return self._key(u, v) in self._edge_index
+
+    def add_edge(self, u: int, v: int, *values: int) -> None:
+        """Add u -> v (adding the nodes too) and sum `values` into its attributes."""
+        if not self.directed and u > v:
+            key = (v << 32) | u
+        else:
+            key = (u << 32) | v
+        e = self._edge_index.get(key)
+        if e is not None:
+            for col, value in zip(self.columns, values):
+                col[e] += value
+            return
+
+        self.add_node(u)
+        self.add_node(v)
+        self._edge_index[key] = len(self.src)
+        self.src.append(u)
+        self.dst.append(v)
+        for col, value in zip(self.columns, values):
+            col.append(value)
+
+    def edge_values(self, e: int) -> Tuple[int, ...]:
+        return tuple(col[e] for col in self.columns)
+
+    def edges(self) -> Iterator[Tuple[int, int, Tuple[int, ...]]]:
+        """
+        Yield (u, v, values) in networkx order: grouped by the (first-seen)
+        endpoint in node insertion order, then by edge insertion order.
+        """
+        index = self._node_index
+        src, dst = self.src, self.dst
+        if self.directed:
+            order = sorted(range(len(src)), key=lambda e: index[src[e]])
+            for e in order:
+                yield src[e], dst[e], self.edge_values(e)
+            return
+
+        def first(e: int) -> int:
+            return min(index[src[e]], index[dst[e]])
+
+        for e in sorted(range(len(src)), key=first):
+            u, v = src[e], dst[e]
+            if index[v] < index[u]:
+                u, v = v, u
+            yield u, v, self.edge_values(e)
+
+    def label(self, node: int) -> Any:
+        return self.labels[node] if self.labels is not None else node
+
+    def to_networkx(self) -> Any:
+        """Build an nx.DiGraph / nx.Graph with labelled nodes and edge attributes."""
+        import networkx as nx
+
+        G = nx.DiGraph() if self.directed else nx.Graph()
+        G.add_nodes_from(self.label(n) for n in self.nodes)
+        for u, v, values in self.edges():
+            G.add_edge(self.label(u), self.label(v), **dict(zip(self.attrs, values)))
+        return G
@@ -0,0 +1,358 @@
+"""
+Local HTTP data service: per-play slices of the export instead of the whole
+ibsen_networks.json, for the frontend in development and for dashboards.
+
+    GET /plays                                  index (FEMALE_CHARACTERS + one entry per play)
+    GET /plays/<id>                             the whole export block
+    GET /plays/<id>/<field>                     speech_network, co_network, scene_turns, dialogs
+    GET /plays/<id>/acts/<act>/<field>          speech_network, scene_turns, dialogs of one act
+
+scene_turns and dialogs take ?scenes=START:END, a slice (0-based, end
+exclusive, either side optional) of the play's or act's scenes; dialogs are
+kept when their (act, scene) is in the slice. The export has no per-act
+co-occurrence network, so co_network is only served per play.
+
+The source is the shard directory written by parse_tei.py --shards
+(data/output/plays/, loaded one play at a time) or, failing that,
+ibsen_networks.json (loaded once). Source files are reloaded when their
+mtime changes, so the service follows parse_tei.py --watch.
+
+Responses are compact JSON with an ETag (hash of the body); If-None-Match
+gives 304. Each slice is serialized and compressed (gzip, plus brotli when
+the brotli package is installed) once, in a worker thread, and kept in an
+LRU of --cache-size slices, so repeated requests only pick the variant
+Accept-Encoding asks for. Only GET and HEAD are served; the connection is
+closed after any other method. It listens on 127.0.0.1 by default and sends
+Access-Control-Allow-Origin: *, so the vite dev server can fetch from it.
+
+Run:
+    python data/scripts/data_server.py [data/output/plays|ibsen_networks.json] [--port 8765]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from shards import INDEX_NAME, dumps_compact, index_entry
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+OUT_DIR = Path(__file__).resolve().parents[2] / "data" / "output"
+
+PLAY_FIELDS = ("speech_network", "co_network", "scene_turns", "dialogs")
+ACT_FIELDS = ("speech_network", "scene_turns", "dialogs")
+MAX_HEADER_BYTES = 64 * 1024
+
+Stamp = Optional[Tuple[int, int]]
+
+
+class NotFound(Exception):
+    pass
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _stamp(path: Path) -> Stamp:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _read_json(path: Path) -> Any:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+class PlayStore:
+    """Export blocks from a shard directory or a single ibsen_networks.json, reloaded on change."""
+
+    def __init__(self, source: Path) -> None:
+        self.source = source
+        self.sharded = source.is_dir()
+        self._index: Tuple[Stamp, Dict[str, Any]] = (None, {})
+        self._files: Dict[str, str] = {}
+        self._blocks: Dict[str, Tuple[Stamp, Dict[str, Any]]] = {}
+
+    def _index_path(self) -> Path:
+        return self.source / INDEX_NAME if self.sharded else self.source
+
+    def index(self) -> Tuple[Stamp, Dict[str, Any]]:
+        """(stamp, index); the stamp changes whenever the index file does."""
+        path = self._index_path()
+        stamp = _stamp(path)
+        if stamp is None:
+            raise NotFound(f"No export at {path}")
+        if stamp != self._index[0]:
+            data = _read_json(path)
+            if self.sharded:
+                index = data
+                self._files = {e["id"]: e["file"] for e in data["plays"]}
+            else:
+                index = {
+                    "FEMALE_CHARACTERS": data.get("FEMALE_CHARACTERS", {}),
+                    "plays": [index_entry(b, None) for b in data["plays"]],
+                }
+                self._blocks = {b["id"]: (stamp, b) for b in data["plays"]}
+            self._index = (stamp, index)
+        return self._index
+
+    def play(self, play_id: str) -> Tuple[Stamp, Dict[str, Any]]:
+        self.index()
+        if not self.sharded:
+            if play_id not in self._blocks:
+                raise NotFound(f"No play {play_id!r}")
+            return self._blocks[play_id]
+        if play_id not in self._files:
+            raise NotFound(f"No play {play_id!r}")
+        path = self.source / self._files[play_id]
+        stamp = _stamp(path)
+        cached = self._blocks.get(play_id)
+        if cached is None or cached[0] != stamp:
+            if stamp is None:
+                raise NotFound(f"Missing shard {path.name}")
+            cached = self._blocks[play_id] = (stamp, _read_json(path))
+        return cached
+
+
+def _scene_slice(query: Dict[str, List[str]]) -> slice:
+    spec = query.get("scenes", [":"])[-1]
+    start, sep, end = spec.partition(":")
+    try:
+        if not sep:
+            raise ValueError(spec)
+        return slice(int(start) if start else None, int(end) if end else None)
+    except ValueError:
+        raise BadRequest(f"scenes must be START:END, got {spec!r}") from None
+
+
+def _act(block: Dict[str, Any], act_n: str) -> Dict[str, Any]:
+    for act in block["acts"]:
+        if act["act_n"] == act_n:
+            return act
+    raise NotFound(f"No act {act_n!r} in {block['id']!r}")
+
+
+def _turns_and_dialogs(
+    block: Dict[str, Any], field: str, act_n: Optional[str], scene_range: slice
+) -> List[Dict[str, Any]]:
+    scenes = [st for st in block["scene_turns"] if act_n is None or st["act"] == act_n][scene_range]
+    if field == "scene_turns":
+        return scenes
+    keep = {(st["act"], st["scene"]) for st in scenes}
+    return [d for d in block["dialogs"] if (d["act"], d["scene"]) in keep]
+
+
+def resolve(store: PlayStore, path: str, query: Dict[str, List[str]]) -> Tuple[Stamp, Callable[[], Any]]:
+    """
+    (source stamp, function building the object to serve) for a request
+    path, so a cached slice is not rebuilt; raises NotFound/BadRequest.
+    """
+    parts = [unquote(p) for p in path.strip("/").split("/")]
+    if parts[0] != "plays":
+        raise NotFound(path)
+    if len(parts) == 1:
+        stamp, index = store.index()
+        return stamp, lambda: index
+    stamp, block = store.play(parts[1])
+    rest = parts[2:]
+    if not rest:
+        return stamp, lambda: block
+    if len(rest) == 1 and rest[0] in PLAY_FIELDS:
+        field = rest[0]
+        if field in ("scene_turns", "dialogs"):
+            scene_range = _scene_slice(query)
+            return stamp, lambda: _turns_and_dialogs(block, field, None, scene_range)
+        return stamp, lambda: block[field]
+    if len(rest) == 3 and rest[0] == "acts" and rest[2] in ACT_FIELDS:
+        act_n, field = rest[1], rest[2]
+        act = _act(block, act_n)
+        if field == "speech_network":
+            return stamp, lambda: act["speech_network"]
+        scene_range = _scene_slice(query)
+        return stamp, lambda: _turns_and_dialogs(block, field, act_n, scene_range)
+    raise NotFound(path)
+
+
+class Encoded:
+    """One serialized slice: ETag and body per content encoding."""
+
+    def __init__(self, obj: Any) -> None:
+        body = dumps_compact(obj).encode("utf-8")
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self.bodies: Dict[str, bytes] = {"identity": body, "gzip": gzip.compress(body, mtime=0)}
+        if brotli is not None:
+            self.bodies["br"] = brotli.compress(body)
+
+
+class SliceCache:
+    """
+    LRU of Encoded slices keyed by (source stamp, path, query). A miss is
+    serialized and compressed in a worker thread, off the event loop.
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Tuple[Any, ...], Encoded]" = OrderedDict()
+        self.hits = self.misses = 0
+
+    async def get(self, store: PlayStore, path: str, query_string: str) -> Encoded:
+        query = parse_qs(query_string)
+        stamp, build = resolve(store, path, query)
+        key = (stamp, path, tuple(sorted((k, tuple(v)) for k, v in query.items())))
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry
+        self.misses += 1
+        entry = self.entries[key] = await asyncio.to_thread(lambda: Encoded(build()))
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return entry
+
+
+def pick_encoding(accept: str, available: Dict[str, bytes]) -> str:
+    accepted = set()
+    for part in accept.split(","):
+        name, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(name.strip().lower())
+    for encoding in ("br", "gzip"):
+        if encoding in available and (encoding in accepted or "*" in accepted):
+            return encoding
+    return "identity"
+
+
+REASONS = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+}
+
+
+class DataService:
+    def __init__(self, store: PlayStore, cache_size: int = 256) -> None:
+        self.store = store
+        self.cache = SliceCache(cache_size)
+
+    async def respond(self, method: str, target: str, headers: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        """(status, headers, body) for one request."""
+        if method not in ("GET", "HEAD"):
+            return self._error(405, f"{method} not supported")
+        url = urlsplit(target)
+        try:
+            entry = await self.cache.get(self.store, url.path, url.query)
+        except NotFound as exc:
+            return self._error(404, str(exc))
+        except BadRequest as exc:
+            return self._error(400, str(exc))
+        except Exception as exc:
+            # e.g. a shard being rewritten by parse_tei.py; the next request retries
+            return self._error(500, f"{type(exc).__name__}: {exc}")
+        out = {
+            "Content-Type": "application/json; charset=utf-8",
+            "ETag": entry.etag,
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        if entry.etag in (t.strip() for t in headers.get("if-none-match", "").split(",")):
+            return 304, out, b""
+        encoding = pick_encoding(headers.get("accept-encoding", ""), entry.bodies)
+        if encoding != "identity":
+            out["Content-Encoding"] = encoding
+        return 200, out, entry.bodies[encoding]
+
+    def _error(self, status: int, message: str) -> Tuple[int, Dict[str, str], bytes]:
+        body = dumps_compact({"error": message}).encode("utf-8")
+        return status, {"Content-Type": "application/json; charset=utf-8"}, body
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ")
+                except ValueError:
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, sep, value = line.partition(":")
+                    if sep:
+                        headers[name.strip().lower()] = value.strip()
+                # request bodies are never used: drain a GET/HEAD body, and
+                # close after anything else rather than parse its body as a request
+                must_close = method not in ("GET", "HEAD") or "transfer-encoding" in headers
+                if not must_close:
+                    try:
+                        length = int(headers.get("content-length", "0"))
+                    except ValueError:
+                        break
+                    if length > MAX_HEADER_BYTES:
+                        must_close = True
+                    elif length > 0:
+                        try:
+                            await reader.readexactly(length)
+                        except (asyncio.IncompleteReadError, ConnectionError):
+                            break
+                status, out, body = await self.respond(method, target, headers)
+                keep_alive = not must_close and (
+                    headers.get("connection", "").lower() != "close"
+                    if version == "HTTP/1.1"
+                    else headers.get("connection", "").lower() == "keep-alive"
+                )
+                out["Content-Length"] = str(len(body))
+                out["Access-Control-Allow-Origin"] = "*"
+                out["Connection"] = "keep-alive" if keep_alive else "close"
+                lines_out = [f"HTTP/1.1 {status} {REASONS[status]}"]
+                lines_out += [f"{k}: {v}" for k, v in out.items()]
+                writer.write(("\r\n".join(lines_out) + "\r\n\r\n").encode("latin-1"))
+                if method != "HEAD":
+                    writer.write(body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+
+async def serve(store: PlayStore, host: str = "127.0.0.1", port: int = 8765, cache_size: int = 256) -> None:
+    service = DataService(store, cache_size)
+    server = await asyncio.start_server(service.handle, host, port, limit=MAX_HEADER_BYTES)
+    print(f"Serving {store.source} on http://{host}:{port}/plays")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    default = OUT_DIR / "plays" if (OUT_DIR / "plays" / INDEX_NAME).exists() else OUT_DIR / "ibsen_networks.json"
+    parser.add_argument("source", nargs="?", type=Path, default=default, help="Shard directory or ibsen_networks.json")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--cache-size", type=int, default=256, help="Serialized slices kept in memory")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(PlayStore(args.source), args.host, args.port, args.cache_size))
+    except KeyboardInterrupt:
+        pass
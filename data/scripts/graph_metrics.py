@@ -0,0 +1,177 @@
+"""
+Network metrics for the exported graphs, computed once offline instead of
+in the browser on every page view.
+
+network_metrics(G) works directly on a CompactGraph and returns per-node
+lists (in G.nodes order) plus a summary:
+
+- degree        degree centrality, (in + out) neighbours / (n - 1), as
+                networkx.degree_centrality
+- betweenness   unweighted shortest-path betweenness (Brandes), normalized
+                as networkx.betweenness_centrality
+- community     (undirected graphs) weighted label propagation with a fixed
+                node order and smallest-label tie-break, so it is
+                deterministic; ids are numbered by first node
+- summary       n_nodes, n_edges, density (+ n_communities)
+
+Results are cached by a content hash of the graph (labels, edges, values),
+in memory (the last MEMO_SIZE graphs) and, when a cache_dir is given, as
+play_cache entries under the "metrics" stage, so an unchanged graph is never
+recomputed, e.g. when only the gender data of a play changed. take_used_keys()
+returns the cache_dir keys looked up since the last call, so the caller can
+tell which entries are still live and prune the rest.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import play_cache
+from compact_graph import CompactGraph
+
+METRICS_VERSION = "1"
+LABEL_ROUNDS = 100
+MEMO_SIZE = 512
+
+_memo: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_used: List[str] = []
+
+
+def graph_key(G: CompactGraph) -> str:
+    h = hashlib.sha256()
+    h.update(f"{METRICS_VERSION}\0{int(G.directed)}\0".encode())
+    h.update("\0".join(str(G.label(n)) for n in G.nodes).encode("utf-8"))
+    for u, v, values in G.edges():
+        h.update(f"\1{G.label(u)}\0{G.label(v)}\0{values}".encode("utf-8"))
+    return h.hexdigest()
+
+
+def _adjacency(G: CompactGraph) -> List[Dict[int, int]]:
+    """Out-neighbour index -> summed first attribute, per node index."""
+    index = {n: i for i, n in enumerate(G.nodes)}
+    adj: List[Dict[int, int]] = [{} for _ in G.nodes]
+    for u, v, values in G.edges():
+        a, b = index[u], index[v]
+        if a == b:
+            continue
+        adj[a][b] = adj[a].get(b, 0) + values[0]
+        if not G.directed:
+            adj[b][a] = adj[b].get(a, 0) + values[0]
+    return adj
+
+
+def _degree(adj: List[Dict[int, int]], directed: bool) -> List[float]:
+    n = len(adj)
+    if n < 2:
+        return [1.0] * n if n == 1 else []
+    deg = [len(nbrs) for nbrs in adj]
+    if directed:
+        for nbrs in adj:
+            for b in nbrs:
+                deg[b] += 1
+    return [d / (n - 1) for d in deg]
+
+
+def _betweenness(adj: List[Dict[int, int]], directed: bool) -> List[float]:
+    n = len(adj)
+    bc = [0.0] * n
+    for s in range(n):
+        order: List[int] = []
+        preds: List[List[int]] = [[] for _ in range(n)]
+        sigma = [0] * n
+        dist = [-1] * n
+        sigma[s], dist[s] = 1, 0
+        queue = deque([s])
+        while queue:
+            v = queue.popleft()
+            order.append(v)
+            for w in adj[v]:
+                if dist[w] < 0:
+                    dist[w] = dist[v] + 1
+                    queue.append(w)
+                if dist[w] == dist[v] + 1:
+                    sigma[w] += sigma[v]
+                    preds[w].append(v)
+        delta = [0.0] * n
+        for w in reversed(order):
+            for v in preds[w]:
+                delta[v] += sigma[v] / sigma[w] * (1 + delta[w])
+            if w != s:
+                bc[w] += delta[w]
+    if n > 2:
+        scale = 1 / ((n - 1) * (n - 2))
+        bc = [b * scale for b in bc]
+    return bc
+
+
+def _communities(adj: List[Dict[int, int]]) -> List[int]:
+    labels = list(range(len(adj)))
+    for _ in range(LABEL_ROUNDS):
+        changed = False
+        for v, nbrs in enumerate(adj):
+            if not nbrs:
+                continue
+            weight: Dict[int, int] = {}
+            for w, c in nbrs.items():
+                weight[labels[w]] = weight.get(labels[w], 0) + c
+            best = max(weight.values())
+            if weight.get(labels[v]) == best:
+                continue
+            labels[v] = min(lab for lab, c in weight.items() if c == best)
+            changed = True
+        if not changed:
+            break
+    ids: Dict[int, int] = {}
+    return [ids.setdefault(lab, len(ids)) for lab in labels]
+
+
+def _compute(G: CompactGraph) -> Dict[str, Any]:
+    adj = _adjacency(G)
+    n, m = G.number_of_nodes(), G.number_of_edges()
+    possible = n * (n - 1) if G.directed else n * (n - 1) / 2
+    result: Dict[str, Any] = {
+        "degree": [round(d, 6) for d in _degree(adj, G.directed)],
+        "betweenness": [round(b, 6) for b in _betweenness(adj, G.directed)],
+        "summary": {
+            "n_nodes": n,
+            "n_edges": m,
+            "density": round(m / possible, 6) if possible else 0.0,
+        },
+    }
+    if not G.directed:
+        result["community"] = _communities(adj)
+        result["summary"]["n_communities"] = len(set(result["community"]))
+    return result
+
+
+def network_metrics(G: CompactGraph, cache_dir: Optional[Path] = None) -> Dict[str, Any]:
+    """Metrics for G (see module docstring), from cache when the graph is unchanged."""
+    key = graph_key(G)
+    if cache_dir is not None:
+        _used.append(key)
+    cached = _memo.get(key)
+    if cached is not None:
+        _memo.move_to_end(key)
+        return cached
+    text = play_cache.load(cache_dir, "metrics", key) if cache_dir is not None else None
+    if text is not None:
+        result = json.loads(text)
+    else:
+        result = _compute(G)
+        if cache_dir is not None:
+            play_cache.store(cache_dir, "metrics", key, json.dumps(result))
+    _memo[key] = result
+    if len(_memo) > MEMO_SIZE:
+        _memo.popitem(last=False)
+    return result
+
+
+def take_used_keys() -> List[str]:
+    """Keys network_metrics looked up with a cache_dir since the last call."""
+    keys = _used[:]
+    del _used[:]
+    return keys
@@ -1,26 +1,61 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import re
+import sys
+from functools import lru_cache
 from pathlib import Path
 from itertools import combinations
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
-import networkx as nx
+from compact_graph import CompactGraph
+from graph_metrics import network_metrics
+from json_writer import fragment, read_head_value, write_plays_json
+from scene_kernels import pair_runs, prefix_sums, transition_counts
 
 # Base gender map
 # ---------------------------------------------------------------------------
 # 1. Normalisering av navn
 # ---------------------------------------------------------------------------
 
+NAME_CACHE_SIZE = 1 << 16
+_TRAILING_RE = re.compile(r"[.\s]+$")
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
 def normalize_name(name: str | None) -> str | None:
     if not name:
         return None
     name = name.split(",")[0]
-    name = re.sub(r"[.\s]+$", "", name)
+    name = _TRAILING_RE.sub("", name)
     name = " ".join(name.split())
     name = name.title()
-    return name
+    return sys.intern(name)
+
+
+# Talerregister: normaliserte navn får faste heltalls-id-er (per prosess),
+# delt av alle byggerne under.
+SPEAKER_IDS: Dict[str, int] = {}
+SPEAKER_NAMES: List[str] = []
+
+
+def speaker_id(name: str) -> int:
+    sid = SPEAKER_IDS.get(name)
+    if sid is None:
+        sid = len(SPEAKER_NAMES)
+        SPEAKER_IDS[name] = sid
+        SPEAKER_NAMES.append(name)
+    return sid
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def speaker_of(raw: str | None) -> int | None:
+    """Normalisert taler-id for et rått navn fra TEI, eller None."""
+    name = normalize_name(raw)
+    if not name:
+        return None
+    return speaker_id(name)
 
 # Optional external ground truth
 ROOT = Path(__file__).resolve().parents[2]
@@ -42,17 +77,17 @@ def _parse_gender_value(v):
     return None
 
 
-def _load_gender_file():
+def _load_gender_file(path: Path = GENDER_FILE):
     """
     Supports flat or per-play structure:
     - {"Name": "F", "Other": "M"}
     - {"Play_ID": {"Name": "F", "Other": "M"}}
     Values: "M" | "F" | "U" (or booleans, True=F, False=M).
     """
-    if not GENDER_FILE.exists():
+    if not path.exists():
         return {}, {}
     try:
-        raw = json.loads(GENDER_FILE.read_text(encoding="utf-8"))
+        raw = json.loads(path.read_text(encoding="utf-8"))
     except Exception:
         return {}, {}
 
@@ -85,73 +120,154 @@ def _load_gender_file():
 
     return global_map, per_play
 
-# Merge in FEMALE_CHARACTERS from existing public/output ibsen_networks.json if present
-def _load_public_gender():
-    candidates = [
-        ROOT / "public" / "ibsen_networks.json",
-        ROOT / "data" / "output" / "ibsen_networks.json",
-    ]
-    merged = {}
-    for path in candidates:
-        if path.exists():
-            try:
-                data = json.loads(path.read_text(encoding="utf-8"))
-                raw = data.get("FEMALE_CHARACTERS", {})
-                for k, v in raw.items():
-                    nk = normalize_name(k)
-                    if nk:
-                        merged[nk] = bool(v)
-            except Exception:
-                continue
-    return merged
+# FEMALE_CHARACTERS from an earlier export (public/ or data/output/), if present
+PUBLIC_GENDER_FILES = (
+    ROOT / "public" / "ibsen_networks.json",
+    ROOT / "data" / "output" / "ibsen_networks.json",
+)
 
-# Build gender maps
-_flat_gender, _per_play_gender = _load_gender_file()
-FEMALE_CHARACTERS: Dict[str, bool] = {}
-GENDER_PER_PLAY: Dict[str, Dict[str, bool]] = {}
 
-FEMALE_CHARACTERS.update(_load_public_gender())
-FEMALE_CHARACTERS.update(_flat_gender)
-GENDER_PER_PLAY.update(_per_play_gender)
+def _load_public_gender(path: Path) -> Dict[str, bool]:
+    # only the head key is read, not the plays after it
+    try:
+        raw = read_head_value(path, "FEMALE_CHARACTERS")
+    except Exception:
+        return {}
+    merged = {}
+    if isinstance(raw, dict):
+        for k, v in raw.items():
+            nk = normalize_name(k)
+            if nk:
+                merged[nk] = bool(v)
+    return merged
 
 
+def _file_stamp(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
 
-# ---------------------------------------------------------------------------
-# 2. Kjønnstabell – lastes fra eksisterende ibsen_networks.json hvis mulig
-# ---------------------------------------------------------------------------
 
-def _load_female_characters_from_existing(path: str = "ibsen_networks.json") -> Dict[str, bool]:
+class GenderMaps:
     """
-    Prøver å hente FEMALE_CHARACTERS fra en eksisterende ibsen_networks.json.
-    Hvis filen ikke finnes eller ikke har feltet, returneres en tom dict.
+    FEMALE_CHARACTERS and GENDER_PER_PLAY, loaded on first use instead of at
+    import. Each source file is cached by (mtime, size); refresh() re-reads
+    only the files that changed and updates both dicts in place, so
+    references handed out earlier stay current.
     """
-    try:
-        with open(path, encoding="utf-8") as f:
-            data = json.load(f)
-        raw = data.get("FEMALE_CHARACTERS", {})
-        return {str(k): bool(v) for k, v in raw.items()}
-    except FileNotFoundError:
-        return {}
-    except Exception:
-        return {}
 
+    def __init__(self, gender_file: Path = GENDER_FILE, public_files: Iterable[Path] = PUBLIC_GENDER_FILES) -> None:
+        self.gender_file = gender_file
+        self.public_files = tuple(public_files)
+        self.female: Dict[str, bool] = {}
+        self.per_play: Dict[str, Dict[str, bool]] = {}
+        self.loaded = False
+        self._files: Dict[Path, Tuple[Optional[Tuple[int, int]], Any]] = {}
+
+    def _cached(self, path: Path, load: Callable[[Path], Any]) -> Any:
+        stamp = _file_stamp(path)
+        entry = self._files.get(path)
+        if entry is None or entry[0] != stamp:
+            entry = self._files[path] = (stamp, load(path))
+        return entry[1]
+
+    def refresh(self) -> bool:
+        """Reload changed source files; True if the maps changed."""
+        female: Dict[str, bool] = {}
+        for path in self.public_files:
+            female.update(self._cached(path, _load_public_gender))
+        flat, per_play = self._cached(self.gender_file, _load_gender_file)
+        female.update(flat)
+        first = not self.loaded
+        self.loaded = True
+        if female == self.female and per_play == self.per_play:
+            return first
+        self.female.clear()
+        self.female.update(female)
+        self.per_play.clear()
+        self.per_play.update(per_play)
+        reset_gender_codes()
+        return True
+
+    def load(self) -> "GenderMaps":
+        if not self.loaded:
+            self.refresh()
+        return self
+
+
+GENDER = GenderMaps()
+
+
+def female_characters() -> Dict[str, bool]:
+    return GENDER.load().female
+
+
+def gender_per_play() -> Dict[str, Dict[str, bool]]:
+    return GENDER.load().per_play
+
+
+def __getattr__(name: str) -> Any:
+    # FEMALE_CHARACTERS / GENDER_PER_PLAY as module attributes, loaded lazily
+    if name == "FEMALE_CHARACTERS":
+        return female_characters()
+    if name == "GENDER_PER_PLAY":
+        return gender_per_play()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-#FEMALE_CHARACTERS: Dict[str, bool] = _load_female_characters_from_existing()
 
+# ---------------------------------------------------------------------------
+# 2. Kjønnsoppslag (tabellene lastes av GENDER over)
+# ---------------------------------------------------------------------------
 
 def gender_of(name: str, play_id: Optional[str] = None) -> str:
     """
     Gir 'F', 'M' eller '?' basert på per-stykke mapping først, deretter global.
     """
-    if play_id and play_id in GENDER_PER_PLAY:
-        lookup = GENDER_PER_PLAY.get(play_id, {})
+    maps = GENDER.load()
+    if play_id and play_id in maps.per_play:
+        lookup = maps.per_play[play_id]
         if name in lookup:
             return "F" if lookup[name] else "M"
-    if name in FEMALE_CHARACTERS:
-        return "F" if FEMALE_CHARACTERS[name] else "M"
+    if name in maps.female:
+        return "F" if maps.female[name] else "M"
     return "?"
 
 
+_GENDER_CODES: Dict[Optional[str], Dict[int, str]] = {}
+
+
+def gender_code(sid: int, play_id: Optional[str] = None) -> str:
+    """
+    gender_of for en taler-id, regnet ut én gang per (stykke, taler).
+    GENDER.refresh() nullstiller dem når kjønnstabellene endres.
+    """
+    codes = _GENDER_CODES.setdefault(play_id, {})
+    code = codes.get(sid)
+    if code is None:
+        code = gender_of(SPEAKER_NAMES[sid], play_id)
+        codes[sid] = code
+    return code
+
+
+def reset_gender_codes() -> None:
+    _GENDER_CODES.clear()
+
+
+def gender_fingerprint(play_id: Optional[str] = None) -> str:
+    """
+    Hash av kjønnsdataene som påvirker eksporten av ett stykke (global
+    FEMALE_CHARACTERS + evt. per-stykke mapping). Brukes som cache-nøkkel.
+    """
+    payload = json.dumps(
+        [female_characters(), gender_per_play().get(play_id or "", {})],
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
 # ---------------------------------------------------------------------------
 # 3. Enkel ordtelling og pronomen
 # ---------------------------------------------------------------------------
@@ -170,92 +286,91 @@ def count_words(text: str | None) -> int:
 # 4. Globalt talenettverk per stykke + transitions
 # ---------------------------------------------------------------------------
 
+SPEECH_ATTRS = ("count", "len_A_sum", "len_B_sum")
+
+
+def speech_graph() -> CompactGraph:
+    """Tomt rettet talenettverk (kanter: count, len_A_sum, len_B_sum)."""
+    return CompactGraph(directed=True, attrs=SPEECH_ATTRS, labels=SPEAKER_NAMES)
+
+
+def cooccurrence_graph() -> CompactGraph:
+    """Tomt urettet co-occurrence-nettverk (kanter: weight)."""
+    return CompactGraph(directed=False, attrs=("weight",), labels=SPEAKER_NAMES)
+
+
+def _add_transitions(
+    G: CompactGraph,
+    speakers: List[int],
+    counts: Dict[Tuple[int, int], List[int]],
+) -> None:
+    """
+    Legg en scenes transition_counts inn i G. Alle talere i en scene med
+    minst to replikker blir noder (også ved rene selv-loops).
+    """
+    if len(speakers) < 2:
+        return
+    for s in dict.fromkeys(speakers):
+        G.add_node(s)
+    for (a, b), (c, len_a, len_b) in counts.items():
+        G.add_edge(a, b, c, len_a, len_b)
+
+
+def _scene_sequence(scene: Dict[str, Any]) -> Tuple[List[int], List[int]]:
+    speakers: List[int] = []
+    lengths: List[int] = []
+    for sp in scene.get("speeches", []):
+        speaker = speaker_of(sp.get("speaker"))
+        if speaker is None:
+            continue
+        length = sp.get("length")
+        if length is None:
+            length = count_words(sp.get("text", "") or "")
+        speakers.append(speaker)
+        lengths.append(length)
+    return speakers, lengths
+
+
 def build_speech_network_and_transitions(
     play: Dict[str, Any], play_id: Optional[str] = None
-) -> Tuple[nx.DiGraph, List[Dict[str, Any]]]:
+) -> Tuple[CompactGraph, List[Dict[str, Any]]]:
     """
     Bygg et rettet talenettverk for ett stykke + liste med transitions.
+    Noder er taler-id-er; bruk .to_networkx() for en nx.DiGraph med navn.
     """
-    G = nx.DiGraph()
+    G = speech_graph()
     transitions: List[Dict[str, Any]] = []
 
     for act in play.get("acts", []):
         act_n = act.get("act_n", "")
         for scene in act.get("scenes", []):
             scene_n = scene.get("scene_n", "")
-            speeches = scene.get("speeches", [])
             speakers_in_scene_raw = scene.get("speakers_in_scene", []) or []
 
             speakers_in_scene = sorted(
-                {
-                    normalize_name(s)
-                    for s in speakers_in_scene_raw
-                    if normalize_name(s)
-                }
+                {n for n in map(normalize_name, speakers_in_scene_raw) if n}
             )
 
-            seq: List[Dict[str, Any]] = []
-            for sp in speeches:
-                raw_speaker = sp.get("speaker")
-                speaker = normalize_name(raw_speaker)
-                if not speaker:
-                    continue
-
-                text = sp.get("text", "") or ""
-                length = sp.get("length")
-                if length is None:
-                    length = count_words(text)
-
-                seq.append({"speaker": speaker, "length": length})
+            speakers, lengths = _scene_sequence(scene)
+            _add_transitions(G, speakers, transition_counts(speakers, lengths))
 
-            if len(seq) < 2:
-                continue
-
-            for i in range(len(seq) - 1):
-                a = seq[i]["speaker"]
-                b = seq[i + 1]["speaker"]
-                len_a = seq[i]["length"]
-                len_b = seq[i + 1]["length"]
-
-                if not a or not b:
-                    continue
-
-                if not G.has_node(a):
-                    G.add_node(a)
-                if not G.has_node(b):
-                    G.add_node(b)
-
-                if G.has_edge(a, b):
-                    G[a][b]["count"] += 1
-                    G[a][b]["len_A_sum"] += len_a
-                    G[a][b]["len_B_sum"] += len_b
-                else:
-                    G.add_edge(
-                        a,
-                        b,
-                        count=1,
-                        len_A_sum=len_a,
-                        len_B_sum=len_b,
-                    )
-
-                transitions.append(
-                    {
-                        "play": play.get("title", ""),
-                        "act": act_n,
-                        "scene": scene_n,
-                        "pos_in_scene": i,
-                        "current_speaker": a,
-                        "next_speaker": b,
-                        "len_current": len_a,
-                        "len_next": len_b,
-                        "scene_speakers": speakers_in_scene,
-                    }
+            names = [SPEAKER_NAMES[sid] for sid in speakers]
+            transitions.extend(
+                {
+                    "play": play.get("title", ""),
+                    "act": act_n,
+                    "scene": scene_n,
+                    "pos_in_scene": i,
+                    "current_speaker": a,
+                    "next_speaker": b,
+                    "len_current": len_a,
+                    "len_next": len_b,
+                    "scene_speakers": speakers_in_scene,
+                }
+                for i, (a, b, len_a, len_b) in enumerate(
+                    zip(names, names[1:], lengths, lengths[1:])
                 )
-
-    # fjern selv-loops
-    loops = [(u, v) for u, v in G.edges() if u == v]
-    if loops:
-        G.remove_edges_from(loops)
+            )
 
     return G, transitions
 
@@ -288,31 +403,29 @@ def build_scene_turns(play: Dict[str, Any]) -> List[Dict[str, Any]]:
 # 5. Globalt co-occurrence-nettverk per stykke
 # ---------------------------------------------------------------------------
 
-def build_cooccurrence_network(play: Dict[str, Any]) -> nx.Graph:
-    G = nx.Graph()
+def _scene_cast(scene: Dict[str, Any]) -> List[int]:
+    speakers_raw = scene.get("speakers_in_scene", []) or []
+    return sorted(
+        {sid for sid in map(speaker_of, speakers_raw) if sid is not None},
+        key=SPEAKER_NAMES.__getitem__,
+    )
 
-    for act in play.get("acts", []):
-        for scene in act.get("scenes", []):
-            speakers_raw = scene.get("speakers_in_scene", []) or []
-            speakers = sorted(
-                {
-                    normalize_name(s)
-                    for s in speakers_raw
-                    if normalize_name(s)
-                }
-            )
-            if len(speakers) < 2:
-                continue
 
-            for s in speakers:
-                if not G.has_node(s):
-                    G.add_node(s)
+def _add_cooccurrence(G: CompactGraph, speakers: List[int]) -> None:
+    for s in speakers:
+        G.add_node(s)
+    for a, b in combinations(speakers, 2):
+        G.add_edge(a, b, 1)
 
-            for a, b in combinations(speakers, 2):
-                if G.has_edge(a, b):
-                    G[a][b]["weight"] += 1
-                else:
-                    G.add_edge(a, b, weight=1)
+
+def build_cooccurrence_network(play: Dict[str, Any]) -> CompactGraph:
+    G = cooccurrence_graph()
+
+    for act in play.get("acts", []):
+        for scene in act.get("scenes", []):
+            speakers = _scene_cast(scene)
+            if len(speakers) >= 2:
+                _add_cooccurrence(G, speakers)
 
     return G
 
@@ -321,56 +434,12 @@ def build_cooccurrence_network(play: Dict[str, Any]) -> nx.Graph:
 # 6. Talenettverk per akt
 # ---------------------------------------------------------------------------
 
-def build_speech_network_for_act(act: Dict[str, Any]) -> nx.DiGraph:
-    G = nx.DiGraph()
+def build_speech_network_for_act(act: Dict[str, Any]) -> CompactGraph:
+    G = speech_graph()
 
     for scene in act.get("scenes", []):
-        speeches = scene.get("speeches", [])
-
-        seq: List[Dict[str, Any]] = []
-        for sp in speeches:
-            speaker = normalize_name(sp.get("speaker"))
-            if not speaker:
-                continue
-            text = sp.get("text", "") or ""
-            length = sp.get("length")
-            if length is None:
-                length = count_words(text)
-            seq.append({"speaker": speaker, "length": length})
-
-        if len(seq) < 2:
-            continue
-
-        for i in range(len(seq) - 1):
-            a = seq[i]["speaker"]
-            b = seq[i + 1]["speaker"]
-            len_a = seq[i]["length"]
-            len_b = seq[i + 1]["length"]
-
-            if not a or not b:
-                continue
-
-            if not G.has_node(a):
-                G.add_node(a)
-            if not G.has_node(b):
-                G.add_node(b)
-
-            if G.has_edge(a, b):
-                G[a][b]["count"] += 1
-                G[a][b]["len_A_sum"] += len_a
-                G[a][b]["len_B_sum"] += len_b
-            else:
-                G.add_edge(
-                    a,
-                    b,
-                    count=1,
-                    len_A_sum=len_a,
-                    len_B_sum=len_b,
-                )
-
-    loops = [(u, v) for u, v in G.edges() if u == v]
-    if loops:
-        G.remove_edges_from(loops)
+        speakers, lengths = _scene_sequence(scene)
+        _add_transitions(G, speakers, transition_counts(speakers, lengths))
 
     return G
 
@@ -409,6 +478,50 @@ def compute_word_counts(
 # 8. Dialoger (KQ)^n
 # ---------------------------------------------------------------------------
 
+def _pronoun_counts(tokens: List[str]) -> Tuple[int, int]:
+    male_pron = 0
+    female_pron = 0
+    for tok in tokens:
+        t = tok.lower()
+        if t in MALE_PRONOUNS:
+            male_pron += 1
+        elif t in FEMALE_PRONOUNS:
+            female_pron += 1
+    return male_pron, female_pron
+
+
+def _dialog_record(
+    play_title: str,
+    act_n: str,
+    scene_n: str,
+    A: str,
+    B: str,
+    start: int,
+    end: int,
+    male_pron: int,
+    female_pron: int,
+    total_words: int,
+) -> Dict[str, Any]:
+    female = female_characters()
+    female_pair = (
+        female.get(A, False)
+        and female.get(B, False)
+    )
+    return {
+        "play": play_title,
+        "act": act_n,
+        "scene": scene_n,
+        "speakers": [A, B],
+        "length": end - start + 1,
+        "start_index": start,
+        "end_index": end,
+        "male_pron": male_pron,
+        "female_pron": female_pron,
+        "total_words": total_words,
+        "female_pair": bool(female_pair),
+    }
+
+
 def _find_pair_dialogs_in_scene(
     seq: List[Dict[str, Any]],
     play_title: str,
@@ -417,69 +530,35 @@ def _find_pair_dialogs_in_scene(
     min_len: int = 4,
 ) -> List[Dict[str, Any]]:
     dialogs: List[Dict[str, Any]] = []
-
     speakers = [x["speaker"] for x in seq]
-    n = len(speakers)
-    i = 0
-
-    while i < n - 1:
-        a = speakers[i]
-        b = speakers[i + 1]
-        if not a or not b or a == b:
-            i += 1
-            continue
-
-        A, B = a, b
-        idxs = [i, i + 1]
-        j = i + 2
-
-        while j < n:
-            s = speakers[j]
-            if s not in (A, B):
-                break
-            if s == speakers[j - 1]:
-                break
-            idxs.append(j)
-            j += 1
-
-        if len(idxs) >= min_len:
-            male_pron = 0
-            female_pron = 0
-            total_words = 0
-
-            for k in idxs:
-                text = seq[k].get("text", "") or ""
-                tokens = WORD_RE.findall(text)
-                total_words += len(tokens)
-                for tok in tokens:
-                    t = tok.lower()
-                    if t in MALE_PRONOUNS:
-                        male_pron += 1
-                    elif t in FEMALE_PRONOUNS:
-                        female_pron += 1
-
-            female_pair = (
-                FEMALE_CHARACTERS.get(A, False)
-                and FEMALE_CHARACTERS.get(B, False)
-            )
 
-            dialogs.append(
-                {
-                    "play": play_title,
-                    "act": act_n,
-                    "scene": scene_n,
-                    "speakers": [A, B],
-                    "length": len(idxs),
-                    "start_index": idxs[0],
-                    "end_index": idxs[-1],
-                    "male_pron": male_pron,
-                    "female_pron": female_pron,
-                    "total_words": total_words,
-                    "female_pair": bool(female_pair),
-                }
+    for start, end in pair_runs(speakers, min_len):
+        male_pron = 0
+        female_pron = 0
+        total_words = 0
+
+        for k in range(start, end + 1):
+            text = seq[k].get("text", "") or ""
+            tokens = WORD_RE.findall(text)
+            total_words += len(tokens)
+            m, f = _pronoun_counts(tokens)
+            male_pron += m
+            female_pron += f
+
+        dialogs.append(
+            _dialog_record(
+                play_title,
+                act_n,
+                scene_n,
+                speakers[start],
+                speakers[start + 1],
+                start,
+                end,
+                male_pron,
+                female_pron,
+                total_words,
             )
-
-        i = max(i + 1, j - 1)
+        )
 
     return dialogs
 
@@ -548,182 +627,267 @@ def summarize_bechdel(dialogs: List[Dict[str, Any]]) -> Dict[str, Any]:
 
 
 # ---------------------------------------------------------------------------
-# 10. Eksport til ibsen_networks.json
+# 10. Samlet analyse – én gjennomgang per stykke
 # ---------------------------------------------------------------------------
+#
+# analyze_play går gjennom akter/scener/replikker én gang, slår opp hver
+# taler i talerregisteret (speaker_of) og tokeniserer hver replikk én gang, og
+# fyller akkumulatorer for alt export_play trenger. Alt er nøklet på taler-id,
+# og grafene er de samme CompactGraph-ene som byggerne over bruker.
+
+def _speech_edges(G: CompactGraph) -> List[Dict[str, Any]]:
+    return [
+        {
+            "source": SPEAKER_NAMES[u],
+            "target": SPEAKER_NAMES[v],
+            "count": c,
+            "avg_len_A": len_A_sum / c if c else 0.0,
+            "avg_len_B": len_B_sum / c if c else 0.0,
+        }
+        for u, v, (c, len_A_sum, len_B_sum) in G.edges()
+    ]
 
-def export_ibsen_networks(
-    all_plays: List[Dict[str, Any]],
-    outfile: str = "ibsen_networks.json",
-) -> str:
-    """
-    Bygg:
-    - talenettverk per stykke
-    - co-occurrence per stykke
-    - talenettverk per akt
-    - ordtelling (akt + stykke)
-    - dialoger (KQ)^n
-    - Bechdel-aggregat
 
-    og skriv alt til én JSON-fil med FEMALE_CHARACTERS på toppnivå.
+def _co_edges(G: CompactGraph) -> List[Dict[str, Any]]:
+    return [
+        {"source": SPEAKER_NAMES[u], "target": SPEAKER_NAMES[v], "weight": weight}
+        for u, v, (weight,) in G.edges()
+    ]
+
+
+def _sorted_word_counts(counts: Dict[int, int]) -> List[Dict[str, Any]]:
+    return [
+        {"character": c, "words": w}
+        for c, w in sorted(
+            ((SPEAKER_NAMES[sid], w) for sid, w in counts.items()),
+            key=lambda x: (-x[1], x[0]),
+        )
+    ]
+
+
+def analyze_play(play: Dict[str, Any], min_len: int = 4) -> Dict[str, Any]:
     """
-    export: Dict[str, Any] = {
-        "FEMALE_CHARACTERS": FEMALE_CHARACTERS,
-        "plays": [],
-    }
+    Fylt i én gjennomgang:
+    Alle talere er id-er fra speaker_of (navn i SPEAKER_NAMES).
+    - speech: globalt talenettverk (CompactGraph, se speech_graph)
+    - co: co-occurrence (CompactGraph, se cooccurrence_graph)
+    - acts: per akt {"act_n", "speech"}
+    - play_counts / act_counts: ordtelling
+    - dialogs: (KQ)^n-dialoger med pronomentelling
+    - scene_turns
+    """
+    title = play.get("title", "")
+
+    speech = speech_graph()
+    co = cooccurrence_graph()
+    acts: List[Dict[str, Any]] = []
+    play_counts: Dict[int, int] = {}
+    act_counts: Dict[str, Dict[int, int]] = {}
+    dialogs: List[Dict[str, Any]] = []
+    scene_turns: List[Dict[str, Any]] = []
 
-    for play in all_plays:
-        title = play.get("title", "")
-        play_id = title
+    for act in play.get("acts", []):
+        act_n = str(act.get("act_n", ""))
+        act_speech = speech_graph()
+        acts.append({"act_n": act_n, "speech": act_speech})
+        act_wc = act_counts.setdefault(act_n, {})
 
-        # talenettverk (globalt)
-        G_speech, _transitions = build_speech_network_and_transitions(play, play_id)
+        for scene in act.get("scenes", []):
+            scene_n = str(scene.get("scene_n", ""))
 
-        speech_nodes = [
-            {"id": n, "gender": gender_of(n, play_id)}
-            for n in G_speech.nodes()
-        ]
-        speech_edges: List[Dict[str, Any]] = []
-        for u, v, d in G_speech.edges(data=True):
-            c = d.get("count", 1)
-            len_A_sum = d.get("len_A_sum", 0)
-            len_B_sum = d.get("len_B_sum", 0)
-            speech_edges.append(
-                {
-                    "source": u,
-                    "target": v,
-                    "count": c,
-                    "avg_len_A": len_A_sum / c if c else 0.0,
-                    "avg_len_B": len_B_sum / c if c else 0.0,
-                }
-            )
+            cast = _scene_cast(scene)
+            if len(cast) >= 2:
+                _add_cooccurrence(co, cast)
 
-        # co-occurrence (globalt)
-        G_co = build_cooccurrence_network(play)
-        co_nodes = [
-            {"id": n, "gender": gender_of(n, play_id)}
-            for n in G_co.nodes()
-        ]
-        co_edges: List[Dict[str, Any]] = []
-        for u, v, d in G_co.edges(data=True):
-            co_edges.append(
+            speakers: List[int] = []
+            lengths: List[int] = []
+            words: List[int] = []
+            male: List[int] = []
+            female: List[int] = []
+            for sp in scene.get("speeches", []):
+                speaker = speaker_of(sp.get("speaker"))
+                if speaker is None:
+                    continue
+                tokens = WORD_RE.findall(sp.get("text", "") or "")
+                n_words = len(tokens)
+                length = sp.get("length")
+                if length is None:
+                    length = n_words
+                m, f = _pronoun_counts(tokens)
+
+                speakers.append(speaker)
+                lengths.append(length)
+                words.append(n_words)
+                male.append(m)
+                female.append(f)
+
+                if n_words:
+                    play_counts[speaker] = play_counts.get(speaker, 0) + n_words
+                    act_wc[speaker] = act_wc.get(speaker, 0) + n_words
+
+            if not speakers:
+                continue
+
+            scene_turns.append(
                 {
-                    "source": u,
-                    "target": v,
-                    "weight": d.get("weight", 1),
+                    "act": act_n,
+                    "scene": scene_n,
+                    "turns": [
+                        {"speaker": SPEAKER_NAMES[s], "words": int(n or 0)}
+                        for s, n in zip(speakers, lengths)
+                    ],
                 }
             )
 
-        # ordtelling
-        play_word_counts, act_word_counts = compute_word_counts(play)
-
-        # per-akt talenettverk + ordtelling
-        acts_export: List[Dict[str, Any]] = []
-        for act in play.get("acts", []):
-            act_n = str(act.get("act_n", ""))
-            G_act = build_speech_network_for_act(act)
-
-            act_nodes = [
-            {"id": n, "gender": gender_of(n, play_id)}
-                for n in G_act.nodes()
-            ]
-            act_edges: List[Dict[str, Any]] = []
-            for u, v, d in G_act.edges(data=True):
-                c = d.get("count", 1)
-                len_A_sum = d.get("len_A_sum", 0)
-                len_B_sum = d.get("len_B_sum", 0)
-                act_edges.append(
-                    {
-                        "source": u,
-                        "target": v,
-                        "count": c,
-                        "avg_len_A": len_A_sum / c if c else 0.0,
-                        "avg_len_B": len_B_sum / c if c else 0.0,
-                    }
-                )
+            counts = transition_counts(speakers, lengths)
+            _add_transitions(speech, speakers, counts)
+            _add_transitions(act_speech, speakers, counts)
 
-            act_wc_raw = act_word_counts.get(act_n, {})
-            act_wc = [
-                {"character": c, "words": w}
-                for c, w in sorted(
-                    act_wc_raw.items(),
-                    key=lambda x: (-x[1], x[0]),
+            runs = pair_runs(speakers, min_len)
+            if not runs:
+                continue
+            male_sum = prefix_sums(male)
+            female_sum = prefix_sums(female)
+            words_sum = prefix_sums(words)
+            for start, end in runs:
+                dialogs.append(
+                    _dialog_record(
+                        title,
+                        act_n,
+                        scene_n,
+                        SPEAKER_NAMES[speakers[start]],
+                        SPEAKER_NAMES[speakers[start + 1]],
+                        start,
+                        end,
+                        male_sum[end + 1] - male_sum[start],
+                        female_sum[end + 1] - female_sum[start],
+                        words_sum[end + 1] - words_sum[start],
+                    )
                 )
-            ]
 
-            acts_export.append(
-                {
-                    "act_n": act_n,
-                    "speech_network": {
-                        "nodes": act_nodes,
-                        "edges": act_edges,
-                    },
-                    "word_counts": act_wc,
-                }
-            )
+    return {
+        "speech": speech,
+        "co": co,
+        "acts": acts,
+        "play_counts": play_counts,
+        "act_counts": act_counts,
+        "dialogs": dialogs,
+        "scene_turns": scene_turns,
+    }
 
-        # dialoger + Bechdel
-        dialogs = compute_dialogs_for_play(play, min_len=4)
-        bechdel_info = summarize_bechdel(dialogs)
 
-        # spill-nivå ordtelling som liste
-        play_wc_list = [
-            {"character": c, "words": w}
-            for c, w in sorted(
-                play_word_counts.items(),
-                key=lambda x: (-x[1], x[0]),
-            )
-        ]
+# ---------------------------------------------------------------------------
+# 11. Eksport til ibsen_networks.json
+# ---------------------------------------------------------------------------
 
-        # akt-nivå ordtelling som dict[str, list]
-        act_wc_export: Dict[str, List[Dict[str, Any]]] = {}
-        for act_n, counts in act_word_counts.items():
-            act_wc_export[act_n] = [
-                {"character": c, "words": w}
-                for c, w in sorted(
-                    counts.items(),
-                    key=lambda x: (-x[1], x[0]),
-                )
-            ]
+# Økes når innholdet i export_play endres, slik at cachede blokker forkastes.
+EXPORT_VERSION = "2"
+
+# Settes av parse_tei.py: nettverksmålene caches da på disk (play_cache, "metrics").
+METRICS_CACHE_DIR: Optional[Path] = None
 
-        scene_turns = build_scene_turns(play)
 
-        export["plays"].append(
+def export_play(play: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Bygg eksportblokken for ett stykke fra analyze_play:
+    - talenettverk per stykke
+    - co-occurrence per stykke
+    - talenettverk per akt
+    - ordtelling (akt + stykke)
+    - dialoger (KQ)^n
+    - Bechdel-aggregat
+    Nodene har degree/betweenness (co-nettverket også community), og hvert
+    nettverk har en "metrics"-oppsummering (se graph_metrics.py).
+    """
+    title = play.get("title", "")
+    play_id = title
+    analysis = analyze_play(play, min_len=4)
+
+    def network(G: CompactGraph, edges: List[Dict[str, Any]]) -> Dict[str, Any]:
+        metrics = network_metrics(G, METRICS_CACHE_DIR)
+        nodes = [
             {
-                "id": play_id,
-                "title": title,
-                "speech_network": {
-                    "nodes": speech_nodes,
-                    "edges": speech_edges,
-                },
-                "co_network": {
-                    "nodes": co_nodes,
-                    "edges": co_edges,
-                },
-                "acts": acts_export,
-                "word_counts": play_wc_list,
-                "act_word_counts": act_wc_export,
-                "dialogs": dialogs,
-                "scene_turns": scene_turns,
-                "bechdel": bechdel_info,
+                "id": SPEAKER_NAMES[n],
+                "gender": gender_code(n, play_id),
+                "degree": metrics["degree"][i],
+                "betweenness": metrics["betweenness"][i],
             }
-        )
+            for i, n in enumerate(G.nodes)
+        ]
+        if "community" in metrics:
+            for node, community in zip(nodes, metrics["community"]):
+                node["community"] = community
+        return {"nodes": nodes, "edges": edges, "metrics": metrics["summary"]}
+
+    act_counts = analysis["act_counts"]
+    acts_export = [
+        {
+            "act_n": act["act_n"],
+            "speech_network": network(act["speech"], _speech_edges(act["speech"])),
+            "word_counts": _sorted_word_counts(act_counts.get(act["act_n"], {})),
+        }
+        for act in analysis["acts"]
+    ]
+
+    dialogs = analysis["dialogs"]
+
+    return {
+        "id": play_id,
+        "title": title,
+        "speech_network": network(analysis["speech"], _speech_edges(analysis["speech"])),
+        "co_network": network(analysis["co"], _co_edges(analysis["co"])),
+        "acts": acts_export,
+        "word_counts": _sorted_word_counts(analysis["play_counts"]),
+        "act_word_counts": {
+            act_n: _sorted_word_counts(counts)
+            for act_n, counts in act_counts.items()
+        },
+        "dialogs": dialogs,
+        "scene_turns": analysis["scene_turns"],
+        "bechdel": summarize_bechdel(dialogs),
+    }
 
-    with open(outfile, "w", encoding="utf-8") as f:
-        json.dump(export, f, ensure_ascii=False, indent=2)
 
+def export_ibsen_networks(
+    all_plays: List[Dict[str, Any]],
+    outfile: str = "ibsen_networks.json",
+) -> str:
+    """
+    Bygg export_play for hvert stykke og skriv alt til én JSON-fil med
+    FEMALE_CHARACTERS på toppnivå.
+    """
+    return write_networks_json(
+        (fragment(export_play(play)) for play in all_plays),
+        outfile,
+    )
+
+
+def write_networks_json(fragments: Iterable[str], outfile: str) -> str:
+    """
+    Skriv ferdigserialiserte eksportblokker (json_writer.fragment, f.eks. fra
+    cache) til ibsen_networks.json.
+    """
+    write_plays_json(outfile, fragments, head={"FEMALE_CHARACTERS": female_characters()})
     return outfile
 
 
 # ---------------------------------------------------------------------------
-# 11. Hjelpefunksjon for å lese parsed-data + CLI
+# 12. Hjelpefunksjon for å lese parsed-data + CLI
 # ---------------------------------------------------------------------------
 
-def load_parsed(path: str = "ibsen_parsed.json") -> List[Dict[str, Any]]:
+def load_parsed(path: str = "ibsen_parsed.json") -> Dict[str, Any]:
+    """Les ibsen_parsed.json (eller ibsen_speeches.bin) som {"plays": [...]}."""
+    if str(path).endswith(".bin"):
+        # kolonnetabellen fra speech_table.py (ibsen_speeches.bin)
+        from speech_table import SpeechTable
+
+        with SpeechTable(path) as table:
+            return {"plays": table.to_nested()}
     with open(path, encoding="utf-8") as f:
         return json.load(f)
 
 
 if __name__ == "__main__":
-    plays = load_parsed("ibsen_parsed.json")
+    plays = load_parsed("ibsen_parsed.json")["plays"]
     out = export_ibsen_networks(plays, "ibsen_networks.json")
     print("Skrev:", out)
@@ -0,0 +1,140 @@
+"""
+Writer for the {"...": ..., "plays": [...]} JSON files produced by the
+pipeline (ibsen_parsed.json, ibsen_networks.json).
+
+Plays are passed in one at a time as pre-serialized fragments (see
+`fragment`), so each play can be written and released as soon as it is
+done, and cached plays are written without encoding them again. The output
+is byte-identical to json.dump(obj, ensure_ascii=False, indent=2). The file
+is written next to the target as .<name>.tmp and renamed over it on close(),
+so readers (and a build that fails halfway) only ever see a complete file.
+
+read_head_value reads one top-level key back without loading the plays.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Union
+
+
+def fragment(obj: Any) -> str:
+    """Serialize one play at top level; PlaysJsonWriter re-indents it."""
+    return json.dumps(obj, ensure_ascii=False, indent=2)
+
+
+class PlaysJsonWriter:
+    """Incremental writer: head keys first, then one play fragment per add()."""
+
+    def __init__(self, path: Union[str, Path], head: Optional[Dict[str, Any]] = None) -> None:
+        self.path = Path(path)
+        self.tmp = self.path.with_name(f".{self.path.name}.tmp")
+        self.f = open(self.tmp, "w", encoding="utf-8")
+        self.count = 0
+        self.f.write("{\n")
+        for key, value in (head or {}).items():
+            self.f.write(f"  {json.dumps(key, ensure_ascii=False)}: ")
+            self.f.write(fragment(value).replace("\n", "\n  "))
+            self.f.write(",\n")
+        self.f.write('  "plays": [')
+
+    def add(self, frag: str) -> None:
+        self.f.write("\n    " if not self.count else ",\n    ")
+        self.f.write(frag.replace("\n", "\n    "))
+        self.count += 1
+
+    def close(self) -> None:
+        if self.f.closed:
+            return
+        self.f.write("]" if not self.count else "\n  ]")
+        self.f.write("\n}")
+        self.f.close()
+        os.replace(self.tmp, self.path)
+
+    def __enter__(self) -> "PlaysJsonWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, *exc: Any) -> None:
+        if exc_type is not None:
+            # keep the previous file; drop the partial one
+            self.f.close()
+            self.tmp.unlink(missing_ok=True)
+            return
+        self.close()
+
+
+def write_plays_json(
+    path: Union[str, Path],
+    fragments: Iterable[str],
+    head: Optional[Dict[str, Any]] = None,
+) -> None:
+    with PlaysJsonWriter(path, head) as out:
+        for frag in fragments:
+            out.add(frag)
+
+
+_DECODER = json.JSONDecoder()
+_WS = " \t\n\r"
+
+
+def read_head_value(path: Union[str, Path], key: str, chunk_size: int = 1 << 16) -> Any:
+    """
+    Value of the top-level `key` of a JSON object file, read incrementally:
+    only the file up to the end of that value is read and decoded, so a head
+    key written by PlaysJsonWriter costs one small read. Raises KeyError if
+    the key is missing and ValueError if the file is not a JSON object.
+    """
+    with open(path, encoding="utf-8") as f:
+        buf = ""
+        pos = 0
+        eof = False
+
+        def more() -> bool:
+            nonlocal buf, pos, chunk_size, eof
+            data = f.read(chunk_size)
+            chunk_size *= 2
+            buf, pos = buf[pos:] + data, 0
+            eof = not data
+            return not eof
+
+        def skip_ws() -> str:
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in _WS:
+                    pos += 1
+                if pos < len(buf):
+                    return buf[pos]
+                if not more():
+                    raise ValueError(f"Unexpected end of JSON in {path}")
+
+        def decode() -> Any:
+            nonlocal pos
+            while True:
+                try:
+                    value, end = _DECODER.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    # usually a value cut off by the end of the buffer
+                    if not more():
+                        raise
+                    continue
+                # a number ending the buffer may continue in the next chunk
+                if end < len(buf) or eof:
+                    pos = end
+                    return value
+                more()
+
+        if skip_ws() != "{":
+            raise ValueError(f"Not a JSON object: {path}")
+        pos += 1
+        while skip_ws() != "}":
+            name = decode()
+            if skip_ws() != ":":
+                raise ValueError(f"Expected ':' after {name!r} in {path}")
+            pos += 1
+            skip_ws()
+            value = decode()
+            if name == key:
+                return value
+            if skip_ws() == ",":
+                pos += 1
+    raise KeyError(key)
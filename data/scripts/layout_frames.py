@@ -0,0 +1,298 @@
+"""
+Precomputed node positions for the animated player: a deterministic force
+layout stepped once per turn over an export block's scene_turns, so every
+client sees the same motion without simulating it in the browser.
+
+Per scene, as in the player, the nodes are the scene's speakers, starting on
+a circle sorted by name in Norwegian collation (collation_key, matching
+localeCompare(..., "nb") in computePositions in App.jsx). Each turn adds
+weight to the pair (previous speaker, speaker); weights decay per turn so
+recent exchanges pull hardest. A step then applies, to all nodes at once:
+
+- repulsion between every pair of nodes that have spoken in the scene so
+  far, REPEL * k^2 / d, where k is the spacing n nodes would have inside
+  the circle (scaled by K_SCALE); the others wait on their anchors
+- a spring along weighted pairs, ATTRACT * weight * d
+- a spring back towards the node's anchor on the circle, ANCHOR_PULL * d
+
+and moves each of those nodes at most MAX_STEP. Positions are quantized to integers on
+a GRID x GRID square.
+
+    layout/index.json     {"plays": {play_id: "<stem>.json", ...}}
+    layout/<stem>.json    one play
+
+Play file:
+
+    {"id": ..., "speakers": [name, ...], "grid": 1000, "keyframe": 16,
+     "scenes": [{"act": "1", "scene": "1",
+                 "nodes": [index into speakers, ...],
+                 "frames": [[x0, y0, x1, y1, ...], ...]}, ...]}
+
+frames[t] holds the positions after turn t of the scene. Every `keyframe`-th
+frame (t % keyframe == 0) is absolute, the others are deltas from the
+previous frame. Speaker indices are the same as in turn_chunks.py.
+decode_scene() gives the absolute frames.
+
+Layouts are cached by a hash of the scene turns (play_cache stage "layout").
+
+Run:
+    python data/scripts/layout_frames.py [ibsen_networks.json] [--out data/output/layout]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import play_cache
+from shards import copy_shards, dumps_compact, shard_filename
+
+LAYOUT_VERSION = "3"
+INDEX_NAME = "index.json"
+OUT_DIR = Path(__file__).resolve().parents[2] / "data" / "output"
+
+GRID = 1000
+KEYFRAME = 16
+RADIUS = 0.35 * GRID
+MARGIN = 0.02 * GRID
+MAX_STEP = 0.012 * GRID
+K_SCALE = 0.4
+REPEL = 0.05
+ATTRACT = 0.01
+ANCHOR_PULL = 0.05
+PAIR_DECAY = 0.9
+
+
+# Norwegian letters after z, with ä/ö as variants of æ/ø (the "nb" collation)
+_NB_LETTERS = {"æ": "{", "ä": "{", "ø": "|", "ö": "|", "å": "}"}
+
+
+def collation_key(name: str) -> Tuple[str, str, Tuple[bool, ...], str]:
+    """
+    Sort key approximating name.localeCompare(other, "nb") in App.jsx: letters
+    compared without case or accents, then accents, then lowercase before
+    uppercase. "aa" counts as å.
+    """
+    folded = name.casefold().replace("aa", "å")
+    primary = "".join(
+        _NB_LETTERS.get(ch) or "".join(c for c in unicodedata.normalize("NFD", ch) if not unicodedata.combining(c))
+        for ch in folded
+    )
+    # accents: NFD marks after the base letter, ä/ö sorting just after æ/ø
+    secondary = unicodedata.normalize("NFD", folded).replace("a\u0308", "æ\u0308").replace("o\u0308", "ø\u0308")
+    return primary, secondary, tuple(ch.isupper() for ch in name), name
+
+
+def _anchors(names: List[str]) -> List[Tuple[float, float]]:
+    n = len(names)
+    c = GRID / 2
+    order = sorted(range(n), key=lambda i: collation_key(names[i]))
+    anchors: List[Tuple[float, float]] = [(c, c)] * n
+    for rank, i in enumerate(order):
+        angle = 2 * math.pi * rank / n - math.pi / 2
+        # rounded so the start does not depend on the last bit of sin/cos
+        anchors[i] = (float(round(c + RADIUS * math.cos(angle))), float(round(c + RADIUS * math.sin(angle))))
+    return anchors
+
+
+def _step(
+    xs: List[float],
+    ys: List[float],
+    anchors: List[Tuple[float, float]],
+    active: List[int],
+    weights: Dict[Tuple[int, int], float],
+    k: float,
+    dx: List[float],
+    dy: List[float],
+) -> None:
+    """One step for the `active` nodes; dx/dy are scratch buffers of len(xs)."""
+    for i in active:
+        ax, ay = anchors[i]
+        dx[i] = (ax - xs[i]) * ANCHOR_PULL
+        dy[i] = (ay - ys[i]) * ANCHOR_PULL
+    k2, floor = REPEL * k * k, 0.01 * k * k
+    for a, i in enumerate(active):
+        xi, yi = xs[i], ys[i]
+        fx = fy = 0.0
+        for j in active[a + 1:]:
+            ex, ey = xi - xs[j], yi - ys[j]
+            d2 = ex * ex + ey * ey
+            f = k2 / (d2 if d2 > floor else floor)
+            fx += ex * f
+            fy += ey * f
+            dx[j] -= ex * f
+            dy[j] -= ey * f
+        dx[i] += fx
+        dy[i] += fy
+    for (i, j), w in weights.items():
+        ex, ey = xs[i] - xs[j], ys[i] - ys[j]
+        f = ATTRACT * w
+        dx[i] -= ex * f
+        dy[i] -= ey * f
+        dx[j] += ex * f
+        dy[j] += ey * f
+    lo, hi = MARGIN, GRID - MARGIN
+    for i in active:
+        d = math.sqrt(dx[i] * dx[i] + dy[i] * dy[i])
+        s = MAX_STEP / d if d > MAX_STEP else 1.0
+        xs[i] = min(hi, max(lo, xs[i] + dx[i] * s))
+        ys[i] = min(hi, max(lo, ys[i] + dy[i] * s))
+
+
+def layout_scene(names: List[str], turn_speakers: List[int]) -> List[List[int]]:
+    """Absolute quantized frames, one per turn, for node indices `turn_speakers` into `names`."""
+    n = len(names)
+    anchors = _anchors(names)
+    xs = [x for x, _y in anchors]
+    ys = [y for _x, y in anchors]
+    k = K_SCALE * RADIUS * math.sqrt(math.pi / max(n, 1))
+    weights: Dict[Tuple[int, int], float] = {}
+    active: List[int] = []
+    seen = [False] * n
+    dx = [0.0] * n
+    dy = [0.0] * n
+    frame = [v for x, y in anchors for v in (round(x), round(y))]
+    frames: List[List[int]] = []
+    prev: Optional[int] = None
+    for s in turn_speakers:
+        for pair in list(weights):
+            w = weights[pair] * PAIR_DECAY
+            if w < 0.01:
+                del weights[pair]
+            else:
+                weights[pair] = w
+        if prev is not None and prev != s:
+            pair = (prev, s) if prev < s else (s, prev)
+            weights[pair] = weights.get(pair, 0.0) + 1.0
+        prev = s
+        if not seen[s]:
+            seen[s] = True
+            active.append(s)
+        _step(xs, ys, anchors, active, weights, k, dx, dy)
+        # nodes that have not spoken yet stay on their anchors
+        frame = frame[:]
+        for i in active:
+            frame[2 * i] = round(xs[i])
+            frame[2 * i + 1] = round(ys[i])
+        frames.append(frame)
+    return frames
+
+
+def encode_frames(frames: List[List[int]], keyframe: int = KEYFRAME) -> List[List[int]]:
+    out = []
+    for t, frame in enumerate(frames):
+        if t % keyframe == 0:
+            out.append(frame)
+        else:
+            out.append([a - b for a, b in zip(frame, frames[t - 1])])
+    return out
+
+
+def decode_scene(scene: Dict[str, Any], keyframe: int = KEYFRAME) -> List[List[int]]:
+    frames: List[List[int]] = []
+    for t, frame in enumerate(scene["frames"]):
+        if t % keyframe == 0:
+            frames.append(list(frame))
+        else:
+            frames.append([a + b for a, b in zip(frames[-1], frame)])
+    return frames
+
+
+def layout_key(block: Dict[str, Any]) -> str:
+    h = hashlib.sha256(f"{LAYOUT_VERSION}\0{GRID}\0{KEYFRAME}\0".encode())
+    h.update(dumps_compact(block["scene_turns"]).encode("utf-8"))
+    return h.hexdigest()
+
+
+def layout_play(block: Dict[str, Any]) -> Dict[str, Any]:
+    """Layout file content for one export block (see module docstring)."""
+    speakers: Dict[str, int] = {}
+    scenes = []
+    for st in block["scene_turns"]:
+        turn_ids = [speakers.setdefault(t["speaker"], len(speakers)) for t in st["turns"]]
+        nodes = list(dict.fromkeys(turn_ids))
+        local = {s: i for i, s in enumerate(nodes)}
+        names = list(speakers)
+        frames = layout_scene([names[s] for s in nodes], [local[s] for s in turn_ids])
+        scenes.append({
+            "act": st["act"],
+            "scene": st["scene"],
+            "nodes": nodes,
+            "frames": encode_frames(frames),
+        })
+    return {
+        "id": block["id"],
+        "speakers": list(speakers),
+        "grid": GRID,
+        "keyframe": KEYFRAME,
+        "scenes": scenes,
+    }
+
+
+class LayoutWriter:
+    """Incremental writer: one layout file per add(), layout/index.json and cleanup on close()."""
+
+    def __init__(self, out_dir: Path, cache_dir: Optional[Path] = None) -> None:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        self.out_dir = out_dir
+        self.cache_dir = cache_dir
+        self.plays: Dict[str, str] = {}
+        self.written = {INDEX_NAME}
+        self.keys: List[str] = []
+        self.closed = False
+
+    def add(self, block: Dict[str, Any]) -> None:
+        file = shard_filename(block["id"])
+        if file in self.written:
+            raise ValueError(f"Layout name collision for play id {block['id']!r}: {file}")
+        key = layout_key(block)
+        text = play_cache.load(self.cache_dir, "layout", key) if self.cache_dir is not None else None
+        if text is None:
+            text = dumps_compact(layout_play(block))
+            if self.cache_dir is not None:
+                play_cache.store(self.cache_dir, "layout", key, text)
+        self.keys.append(key)
+        (self.out_dir / file).write_text(text, encoding="utf-8")
+        self.written.add(file)
+        self.plays[block["id"]] = file
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        (self.out_dir / INDEX_NAME).write_text(dumps_compact({"plays": self.plays}), encoding="utf-8")
+        for stale in self.out_dir.glob("*.json"):
+            if stale.name not in self.written:
+                stale.unlink()
+        if self.cache_dir is not None:
+            play_cache.prune(self.cache_dir, "layout", self.keys)
+
+    def __enter__(self) -> "LayoutWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, *exc: Any) -> None:
+        if exc_type is None:
+            self.close()
+
+
+# Same flat mirroring as the play shards.
+copy_layout = copy_shards
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("source", nargs="?", type=Path, default=OUT_DIR / "ibsen_networks.json")
+    parser.add_argument("--out", type=Path, default=OUT_DIR / "layout")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore cached layouts in data/output/cache")
+    args = parser.parse_args()
+
+    plays = json.loads(args.source.read_text(encoding="utf-8"))["plays"]
+    with LayoutWriter(args.out, None if args.no_cache else play_cache.CACHE_DIR) as writer:
+        for block in plays:
+            writer.add(block)
+    print(f"Wrote layout: {args.out / INDEX_NAME}")
@@ -5,10 +5,14 @@ ibsen_networks.json using ibsen_networks_acts.py.
 Layout (already present):
 - data/raw/plays/   # TEI XML input (added by user)
 - data/output/      # generated JSON
+- data/output/cache/  # content-hash cache of parsed/exported plays (--no-cache to bypass)
 - public/           # optional copy of final ibsen_networks.json
 
 Run:
     python data/scripts/parse_tei.py --copy-to-public
+    python data/scripts/parse_tei.py --copy-to-public --watch   # rebuild on edits
+    python data/scripts/parse_tei.py --xml-backend lxml        # needs lxml, same output
+    python data/scripts/parse_tei.py --check-backends           # compare the XML backends
 
 This parser is intentionally simple: it pulls acts/scenes/speeches with word
 counts, ignoring stage directions. It assumes TEI elements with default TEI
@@ -16,27 +20,66 @@ namespace and HIS extensions; adjust if source changes.
 """
 
 import argparse
+import importlib.util
 import json
+import os
 import re
 import sys
+import time
 import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import ExitStack
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
 
 ROOT = Path(__file__).resolve().parents[2]
 RAW_DIR = ROOT / "data" / "raw" / "plays"
 OUT_DIR = ROOT / "data" / "output"
 PUBLIC_JSON = ROOT / "public" / "ibsen_networks.json"
+PUBLIC_BIN = ROOT / "public" / "ibsen_networks.bin"
+PUBLIC_SHARDS = ROOT / "public" / "plays"
+PUBLIC_TURNS = ROOT / "public" / "turns"
+PUBLIC_LAYOUT = ROOT / "public" / "layout"
+PUBLIC_ARTIFACTS = ROOT / "public" / "data"
 
 # allow importing sibling script
 sys.path.append(str(Path(__file__).parent))
-from ibsen_networks_acts import export_ibsen_networks  # noqa: E402
+import ibsen_networks_acts  # noqa: E402
+import play_cache  # noqa: E402
+from artifacts import MANIFEST_NAME, publish, unpublish  # noqa: E402
+from binary_format import BinaryWriter  # noqa: E402
+from layout_frames import LayoutWriter, copy_layout  # noqa: E402
+from shards import ShardWriter, atomic_copy, copy_shards  # noqa: E402
+from speech_table import SpeechTable, SpeechTableWriter  # noqa: E402
+from token_index import build_token_index  # noqa: E402
+from turn_chunks import TurnChunkWriter, copy_turn_chunks  # noqa: E402
+from graph_metrics import take_used_keys  # noqa: E402
+from ibsen_networks_acts import (  # noqa: E402
+    EXPORT_VERSION,
+    export_play,
+    female_characters,
+    gender_fingerprint,
+)
+from json_writer import PlaysJsonWriter, fragment  # noqa: E402
+from profiling import DISABLED, StageProfiler, peak_rss_kb, timed_call  # noqa: E402
+
+# Bump when parse output changes so cached plays are re-parsed.
+PARSER_VERSION = "1"
 
 NS = {"tei": "http://www.tei-c.org/ns/1.0", "his": "http://www.example.org/ns/HIS"}
 WORD_RE = re.compile(r"\w+", re.UNICODE)
+SPEECH_TAGS = {"sp", "hisSp"}
+# left out of speech text (their tails are kept)
+SKIP_TAGS = frozenset({"speaker", "stage", "hisStage", "spOpener", "pb", "lb", "anchor", "note"})
+TEI_DIV = f"{{{NS['tei']}}}div"
 
 
+@lru_cache(maxsize=None)
 def local(tag: Optional[str]) -> str:
+    # a document has few distinct tags, so the split runs once per tag
     if not tag:
         return ""
     return tag.split("}")[-1]
@@ -51,8 +94,7 @@ def count_words(text: str) -> int:
 
 
 def collect_text(node: ET.Element) -> List[str]:
-    skip = {"speaker", "stage", "hisStage", "spOpener", "pb", "lb", "anchor", "note"}
-    if local(node.tag) in skip:
+    if local(node.tag) in SKIP_TAGS:
         return []
     parts: List[str] = []
     if node.text:
@@ -64,83 +106,125 @@ def collect_text(node: ET.Element) -> List[str]:
     return parts
 
 
-def get_speaker(sp: ET.Element) -> Optional[str]:
+class EtreeBackend:
+    """
+    xml.etree.ElementTree access to a TEI tree. parse_acts_from_tree and the
+    speech helpers only go through these methods, so another XML library
+    can stand in (see tei_lxml.py).
+    """
+
+    name = "etree"
+
+    def parse(self, xml_path: Path) -> Any:
+        return ET.parse(xml_path).getroot()
+
+    def acts(self, root: Any) -> List[Any]:
+        return root.findall(".//tei:div[@type='act']", NS)
+
+    def scene_divs(self, act_div: Any) -> List[Any]:
+        return act_div.findall("./tei:div[@type='scene']", NS)
+
+    def child_divs(self, act_div: Any) -> List[Any]:
+        return act_div.findall("./tei:div", NS)
+
+    def speeches(self, node: Any) -> List[Any]:
+        """sp/hisSp elements in node (itself included), in document order."""
+        return [sp for sp in node.iter() if local(sp.tag) in SPEECH_TAGS]
+
+    def speaker_elements(self, sp: Any) -> Iterable[Any]:
+        return (child for child in sp.iter() if local(child.tag) == "speaker")
+
+    def text_parts(self, sp: Any) -> List[str]:
+        """Text of sp without SKIP_TAGS subtrees (their tails are kept)."""
+        return collect_text(sp)
+
+
+ETREE = EtreeBackend()
+XML_BACKENDS = ("etree", "lxml")
+_backends: Dict[str, Any] = {"etree": ETREE}
+
+
+def xml_backend(name: str = "etree") -> Any:
+    """Backend instance by name (one per process); lxml is optional."""
+    backend = _backends.get(name)
+    if backend is None:
+        if name != "lxml":
+            raise ValueError(f"Unknown XML backend {name!r} (choose from {', '.join(XML_BACKENDS)})")
+        from tei_lxml import LxmlBackend
+
+        backend = _backends[name] = LxmlBackend(NS, SPEECH_TAGS, collect_text)
+    return backend
+
+
+def lxml_available() -> bool:
+    return importlib.util.find_spec("lxml") is not None
+
+
+def get_speaker(sp: Any, backend: Any = ETREE) -> Optional[str]:
     who = sp.attrib.get("who")
     if who:
         who_clean = clean(who)
         if who_clean:
             return who_clean
-    for child in sp.iter():
-        if local(child.tag) == "speaker":
-            txt = clean("".join(child.itertext()))
-            if txt:
-                return txt
+    for child in backend.speaker_elements(sp):
+        txt = clean("".join(child.itertext()))
+        if txt:
+            return txt
     return None
 
 
-def parse_speech(sp: ET.Element) -> Optional[Dict[str, object]]:
-    speaker = get_speaker(sp)
+def parse_speech(sp: Any, backend: Any = ETREE) -> Optional[Dict[str, object]]:
+    speaker = get_speaker(sp, backend)
     if not speaker:
         return None
-    text = clean(" ".join(collect_text(sp)))
+    text = clean(" ".join(backend.text_parts(sp)))
     length = count_words(text)
     return {"speaker": speaker, "text": text, "length": length}
 
 
-def parse_scene(scene: ET.Element, fallback_idx: int) -> Optional[Dict[str, object]]:
+def parse_speeches(node: Any, backend: Any = ETREE) -> List[Dict[str, object]]:
     speeches: List[Dict[str, object]] = []
-    speakers_in_scene = set()
+    for sp in backend.speeches(node):
+        parsed = parse_speech(sp, backend)
+        if parsed:
+            speeches.append(parsed)
+    return speeches
 
-    for sp in scene.iter():
-        if local(sp.tag) in {"sp", "hisSp"}:
-            parsed = parse_speech(sp)
-            if parsed:
-                speeches.append(parsed)
-                speakers_in_scene.add(parsed["speaker"])
 
+def build_scene(speeches: List[Dict[str, object]], scene_n: str) -> Optional[Dict[str, object]]:
     if not speeches:
         return None
-
-    scene_n = scene.attrib.get("n") or str(fallback_idx)
     return {
         "scene_n": str(scene_n),
-        "speakers_in_scene": sorted(speakers_in_scene),
+        "speakers_in_scene": sorted({sp["speaker"] for sp in speeches}),
         "speeches": speeches,
     }
 
 
-def parse_act(act_div: ET.Element, fallback_idx: int) -> Optional[Dict[str, object]]:
+def parse_scene(scene: Any, fallback_idx: int, backend: Any = ETREE) -> Optional[Dict[str, object]]:
+    scene_n = scene.attrib.get("n") or str(fallback_idx)
+    return build_scene(parse_speeches(scene, backend), scene_n)
+
+
+def parse_act(act_div: Any, fallback_idx: int, backend: Any = ETREE) -> Optional[Dict[str, object]]:
     act_n = act_div.attrib.get("n") or str(fallback_idx)
     scenes: List[Dict[str, object]] = []
 
-    scene_elems = list(act_div.findall("./tei:div[@type='scene']", NS))
+    scene_elems = list(backend.scene_divs(act_div))
     if not scene_elems:
         # fallback: treat any child div as a scene
-        scene_elems = list(act_div.findall("./tei:div", NS))
+        scene_elems = list(backend.child_divs(act_div))
 
     if scene_elems:
         for i, scene in enumerate(scene_elems, start=1):
-            parsed = parse_scene(scene, fallback_idx=i)
+            parsed = parse_scene(scene, fallback_idx=i, backend=backend)
             if parsed:
                 scenes.append(parsed)
     else:
         # No explicit scene divs; treat the whole act as one scene
-        speeches: List[Dict[str, object]] = []
-        speakers_in_scene = set()
-        for sp in act_div.iter():
-            if local(sp.tag) in {"sp", "hisSp"}:
-                parsed = parse_speech(sp)
-                if parsed:
-                    speeches.append(parsed)
-                    speakers_in_scene.add(parsed["speaker"])
-        if speeches:
-            scenes.append(
-                {
-                    "scene_n": "1",
-                    "speakers_in_scene": sorted(speakers_in_scene),
-                    "speeches": speeches,
-                }
-            )
+        parsed = build_scene(parse_speeches(act_div, backend), "1")
+        if parsed:
+            scenes.append(parsed)
 
     if not scenes:
         return None
@@ -148,40 +232,122 @@ def parse_act(act_div: ET.Element, fallback_idx: int) -> Optional[Dict[str, obje
     return {"act_n": str(act_n), "scenes": scenes}
 
 
-def parse_play(xml_path: Path) -> Dict[str, object]:
-    tree = ET.parse(xml_path)
-    root = tree.getroot()
+def iter_acts(xml_path: Path) -> Iterator[Dict[str, object]]:
+    """
+    Streaming variant of the act/scene walk in parse_act, built on iterparse.
+
+    Speeches are parsed as their sp/hisSp closes and finished elements are
+    cleared, so memory stays flat regardless of file size. Acts are yielded
+    in document order as they close; the result matches parse_act exactly.
+    """
+    stack: List[ET.Element] = []
+    open_acts: List[Dict[str, Any]] = []
+    pending: List[Dict[str, Any]] = []
+    root_speeches: List[Dict[str, object]] = []
+    seen_act = False
+    act_idx = 0
+    sp_depth = 0
+
+    for event, elem in ET.iterparse(xml_path, events=("start", "end")):
+        if event == "start":
+            if elem.tag == TEI_DIV:
+                if open_acts and stack and stack[-1] is open_acts[-1]["elem"]:
+                    div = {"elem": elem, "n": elem.attrib.get("n"), "type": elem.attrib.get("type"), "speeches": []}
+                    open_acts[-1]["divs"].append(div)
+                    open_acts[-1]["current"] = div
+                if elem.attrib.get("type") == "act":
+                    seen_act = True
+                    act_idx += 1
+                    root_speeches = []
+                    frame = {
+                        "elem": elem,
+                        "n": elem.attrib.get("n") or str(act_idx),
+                        "speeches": [],
+                        "divs": [],
+                        "current": None,
+                        "done": False,
+                        "result": None,
+                    }
+                    open_acts.append(frame)
+                    pending.append(frame)
+            elif local(elem.tag) in SPEECH_TAGS:
+                sp_depth += 1
+            stack.append(elem)
+            continue
+
+        stack.pop()
+        if local(elem.tag) in SPEECH_TAGS:
+            sp_depth -= 1
+            if sp_depth == 0:
+                # outermost speech closed: nested ones come out in document order
+                speeches = parse_speeches(elem)
+                if not seen_act:
+                    root_speeches.extend(speeches)
+                for frame in open_acts:
+                    frame["speeches"].extend(speeches)
+                    if frame["current"] is not None:
+                        frame["current"]["speeches"].extend(speeches)
+        elif elem.tag == TEI_DIV:
+            if open_acts and open_acts[-1]["elem"] is elem:
+                frame = open_acts.pop()
+                frame["result"] = _finish_act(frame)
+                frame["done"] = True
+                while pending and pending[0]["done"]:
+                    done = pending.pop(0)
+                    if done["result"]:
+                        yield done["result"]
+            if open_acts and open_acts[-1]["current"] is not None and open_acts[-1]["current"]["elem"] is elem:
+                open_acts[-1]["current"] = None
+
+        if sp_depth == 0:
+            elem.clear()
+            if stack:
+                del stack[-1][:]
+
+    if not seen_act:
+        # No acts at all: treat whole play as Act 1 with a single scene collecting all speeches
+        scene = build_scene(root_speeches, "1")
+        if scene:
+            yield {"act_n": "1", "scenes": [scene]}
 
-    acts: List[Dict[str, object]] = []
-    act_divs = list(root.findall(".//tei:div[@type='act']", NS))
-    if act_divs:
-        for idx, act_div in enumerate(act_divs, start=1):
-            parsed_act = parse_act(act_div, fallback_idx=idx)
-            if parsed_act:
-                acts.append(parsed_act)
+
+def _finish_act(frame: Dict[str, Any]) -> Optional[Dict[str, object]]:
+    divs = frame["divs"]
+    scene_divs = [d for d in divs if d["type"] == "scene"]
+    if not scene_divs:
+        # fallback: treat any child div as a scene
+        scene_divs = divs
+
+    scenes: List[Dict[str, object]] = []
+    if scene_divs:
+        for i, div in enumerate(scene_divs, start=1):
+            parsed = build_scene(div["speeches"], div["n"] or str(i))
+            if parsed:
+                scenes.append(parsed)
     else:
-        # No acts at all: treat whole play as Act 1 with a single scene collecting all speeches
-        speeches: List[Dict[str, object]] = []
-        speakers_in_scene = set()
-        for sp in root.iter():
-            if local(sp.tag) in {"sp", "hisSp"}:
-                parsed = parse_speech(sp)
-                if parsed:
-                    speeches.append(parsed)
-                    speakers_in_scene.add(parsed["speaker"])
-        if speeches:
-            acts.append(
-                {
-                    "act_n": "1",
-                    "scenes": [
-                        {
-                            "scene_n": "1",
-                            "speakers_in_scene": sorted(speakers_in_scene),
-                            "speeches": speeches,
-                        }
-                    ],
-                }
-            )
+        # No explicit scene divs; treat the whole act as one scene
+        parsed = build_scene(frame["speeches"], "1")
+        if parsed:
+            scenes.append(parsed)
+
+    if not scenes:
+        return None
+
+    return {"act_n": str(frame["n"]), "scenes": scenes}
+
+
+def parse_play(xml_path: Path, stream: bool = True, backend: str = "etree") -> Dict[str, object]:
+    """
+    One play as a dict of acts/scenes/speeches. The etree backend streams
+    (iter_acts) unless stream=False; other backends walk the whole tree.
+    Every variant gives the same result (see check_backends).
+    """
+    if backend != "etree":
+        acts = parse_acts_from_tree(xml_path, xml_backend(backend))
+    elif stream:
+        acts = list(iter_acts(xml_path))
+    else:
+        acts = parse_acts_from_tree(xml_path)
 
     title = xml_path.stem
     return {
@@ -191,38 +357,449 @@ def parse_play(xml_path: Path) -> Dict[str, object]:
     }
 
 
-def parse_all_plays(raw_dir: Path) -> Dict[str, object]:
-    plays: List[Dict[str, object]] = []
-    for xml in sorted(raw_dir.glob("*.xml")):
-        plays.append(parse_play(xml))
-    return {"plays": plays}
+def parse_acts_from_tree(xml_path: Path, backend: Any = ETREE) -> List[Dict[str, object]]:
+    root = backend.parse(xml_path)
+
+    acts: List[Dict[str, object]] = []
+    act_divs = list(backend.acts(root))
+    if act_divs:
+        for idx, act_div in enumerate(act_divs, start=1):
+            parsed_act = parse_act(act_div, fallback_idx=idx, backend=backend)
+            if parsed_act:
+                acts.append(parsed_act)
+    else:
+        # No acts at all: treat whole play as Act 1 with a single scene collecting all speeches
+        scene = build_scene(parse_speeches(root, backend), "1")
+        if scene:
+            acts.append({"act_n": "1", "scenes": [scene]})
+    return acts
+
+
+def parse_key(xml_path: Path) -> str:
+    return play_cache.cache_key(PARSER_VERSION, xml_path.name, play_cache.file_digest(xml_path))
 
 
-def main():
+def check_backends(xml_files: List[Path]) -> bool:
+    """
+    Parse each file with every available variant (etree streaming, etree
+    tree, lxml) and compare with the default; prints the first difference
+    per file and returns True when all agree.
+    """
+    variants: List[Tuple[str, Dict[str, Any]]] = [("etree/tree", {"stream": False})]
+    if lxml_available():
+        variants.append(("lxml", {"backend": "lxml"}))
+    else:
+        print("lxml not installed; comparing the etree variants only", file=sys.stderr)
+
+    ok = True
+    for xml in xml_files:
+        expected = fragment(parse_play(xml))
+        for label, kwargs in variants:
+            got = fragment(parse_play(xml, **kwargs))
+            if got != expected:
+                ok = False
+                at = next((i for i, (a, b) in enumerate(zip(expected, got)) if a != b), min(len(expected), len(got)))
+                print(f"{xml.name}: {label} differs at char {at}: {got[max(at - 40, 0):at + 40]!r}", file=sys.stderr)
+    labels = ", ".join(["etree/stream"] + [label for label, _kw in variants])
+    print(f"Checked {len(xml_files)} files ({labels}): {'identical' if ok else 'MISMATCH'}")
+    return ok
+
+
+def _parse_files(
+    xml_files: List[Path],
+    jobs: Optional[int],
+    profiler: StageProfiler = DISABLED,
+    backend: str = "etree",
+) -> Iterator[Tuple[Path, Optional[Dict[str, object]]]]:
+    """
+    Yield (path, parsed) in input order; failures are reported and come back
+    as None. The pool keeps at most 2 * jobs results in flight, so memory is
+    bounded by a few plays rather than the corpus. With an enabled profiler,
+    each parse is timed where it runs (in the worker) and recorded as "parse".
+    """
+    jobs = jobs or os.cpu_count() or 1
+    jobs = min(jobs, len(xml_files)) or 1
+
+    def result(xml: Path, value: Any) -> Dict[str, object]:
+        if not profiler.enabled:
+            return value
+        parsed, wall, cpu, rss = value
+        profiler.record("parse", wall, cpu, play=xml.stem)
+        profiler.count(xml.stem, parse_rss_kb=rss)
+        return parsed
+
+    def call(xml: Path) -> Tuple[Any, ...]:
+        args = (parse_play, xml, True, backend)
+        return (timed_call, *args) if profiler.enabled else args
+
+    if jobs == 1:
+        for xml in xml_files:
+            try:
+                fn, *args = call(xml)
+                yield xml, result(xml, fn(*args))
+            except Exception as exc:
+                print(f"Failed to parse {xml.name}: {exc}", file=sys.stderr)
+                yield xml, None
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending: Deque[Tuple[Path, Future]] = deque()
+        todo = iter(xml_files)
+        for xml in islice(todo, 2 * jobs):
+            pending.append((xml, pool.submit(*call(xml))))
+        while pending:
+            xml, future = pending.popleft()
+            for nxt in islice(todo, 1):
+                pending.append((nxt, pool.submit(*call(nxt))))
+            try:
+                yield xml, result(xml, future.result())
+            except Exception as exc:
+                print(f"Failed to parse {xml.name}: {exc}", file=sys.stderr)
+                yield xml, None
+
+
+def parse_all_plays(raw_dir: Path, jobs: Optional[int] = None, backend: str = "etree") -> Dict[str, object]:
+    """
+    Parse every TEI file in raw_dir, fanning out over `jobs` processes
+    (default: number of cores; 1 parses in-process). Plays come back in
+    sorted file order. A file that fails to parse is reported on stderr and
+    left out, without stopping the rest of the batch.
+    """
+    xml_files = sorted(raw_dir.glob("*.xml"))
+    return {"plays": [parsed for _xml, parsed in _parse_files(xml_files, jobs, backend=backend) if parsed]}
+
+
+def iter_play_outputs(
+    raw_dir: Path,
+    cache_dir: Optional[Path] = None,
+    jobs: Optional[int] = None,
+    export: bool = True,
+    profiler: StageProfiler = DISABLED,
+    backend: str = "etree",
+) -> Iterator[Tuple[str, Optional[str], Optional[Dict[str, Any]]]]:
+    """
+    Yield (parsed_fragment, export_fragment, export_block) per play in sorted
+    file order, one play at a time, so callers can write each play and drop
+    it. export_block is only set when it was computed here (not cached);
+    export_fragment is None with export=False.
+
+    With cache_dir, parsed plays are keyed by XML content and PARSER_VERSION;
+    exported blocks additionally by EXPORT_VERSION and the play's gender data,
+    so a gender-map edit only re-exports the plays it touches. Only misses
+    are recomputed, and misses are parsed in the process pool.
+
+    profiler.play is set to the current file's stem while it is processed.
+    backend names the XML backend (xml_backend()); all backends give the
+    same parse, so it is not part of the cache key.
+    """
+    xml_files = sorted(raw_dir.glob("*.xml"))
+    keys: Dict[Path, str] = {}
+    if cache_dir is not None:
+        keys = {xml: parse_key(xml) for xml in xml_files}
+    todo = [
+        xml for xml in xml_files
+        if cache_dir is None or not play_cache.has(cache_dir, "parsed", keys[xml])
+    ]
+    todo_set = set(todo)
+    parsed_iter = _parse_files(todo, jobs, profiler, backend)
+    export_keys: List[str] = []
+    metrics_keys: List[str] = []
+
+    for xml in xml_files:
+        profiler.play = xml.stem
+        parsed: Optional[Dict[str, object]] = None
+        parsed_text: Optional[str] = None
+        if cache_dir is not None and xml not in todo_set:
+            with profiler.stage("cache_load"):
+                parsed_text = play_cache.load(cache_dir, "parsed", keys[xml])
+        if parsed_text is None:
+            if xml in todo_set:
+                _xml, parsed = next(parsed_iter)
+            else:
+                # cache entry vanished between the check and the load
+                with profiler.stage("parse"):
+                    parsed = parse_play(xml, backend=backend)
+            if parsed is None:
+                continue
+            with profiler.stage("serialize"):
+                parsed_text = fragment(parsed)
+            if cache_dir is not None:
+                play_cache.store(cache_dir, "parsed", keys[xml], parsed_text)
+
+        if not export:
+            yield parsed_text, None, None
+            continue
+
+        block: Optional[Dict[str, Any]] = None
+        export_text: Optional[str] = None
+        if cache_dir is not None:
+            key = play_cache.cache_key(EXPORT_VERSION, keys[xml], gender_fingerprint(xml.stem))
+            export_keys.append(key)
+            with profiler.stage("cache_load"):
+                export_text = play_cache.load(cache_dir, "export", key)
+                # metrics entries the play's graphs use (they do not depend on gender)
+                refs = play_cache.load(cache_dir, "metrics_refs", keys[xml]) if export_text else None
+            if refs is not None:
+                metrics_keys.extend(json.loads(refs))
+        if export_text is None:
+            if parsed is None:
+                with profiler.stage("cache_load"):
+                    parsed = json.loads(parsed_text)
+            take_used_keys()
+            with profiler.stage("export_play"):
+                block = export_play(parsed)
+            with profiler.stage("serialize"):
+                export_text = fragment(block)
+            if cache_dir is not None:
+                play_cache.store(cache_dir, "export", key, export_text)
+                used = take_used_keys()
+                play_cache.store(cache_dir, "metrics_refs", keys[xml], json.dumps(used))
+                metrics_keys.extend(used)
+
+        yield parsed_text, export_text, block
+
+    if cache_dir is not None:
+        play_cache.prune(cache_dir, "parsed", keys.values())
+        if export:
+            play_cache.prune(cache_dir, "export", export_keys)
+            play_cache.prune(cache_dir, "metrics", metrics_keys)
+            play_cache.prune(cache_dir, "metrics_refs", keys.values())
+
+
+def _snapshot() -> Dict[Path, Tuple[int, int]]:
+    """(mtime, size) of every input the outputs depend on."""
+    stamps = {}
+    for path in [*RAW_DIR.glob("*.xml"), ibsen_networks_acts.GENDER_FILE]:
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        stamps[path] = (st.st_mtime_ns, st.st_size)
+    return stamps
+
+
+def watch(args: argparse.Namespace) -> None:
+    """
+    Build, then poll the TEI files and the gender file and rebuild after
+    each batch of changes. A change starts a debounce: the rebuild waits
+    until nothing has changed for args.debounce seconds, so an editor's
+    save-and-rename or a git checkout is handled as one rebuild. The
+    content cache makes a rebuild re-parse only changed plays and re-export
+    only plays whose XML or gender data changed; public/ is updated with
+    atomic renames. A failing build is reported and the watch goes on.
+    """
+    stamps = _snapshot()
+    build(args)
+    print(f"Watching {RAW_DIR} and {ibsen_networks_acts.GENDER_FILE} (Ctrl-C to stop)")
+    try:
+        while True:
+            time.sleep(args.interval)
+            current = _snapshot()
+            if current == stamps:
+                continue
+            while True:
+                time.sleep(args.debounce)
+                settled = _snapshot()
+                if settled == current:
+                    break
+                current = settled
+            changed = sorted(p.name for p in stamps.keys() | current.keys() if stamps.get(p) != current.get(p))
+            stamps = current
+            print(f"Changed: {', '.join(changed)}")
+            ibsen_networks_acts.GENDER.refresh()
+            started = time.perf_counter()
+            try:
+                n_plays, n_exported = build(args)
+            except Exception as exc:
+                print(f"Build failed: {exc}", file=sys.stderr)
+                continue
+            print(f"Rebuilt in {time.perf_counter() - started:.2f} s ({n_exported} of {n_plays} plays re-exported)")
+    except KeyboardInterrupt:
+        pass
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("--copy-to-public", action="store_true", help="Copy generated JSON to public/ibsen_networks.json")
     parser.add_argument("--no-export", action="store_true", help="Skip building ibsen_networks.json (only write ibsen_parsed.json)")
-    args = parser.parse_args()
+    parser.add_argument("--hashed", action="store_true", help="With --copy-to-public: also write content-hashed, precompressed copies and public/data/manifest.json for the service worker (see artifacts.py)")
+    parser.add_argument("--binary", action="store_true", help="Also write the compact ibsen_networks.bin (see binary_format.py)")
+    parser.add_argument("--shards", action="store_true", help="Also write one JSON file per play plus index.json to data/output/plays/")
+    parser.add_argument("--turn-chunks", action="store_true", help="Also write scene_turns as per-act chunks with a chunk index to data/output/turns/")
+    parser.add_argument("--layout", action="store_true", help="Also write precomputed per-turn node positions for the player to data/output/layout/ (see layout_frames.py)")
+    parser.add_argument("--table", action="store_true", help="Also write the columnar speech table data/output/ibsen_speeches.bin/.text (see speech_table.py)")
+    parser.add_argument("--token-index", action="store_true", help="Also write the inverted token index data/output/ibsen_tokens.bin (implies --table, see token_index.py)")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore the content-hash cache in data/output/cache and rebuild everything")
+    parser.add_argument("--jobs", type=int, default=None, help="Parallel parser processes (default: number of cores)")
+    parser.add_argument("--profile", action="store_true", help="Report time, peak RSS and counts per play and per stage")
+    parser.add_argument("--profile-out", type=Path, default=None, help="With --profile: also dump cProfile stats (pstats) of the main process here")
+    parser.add_argument("--xml-backend", choices=XML_BACKENDS, default="etree", help="XML library for TEI parsing: etree (stdlib, streaming) or lxml (optional, same output; see tei_lxml.py)")
+    parser.add_argument("--check-backends", action="store_true", help="Parse every TEI file with each available backend, report any difference and exit")
+    parser.add_argument("--watch", action="store_true", help="Rebuild whenever a TEI file or the gender file changes (Ctrl-C to stop)")
+    parser.add_argument("--interval", type=float, default=1.0, help="With --watch: seconds between polls")
+    parser.add_argument("--debounce", type=float, default=0.5, help="With --watch: wait until files have been unchanged this long before rebuilding")
+    args = parser.parse_args(argv)
+    args.table = args.table or args.token_index
+    if args.hashed and not args.copy_to_public:
+        parser.error("--hashed needs --copy-to-public")
+    return args
+
+
+def main():
+    args = parse_args()
 
     if not RAW_DIR.exists():
         print(f"Input dir missing: {RAW_DIR}", file=sys.stderr)
         sys.exit(1)
 
+    if args.check_backends:
+        sys.exit(0 if check_backends(sorted(RAW_DIR.glob("*.xml"))) else 1)
+    if args.xml_backend == "lxml" and not lxml_available():
+        print("--xml-backend lxml needs the lxml package (pip install lxml)", file=sys.stderr)
+        sys.exit(1)
+    if args.watch:
+        watch(args)
+    else:
+        build(args)
+
+
+def build(args: argparse.Namespace) -> Tuple[int, int]:
+    """One full pipeline run for parsed CLI args; returns (plays, plays re-exported)."""
     OUT_DIR.mkdir(parents=True, exist_ok=True)
 
-    parsed = parse_all_plays(RAW_DIR)
+    export = not args.no_export
     parsed_path = OUT_DIR / "ibsen_parsed.json"
-    parsed_path.write_text(json.dumps(parsed, ensure_ascii=False, indent=2), encoding="utf-8")
-    print(f"Wrote parsed: {parsed_path}")
-
-    if not args.no_export:
-        networks_path = OUT_DIR / "ibsen_networks.json"
-        export_ibsen_networks(parsed["plays"], outfile=str(networks_path))
-        print(f"Wrote networks: {networks_path}")
+    networks_path = OUT_DIR / "ibsen_networks.json"
+    binary_path = OUT_DIR / "ibsen_networks.bin"
+    shard_dir = OUT_DIR / "plays"
+    turn_dir = OUT_DIR / "turns"
+    layout_dir = OUT_DIR / "layout"
+    table_path = OUT_DIR / "ibsen_speeches.bin"
+    token_index_path = OUT_DIR / "ibsen_tokens.bin"
+    cache_dir = None if args.no_cache else play_cache.CACHE_DIR
+    ibsen_networks_acts.METRICS_CACHE_DIR = cache_dir
+    profiler = StageProfiler() if args.profile else DISABLED
+    cprofile = None
+    if args.profile and args.profile_out:
+        import cProfile
+
+        cprofile = cProfile.Profile()
+
+    # Loaded up front: data/output/ibsen_networks.json is one of its sources
+    # and is truncated below.
+    female = female_characters() if export else {}
+
+    # Every output is written incrementally, one play at a time.
+    with ExitStack() as stack:
+        if profiler.enabled:
+            profiler.instrument(ibsen_networks_acts)
+            stack.callback(profiler.restore)
+        if cprofile is not None:
+            cprofile.enable()
+            stack.callback(cprofile.disable)
+        parsed_out = stack.enter_context(PlaysJsonWriter(parsed_path))
+        table_out = stack.enter_context(SpeechTableWriter(table_path)) if args.table else None
+        networks_out = binary_out = shards_out = turns_out = layout_out = None
+        if export:
+            networks_out = stack.enter_context(
+                PlaysJsonWriter(networks_path, head={"FEMALE_CHARACTERS": female})
+            )
+            if args.binary:
+                binary_out = stack.enter_context(BinaryWriter(binary_path, female))
+            if args.shards:
+                shards_out = stack.enter_context(ShardWriter(shard_dir, female))
+            if args.turn_chunks:
+                turns_out = stack.enter_context(TurnChunkWriter(turn_dir))
+            if args.layout:
+                layout_out = stack.enter_context(LayoutWriter(layout_dir, cache_dir))
+
+        n_plays = n_exported = 0
+        for parsed_text, export_text, block in iter_play_outputs(
+            RAW_DIR, cache_dir=cache_dir, jobs=args.jobs, export=export, profiler=profiler,
+            backend=args.xml_backend,
+        ):
+            with profiler.stage("write"):
+                parsed_out.add(parsed_text)
+                if table_out:
+                    table_out.add(json.loads(parsed_text))
+            n_plays += 1
+            if networks_out is None:
+                continue
+            n_exported += block is not None
+            with profiler.stage("write"):
+                networks_out.add(export_text)
+            if binary_out or shards_out or turns_out or layout_out or profiler.enabled:
+                if block is None:
+                    with profiler.stage("cache_load"):
+                        block = json.loads(export_text)
+                with profiler.stage("write"):
+                    if binary_out:
+                        binary_out.add(block)
+                    if shards_out:
+                        shards_out.add(block)
+                    if turns_out:
+                        turns_out.add(block)
+                if layout_out:
+                    with profiler.stage("layout"):
+                        layout_out.add(block)
+            if profiler.enabled:
+                profiler.count(
+                    speeches=sum(len(st["turns"]) for st in block["scene_turns"]),
+                    speech_edges=len(block["speech_network"]["edges"]),
+                    co_edges=len(block["co_network"]["edges"]),
+                    peak_rss_kb=peak_rss_kb(),
+                )
 
-        if args.copy_to_public:
-            PUBLIC_JSON.write_text(networks_path.read_text(encoding="utf-8"), encoding="utf-8")
-            print(f"Copied to {PUBLIC_JSON}")
+    print(f"Wrote parsed: {parsed_path}")
+    if args.table:
+        print(f"Wrote speech table: {table_path}")
+    if args.token_index:
+        profiler.play = "(corpus)"
+        with profiler.stage("token_index"), SpeechTable(table_path) as table:
+            build_token_index(table, token_index_path)
+        print(f"Wrote token index: {token_index_path}")
+    profiler.report()
+    if cprofile is not None:
+        cprofile.dump_stats(args.profile_out)
+        print(f"Wrote profile: {args.profile_out}")
+    if not export:
+        return n_plays, n_exported
+    print(f"Wrote networks: {networks_path}")
+    if args.binary:
+        print(f"Wrote binary: {binary_path}")
+    if args.shards:
+        print(f"Wrote shards: {shard_dir / 'index.json'}")
+    if args.turn_chunks:
+        print(f"Wrote turn chunks: {turn_dir / 'index.json'}")
+    if args.layout:
+        print(f"Wrote layout: {layout_dir / 'index.json'}")
+
+    if args.copy_to_public:
+        # what this run put in public/, for --hashed
+        copied: List[Path] = [PUBLIC_JSON]
+        atomic_copy(networks_path, PUBLIC_JSON)
+        print(f"Copied to {PUBLIC_JSON}")
+        if args.binary:
+            atomic_copy(binary_path, PUBLIC_BIN)
+            copied.append(PUBLIC_BIN)
+            print(f"Copied to {PUBLIC_BIN}")
+        if args.shards:
+            copied += [PUBLIC_SHARDS / name for name in copy_shards(shard_dir, PUBLIC_SHARDS)]
+            print(f"Copied to {PUBLIC_SHARDS}")
+        if args.turn_chunks:
+            copied += [PUBLIC_TURNS / name for name in copy_turn_chunks(turn_dir, PUBLIC_TURNS)]
+            print(f"Copied to {PUBLIC_TURNS}")
+        if args.layout:
+            copied += [PUBLIC_LAYOUT / name for name in copy_layout(layout_dir, PUBLIC_LAYOUT)]
+            print(f"Copied to {PUBLIC_LAYOUT}")
+        if args.hashed:
+            public_dir = ROOT / "public"
+            publish([(path.relative_to(public_dir).as_posix(), path) for path in copied], PUBLIC_ARTIFACTS)
+            print(f"Wrote hashed artifacts: {PUBLIC_ARTIFACTS / MANIFEST_NAME}")
+        elif unpublish(PUBLIC_ARTIFACTS):
+            # a manifest from an earlier --hashed run would keep serving the old copies
+            print(f"Removed stale hashed artifacts: {PUBLIC_ARTIFACTS}")
+    return n_plays, n_exported
 
 
 if __name__ == "__main__":
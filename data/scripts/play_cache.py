@@ -0,0 +1,63 @@
+"""
+Content-hash cache for parse_tei.py.
+
+Each play's parsed dict and its exported block from ibsen_networks_acts are
+stored as JSON fragments (json_writer.fragment) under
+data/output/cache/<stage>/<key>.json, ready to be written out as-is. Keys are
+sha256 hashes of whatever the stage depends on (XML bytes, parser/export
+version, gender data), so unchanged plays are loaded instead of recomputed.
+"""
+
+import hashlib
+from pathlib import Path
+from typing import Iterable, Optional
+
+ROOT = Path(__file__).resolve().parents[2]
+CACHE_DIR = ROOT / "data" / "output" / "cache"
+
+
+def file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_key(*parts: str) -> str:
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+def entry_path(cache_dir: Path, stage: str, key: str) -> Path:
+    return cache_dir / stage / f"{key}.json"
+
+
+def has(cache_dir: Path, stage: str, key: str) -> bool:
+    return entry_path(cache_dir, stage, key).exists()
+
+
+def load(cache_dir: Path, stage: str, key: str) -> Optional[str]:
+    path = entry_path(cache_dir, stage, key)
+    try:
+        return path.read_text(encoding="utf-8")
+    except (FileNotFoundError, UnicodeDecodeError):
+        return None
+
+
+def store(cache_dir: Path, stage: str, key: str, text: str) -> None:
+    path = entry_path(cache_dir, stage, key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    tmp.replace(path)
+
+
+def prune(cache_dir: Path, stage: str, keep: Iterable[str]) -> None:
+    """Remove entries for a stage that are no longer referenced."""
+    stage_dir = cache_dir / stage
+    if not stage_dir.exists():
+        return
+    keep_set = set(keep)
+    for path in stage_dir.glob("*.json"):
+        if path.stem not in keep_set:
+            path.unlink()
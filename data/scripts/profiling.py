@@ -0,0 +1,155 @@
+"""
+Per-stage profiling for parse_tei.py --profile.
+
+A StageProfiler collects wall and CPU time per (play, stage): parsing (timed
+inside the worker process, see `timed_call`), the builders in
+ibsen_networks_acts (wrapped in place by `instrument`, so the fused
+analyze_play is broken down too) and the serialization steps (`stage`).
+Per play it also keeps speech/edge counts and the peak RSS so far. Stage
+times are inclusive: analyze_play contains the builders it calls.
+
+The disabled profiler (DISABLED) hands out a shared no-op context, so
+callers can use `with prof.stage(...)` unconditionally.
+"""
+
+import functools
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from statistics import median
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+# Builders in ibsen_networks_acts that --profile times. They are looked up as
+# module globals at call time, so replacing them on the module is enough.
+BUILDERS = (
+    "analyze_play",
+    "transition_counts",
+    "_add_transitions",
+    "_add_cooccurrence",
+    "pair_runs",
+    "_speech_edges",
+    "_co_edges",
+    "_sorted_word_counts",
+    "summarize_bechdel",
+)
+
+_NULL = nullcontext()
+
+
+def peak_rss_kb() -> Optional[int]:
+    """Peak resident set size of this process in KB (None where unsupported)."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def timed_call(fn: Callable[..., Any], *args: Any) -> Tuple[Any, float, float, Optional[int]]:
+    """fn(*args) plus (wall, cpu, peak RSS); picklable for ProcessPoolExecutor."""
+    t0, c0 = time.perf_counter(), time.process_time()
+    result = fn(*args)
+    return result, time.perf_counter() - t0, time.process_time() - c0, peak_rss_kb()
+
+
+class StageProfiler:
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.play = ""
+        self.times: Dict[str, Dict[str, List[float]]] = {}  # play -> stage -> [wall, cpu, calls]
+        self.counts: Dict[str, Dict[str, Any]] = {}
+        self._originals: List[Tuple[Any, str, Callable[..., Any]]] = []
+        self._wrapped: Set[str] = set()  # instrumented builders, nested in the stages
+
+    def record(self, stage: str, wall: float, cpu: float, play: Optional[str] = None) -> None:
+        acc = self.times.setdefault(play or self.play, {}).setdefault(stage, [0.0, 0.0, 0])
+        acc[0] += wall
+        acc[1] += cpu
+        acc[2] += 1
+
+    def stage(self, name: str) -> Any:
+        if not self.enabled:
+            return _NULL
+        return self._stage(name)
+
+    @contextmanager
+    def _stage(self, name: str) -> Iterator[None]:
+        t0, c0 = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - t0, time.process_time() - c0)
+
+    def count(self, play: Optional[str] = None, **values: Any) -> None:
+        self.counts.setdefault(play or self.play, {}).update(values)
+
+    def instrument(self, module: Any, names: Iterable[str] = BUILDERS) -> None:
+        """Replace module.<name> with a timing wrapper; undone by restore()."""
+        if not self.enabled:
+            return
+        for name in names:
+            fn = getattr(module, name)
+            self._originals.append((module, name, fn))
+            self._wrapped.add(name)
+            setattr(module, name, self._wrap(name, fn))
+
+    def restore(self) -> None:
+        while self._originals:
+            module, name, fn = self._originals.pop()
+            setattr(module, name, fn)
+
+    def _wrap(self, name: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            t0, c0 = time.perf_counter(), time.process_time()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.record(name, time.perf_counter() - t0, time.process_time() - c0)
+
+        return wrapper
+
+    def report(self, out: TextIO = sys.stderr) -> None:
+        """Per-play table (outliers marked with *) followed by stage totals."""
+        if not self.times:
+            return
+        totals: Dict[str, List[float]] = {}
+        for stages in self.times.values():
+            for stage, (wall, cpu, calls) in stages.items():
+                acc = totals.setdefault(stage, [0.0, 0.0, 0])
+                acc[0] += wall
+                acc[1] += cpu
+                acc[2] += calls
+
+        # every recorded stage except the builders nested in them, so builder
+        # time is not counted twice (first-recorded order)
+        top = [s for s in totals if s not in self._wrapped]
+        play_wall = {
+            play: sum(stages[s][0] for s in top if s in stages) for play, stages in self.times.items()
+        }
+        cutoff = 2 * median(play_wall.values())
+
+        cols = top + ["speeches", "speech_edges", "co_edges", "parse_rss_kb", "peak_rss_kb"]
+        print("\nProfile per play (wall s; * = over 2x median):", file=out)
+        print(f"  {'play':<40}{'total':>9}" + "".join(f"{c:>13}" for c in cols), file=out)
+        for play, stages in self.times.items():
+            counts = self.counts.get(play, {})
+            cells = [f"{stages[s][0]:.3f}" if s in stages else "-" for s in top]
+            cells += [str(counts.get(c, "-")) for c in cols[len(top):]]
+            mark = "*" if play_wall[play] > cutoff else " "
+            print(f"{mark} {play[:40]:<40}{play_wall[play]:>9.3f}" + "".join(f"{c:>13}" for c in cells), file=out)
+
+        print("\nProfile per stage (inclusive):", file=out)
+        print(f"  {'stage':<24}{'wall s':>10}{'cpu s':>10}{'calls':>10}", file=out)
+        for stage, (wall, cpu, calls) in sorted(totals.items(), key=lambda kv: -kv[1][0]):
+            print(f"  {stage:<24}{wall:>10.3f}{cpu:>10.3f}{calls:>10}", file=out)
+        rss = peak_rss_kb()
+        if rss is not None:
+            print(f"  peak RSS (main process): {rss} KB", file=out)
+
+
+DISABLED = StageProfiler(enabled=False)
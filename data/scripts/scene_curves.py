@@ -0,0 +1,173 @@
+"""
+Dramatic curves: per-scene co-occurrence metrics as a time series.
+
+build_scene_curves walks a play's scenes once and keeps two co-occurrence
+graphs up to date by deltas instead of rebuilding them per scene:
+
+- running: every pair seen so far (a CompactGraph with the edges and
+  weights build_cooccurrence_network ends with), plus node degrees; unlike
+  that network it also holds speakers who have only appeared alone in a
+  scene, as isolated nodes
+- window:  the last `window` scenes; pair counts are incremented when a
+  scene enters and decremented when it leaves, and a pair or node only
+  enters/leaves the graph when its count crosses zero
+
+Per scene it emits cast size, drama (speaking pairs / possible pairs, see
+todo.md: actual_pairs / possible_pairs, where a pair "speaks" when the two
+have consecutive turns), node/edge counts and density of both graphs, and
+the degree centrality of each cast member in both. The play summary has
+mean_drama, mean_cast, max_cast and n_scenes.
+
+Run:
+    python data/scripts/scene_curves.py [ibsen_parsed.json|ibsen_speeches.bin] [--window 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from collections import deque
+from itertools import combinations
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Tuple
+
+from ibsen_networks_acts import (
+    SPEAKER_NAMES,
+    _add_cooccurrence,
+    _scene_cast,
+    _scene_sequence,
+    cooccurrence_graph,
+    load_parsed,
+)
+
+OUT_DIR = Path(__file__).resolve().parents[2] / "data" / "output"
+
+
+def _density(n_nodes: int, n_edges: int) -> float:
+    return 2 * n_edges / (n_nodes * (n_nodes - 1)) if n_nodes > 1 else 0.0
+
+
+def _centrality(degree: int, n_nodes: int) -> float:
+    return round(degree / (n_nodes - 1), 4) if n_nodes > 1 else 0.0
+
+
+class _WindowGraph:
+    """Co-occurrence over the last `size` scenes, updated by adding/removing scenes."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.scenes: Deque[Tuple[List[int], List[Tuple[int, int]]]] = deque()
+        self.node_count: Dict[int, int] = {}
+        self.pair_count: Dict[Tuple[int, int], int] = {}
+        self.degree: Dict[int, int] = {}
+
+    def push(self, cast: List[int]) -> None:
+        pairs = list(combinations(cast, 2))
+        self.scenes.append((cast, pairs))
+        for s in cast:
+            self.node_count[s] = self.node_count.get(s, 0) + 1
+        for a, b in pairs:
+            n = self.pair_count.get((a, b), 0)
+            self.pair_count[(a, b)] = n + 1
+            if n == 0:
+                self.degree[a] = self.degree.get(a, 0) + 1
+                self.degree[b] = self.degree.get(b, 0) + 1
+        if len(self.scenes) > self.size:
+            self._pop()
+
+    def _pop(self) -> None:
+        cast, pairs = self.scenes.popleft()
+        for a, b in pairs:
+            n = self.pair_count.pop((a, b)) - 1
+            if n:
+                self.pair_count[(a, b)] = n
+            else:
+                self.degree[a] -= 1
+                self.degree[b] -= 1
+        for s in cast:
+            n = self.node_count.pop(s) - 1
+            if n:
+                self.node_count[s] = n
+            else:
+                self.degree.pop(s, None)
+
+    def metrics(self, cast: List[int]) -> Dict[str, Any]:
+        n_nodes, n_edges = len(self.node_count), len(self.pair_count)
+        return {
+            "nodes": n_nodes,
+            "edges": n_edges,
+            "density": round(_density(n_nodes, n_edges), 4),
+            "degree": [_centrality(self.degree.get(s, 0), n_nodes) for s in cast],
+        }
+
+
+def build_scene_curves(play: Dict[str, Any], window: int = 3) -> Dict[str, Any]:
+    """Per-scene curves for one play (see module docstring)."""
+    running = cooccurrence_graph()
+    degree: Dict[int, int] = {}
+    win = _WindowGraph(window)
+    scenes: List[Dict[str, Any]] = []
+
+    for act in play.get("acts", []):
+        act_n = str(act.get("act_n", ""))
+        for scene in act.get("scenes", []):
+            cast = _scene_cast(scene)
+            speakers, _lengths = _scene_sequence(scene)
+
+            if len(cast) >= 2:
+                for a, b in combinations(cast, 2):
+                    if not running.has_edge(a, b):
+                        degree[a] = degree.get(a, 0) + 1
+                        degree[b] = degree.get(b, 0) + 1
+                _add_cooccurrence(running, cast)
+            else:
+                for s in cast:
+                    running.add_node(s)
+            win.push(cast)
+
+            spoken = {(a, b) if a < b else (b, a) for a, b in zip(speakers, speakers[1:]) if a != b}
+            possible = len(cast) * (len(cast) - 1) // 2
+            n_nodes, n_edges = running.number_of_nodes(), running.number_of_edges()
+            scenes.append({
+                "act": act_n,
+                "scene": str(scene.get("scene_n", "")),
+                "cast": [SPEAKER_NAMES[s] for s in cast],
+                "cast_size": len(cast),
+                "drama": round(len(spoken) / possible, 4) if possible else 0.0,
+                "running": {
+                    "nodes": n_nodes,
+                    "edges": n_edges,
+                    "density": round(_density(n_nodes, n_edges), 4),
+                    "degree": [_centrality(degree.get(s, 0), n_nodes) for s in cast],
+                },
+                "window": win.metrics(cast),
+            })
+
+    n = len(scenes)
+    return {
+        "id": play.get("title", ""),
+        "window": window,
+        "mean_drama": round(sum(s["drama"] for s in scenes) / n, 4) if n else 0.0,
+        "mean_cast": round(sum(s["cast_size"] for s in scenes) / n, 4) if n else 0.0,
+        "max_cast": max((s["cast_size"] for s in scenes), default=0),
+        "n_scenes": n,
+        "scenes": scenes,
+    }
+
+
+def build_corpus_curves(plays: Iterable[Dict[str, Any]], window: int = 3) -> List[Dict[str, Any]]:
+    return [build_scene_curves(play, window) for play in plays]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("source", nargs="?", default=str(OUT_DIR / "ibsen_parsed.json"))
+    parser.add_argument("--window", type=int, default=3, help="Scenes in the sliding window")
+    parser.add_argument("--out", type=Path, default=OUT_DIR / "ibsen_curves.json")
+    args = parser.parse_args()
+
+    curves = build_corpus_curves(load_parsed(args.source)["plays"], args.window)
+    args.out.write_text(
+        json.dumps({"plays": curves}, ensure_ascii=False, separators=(",", ":")), encoding="utf-8"
+    )
+    print(f"Wrote curves: {args.out}")
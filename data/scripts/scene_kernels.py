@@ -0,0 +1,79 @@
+"""
+Per-scene kernels over speaker-id sequences, used by ibsen_networks_acts.py.
+
+Speakers are any comparable ids (normally ints from speaker_of). The
+comparisons run element-wise through map/operator and a bytes regex, so the
+per-speech work stays in C; only the (few) runs and distinct pairs are
+handled in Python.
+"""
+
+from __future__ import annotations
+
+import operator
+import re
+from itertools import accumulate
+from typing import Any, Dict, List, Sequence, Tuple
+
+
+def pair_runs(speakers: Sequence[Any], min_len: int = 4) -> List[Tuple[int, int]]:
+    """
+    (KQ)^n runs: maximal stretches where two speakers alternate. Returns
+    (start, end) with inclusive indices for runs of at least min_len
+    speeches, in the same order and with the same boundaries as a greedy
+    left-to-right scan (a run's last speech may start the next run).
+    """
+    n = len(speakers)
+    if n < 2 or n < min_len:
+        return []
+
+    # alt[k] == 1 when speakers[k + 2] == speakers[k]: the alternation continues
+    alt = bytes(map(operator.eq, speakers[2:], speakers[:-2]))
+    runs: List[Tuple[int, int]] = []
+
+    if min_len > 2:
+        for m in re.finditer(rb"\x01{%d,}" % (min_len - 2), alt):
+            start = m.start()
+            # a block of equal neighbours is one speaker talking, not a dialog
+            if speakers[start] != speakers[start + 1]:
+                runs.append((start, m.end() + 1))
+        return runs
+
+    # min_len <= 2: pairs that are not the inside of a longer run count too
+    for i in range(n - 1):
+        if speakers[i] == speakers[i + 1]:
+            continue
+        if i >= 1 and alt[i - 1]:
+            continue
+        end = i + 1
+        while end - 1 < len(alt) and alt[end - 1]:
+            end += 1
+        runs.append((i, end))
+    return runs
+
+
+def prefix_sums(values: Sequence[int]) -> List[int]:
+    """prefix[k] = sum(values[:k]); a run (start, end) sums to prefix[end + 1] - prefix[start]."""
+    return list(accumulate(values, initial=0))
+
+
+def transition_counts(
+    speakers: Sequence[Any],
+    lengths: Sequence[int],
+) -> Dict[Tuple[Any, Any], List[int]]:
+    """
+    Consecutive speaker pairs (self-transitions left out) mapped to
+    [count, len_A_sum, len_B_sum], in order of first occurrence.
+    """
+    counts: Dict[Tuple[Any, Any], List[int]] = {}
+    pairs = zip(speakers, speakers[1:], lengths, lengths[1:])
+    for a, b, len_a, len_b in pairs:
+        if a == b:
+            continue
+        acc = counts.get((a, b))
+        if acc is None:
+            counts[(a, b)] = [1, len_a, len_b]
+        else:
+            acc[0] += 1
+            acc[1] += len_a
+            acc[2] += len_b
+    return counts
@@ -0,0 +1,141 @@
+"""
+Per-play sharded export: one compact JSON file per play plus a small
+index.json, so clients can list plays from the index and fetch a play only
+when it is opened.
+
+    plays/index.json   {"FEMALE_CHARACTERS": {...}, "plays": [entry, ...]}
+    plays/<file>.json  one export_play block
+
+An index entry holds id, title, year, file, n_acts, n_scenes, cast_size and
+the bechdel block.
+"""
+
+import filecmp
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+INDEX_NAME = "index.json"
+_UNSAFE_RE = re.compile(r"[^\w.-]", re.UNICODE)
+_YEAR_RE = re.compile(r"_(\d{4})(?:-\d+)?$")
+
+
+def shard_filename(play_id: str) -> str:
+    return _UNSAFE_RE.sub("_", play_id) + ".json"
+
+
+def play_year(title: str) -> Optional[int]:
+    m = _YEAR_RE.search(title)
+    return int(m.group(1)) if m else None
+
+
+def index_entry(block: Dict[str, Any], file: str) -> Dict[str, Any]:
+    cast = {t["speaker"] for st in block["scene_turns"] for t in st["turns"]}
+    return {
+        "id": block["id"],
+        "title": block["title"],
+        "year": play_year(block["title"]),
+        "file": file,
+        "n_acts": len(block["acts"]),
+        "n_scenes": len(block["scene_turns"]),
+        "cast_size": len(cast),
+        "bechdel": block["bechdel"],
+    }
+
+
+def dumps_compact(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+class ShardWriter:
+    """Incremental writer: one file per add(), index.json and cleanup on close()."""
+
+    def __init__(self, out_dir: Path, female_characters: Dict[str, bool]) -> None:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        self.out_dir = out_dir
+        self.female_characters = female_characters
+        self.entries: List[Dict[str, Any]] = []
+        self.written = {INDEX_NAME}
+        self.index_path = out_dir / INDEX_NAME
+        self.closed = False
+
+    def add(self, block: Dict[str, Any]) -> None:
+        file = shard_filename(block["id"])
+        if file in self.written:
+            raise ValueError(f"Shard name collision for play id {block['id']!r}: {file}")
+        self.written.add(file)
+        (self.out_dir / file).write_text(dumps_compact(block), encoding="utf-8")
+        self.entries.append(index_entry(block, file))
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self.index_path.write_text(
+            dumps_compact({"FEMALE_CHARACTERS": self.female_characters, "plays": self.entries}),
+            encoding="utf-8",
+        )
+        for stale in self.out_dir.glob("*.json"):
+            if stale.name not in self.written:
+                stale.unlink()
+
+    def __enter__(self) -> "ShardWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, *exc: Any) -> None:
+        if exc_type is None:
+            self.close()
+
+
+def write_shards(
+    out_dir: Path,
+    blocks: Iterable[Dict[str, Any]],
+    female_characters: Dict[str, bool],
+) -> Path:
+    """Write one file per play plus index.json; stale shard files are removed."""
+    with ShardWriter(out_dir, female_characters) as out:
+        for block in blocks:
+            out.add(block)
+    return out.index_path
+
+
+def atomic_copy(src: Path, dst: Path) -> bool:
+    """
+    Copy src to dst via a temporary file and a rename, so readers of dst see
+    the old or the new file, never a partial one. Unchanged files are left
+    alone; returns whether dst was written.
+    """
+    if dst.exists() and filecmp.cmp(src, dst, shallow=False):
+        return False
+    tmp = dst.with_name(f".{dst.name}.tmp")
+    shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+    return True
+
+
+def copy_shards(src_dir: Path, dst_dir: Path) -> List[str]:
+    """
+    Mirror a shard directory (e.g. into public/plays/): changed files are
+    replaced atomically, index.json last so it never points at a missing
+    file, then stale files are removed. Returns the names now in dst_dir.
+    """
+    dst_dir.mkdir(parents=True, exist_ok=True)
+    names = sorted(p.name for p in src_dir.glob("*.json"))
+    for name in sorted(names, key=lambda n: n == INDEX_NAME):
+        atomic_copy(src_dir / name, dst_dir / name)
+    keep = set(names)
+    for stale in dst_dir.glob("*.json"):
+        if stale.name not in keep:
+            stale.unlink()
+    return names
+
+
+def load_index(shard_dir: Path) -> Dict[str, Any]:
+    return json.loads((shard_dir / INDEX_NAME).read_text(encoding="utf-8"))
+
+
+def load_shard(shard_dir: Path, entry: Dict[str, Any]) -> Dict[str, Any]:
+    return json.loads((shard_dir / entry["file"]).read_text(encoding="utf-8"))
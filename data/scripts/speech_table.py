@@ -0,0 +1,305 @@
+"""
+Columnar speech table: a flat alternative to the nested ibsen_parsed.json.
+
+One row per speech, stored as typed columns in ibsen_speeches.bin; speech
+texts are concatenated into a separate UTF-8 blob, ibsen_speeches.text, and
+row i's text is text_off[i]:text_off[i + 1]. Both files are memory-mapped
+by SpeechTable, and on little-endian hosts columns are zero-copy
+memoryviews, so opening the table takes milliseconds and analyses can run
+as column scans.
+
+The file is a column_file.py column file (magic "IBST") with the columns:
+
+    per speech  play, act, scene (global row ids), position (in scene),
+                speaker (raw name), speaker_norm (normalize_name, NO_SPEAKER
+                if empty), words ("length"), male_pron, female_pron
+    text_off    u64, n_speeches + 1
+    per play    play_title, play_file, play_acts (n_plays + 1 offsets)
+    per act     act_n, act_scenes (n_acts + 1 offsets)
+    per scene   scene_n, scene_speeches (n_scenes + 1 offsets)
+    strings     str_off (n + 1 offsets), str_blob
+
+Names and labels are u32 indices into the string table. `to_nested()` and
+`play(i)` rebuild dicts equal to parse_play's output; convert_parsed()
+builds a table from an existing ibsen_parsed.json.
+
+Random access: `speech_row(play, act_n, scene_n, i)` finds a speech by its
+position, `text_view(row)` returns its UTF-8 bytes as a zero-copy slice of
+the mapped blob, and `dialog_context(dialog)` pulls the lines around a
+dialog from compute_dialogs_for_play without loading the corpus.
+
+Run:
+    python data/scripts/speech_table.py [ibsen_parsed.json] [ibsen_speeches.bin]
+    python data/scripts/speech_table.py --context "Et_dukkehjem_1879" [ibsen_speeches.bin]
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from column_file import ColumnFile, MappedFile, string_columns, write_columns
+from ibsen_networks_acts import WORD_RE, _pronoun_counts, normalize_name
+
+MAGIC = b"IBST"
+VERSION = 1
+NO_SPEAKER = 0xFFFFFFFF
+
+ROW_COLUMNS = (
+    "play", "act", "scene", "position", "speaker", "speaker_norm",
+    "words", "male_pron", "female_pron",
+)
+
+
+def text_path(path: Union[str, Path]) -> Path:
+    return Path(path).with_suffix(".text")
+
+
+class SpeechTableWriter:
+    """
+    Incremental writer: add() appends one parsed play (parse_play output).
+    Texts go straight to the text blob; the columns are small and are
+    written on close().
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        self.text_f = open(text_path(path), "wb")
+        self.text_size = 0
+        self.strings: Dict[str, int] = {}
+        self.cols: Dict[str, array] = {name: array("I") for name in ROW_COLUMNS}
+        self.cols.update(
+            text_off=array("Q", [0]),
+            play_title=array("I"),
+            play_file=array("I"),
+            play_acts=array("I", [0]),
+            act_n=array("I"),
+            act_scenes=array("I", [0]),
+            scene_n=array("I"),
+            scene_speeches=array("I", [0]),
+        )
+
+    def sid(self, s: str) -> int:
+        idx = self.strings.get(s)
+        if idx is None:
+            idx = len(self.strings)
+            self.strings[s] = idx
+        return idx
+
+    def add(self, play: Dict[str, Any]) -> None:
+        c = self.cols
+        play_row = len(c["play_title"])
+        c["play_title"].append(self.sid(play.get("title", "")))
+        c["play_file"].append(self.sid(play.get("file", "")))
+
+        for act in play.get("acts", []):
+            act_row = len(c["act_n"])
+            c["act_n"].append(self.sid(str(act.get("act_n", ""))))
+            for scene in act.get("scenes", []):
+                scene_row = len(c["scene_n"])
+                c["scene_n"].append(self.sid(str(scene.get("scene_n", ""))))
+                for pos, sp in enumerate(scene.get("speeches", [])):
+                    raw = sp["speaker"]
+                    norm = normalize_name(raw)
+                    text = sp.get("text", "") or ""
+                    m, f = _pronoun_counts(WORD_RE.findall(text))
+                    encoded = text.encode("utf-8")
+                    self.text_f.write(encoded)
+                    self.text_size += len(encoded)
+
+                    c["play"].append(play_row)
+                    c["act"].append(act_row)
+                    c["scene"].append(scene_row)
+                    c["position"].append(pos)
+                    c["speaker"].append(self.sid(raw))
+                    c["speaker_norm"].append(self.sid(norm) if norm else NO_SPEAKER)
+                    c["words"].append(sp.get("length", 0))
+                    c["male_pron"].append(m)
+                    c["female_pron"].append(f)
+                    c["text_off"].append(self.text_size)
+                c["scene_speeches"].append(len(c["play"]))
+            c["act_scenes"].append(len(c["scene_n"]))
+        c["play_acts"].append(len(c["act_n"]))
+
+    def close(self) -> None:
+        if self.text_f.closed:
+            return
+        self.text_f.close()
+
+        write_columns(self.path, MAGIC, VERSION, dict(self.cols, **string_columns(self.strings)))
+
+    def __enter__(self) -> "SpeechTableWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, *exc: Any) -> None:
+        if exc_type is not None:
+            self.text_f.close()
+        self.close()
+
+
+def write_speech_table(path: Union[str, Path], plays: Iterable[Dict[str, Any]]) -> None:
+    with SpeechTableWriter(path) as out:
+        for play in plays:
+            out.add(play)
+
+
+def convert_parsed(parsed_path: Union[str, Path], out_path: Union[str, Path]) -> None:
+    """Build a speech table from an existing ibsen_parsed.json."""
+    with open(parsed_path, encoding="utf-8") as f:
+        plays = json.load(f)["plays"]
+    write_speech_table(out_path, plays)
+
+
+class SpeechTable:
+    """Memory-mapped, read-only view of ibsen_speeches.bin + .text."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self._file = ColumnFile(path, MAGIC, VERSION)
+        self._text = MappedFile(text_path(path))
+        self.text_blob = self._text.view
+        self.columns: Dict[str, Sequence[int]] = self._file.columns
+        if len(self.text_blob) != self.columns["text_off"][-1]:
+            self.close()
+            raise ValueError(f"Truncated or mismatched {text_path(path).name} for {path}")
+        self.strings = self._file.strings()
+        self._scenes: Optional[Dict[Tuple[str, str, str], List[int]]] = None
+
+    def __len__(self) -> int:
+        return len(self.columns["play"])
+
+    def __getitem__(self, name: str) -> Sequence[int]:
+        return self.columns[name]
+
+    @property
+    def n_plays(self) -> int:
+        return len(self.columns["play_title"])
+
+    def text_view(self, row: int) -> memoryview:
+        """UTF-8 bytes of one speech, sliced from the mapped blob without copying."""
+        off = self.columns["text_off"]
+        return self.text_blob[off[row]:off[row + 1]]
+
+    def text(self, row: int) -> str:
+        return str(self.text_view(row), "utf-8")
+
+    def play_index(self, title: str) -> int:
+        titles = self.columns["play_title"]
+        for p in range(self.n_plays):
+            if self.strings[titles[p]] == title:
+                return p
+        raise KeyError(f"No play titled {title!r} in the speech table")
+
+    def scene_candidates(self, play: str, act_n: str, scene_n: str) -> List[int]:
+        """Scene rows labelled (play title, act_n, scene_n); labels can repeat within a play."""
+        if self._scenes is None:
+            s, c = self.strings, self.columns
+            self._scenes = {}
+            for p in range(self.n_plays):
+                for a in range(c["play_acts"][p], c["play_acts"][p + 1]):
+                    for sc in range(c["act_scenes"][a], c["act_scenes"][a + 1]):
+                        key = (s[c["play_title"][p]], s[c["act_n"][a]], s[c["scene_n"][sc]])
+                        self._scenes.setdefault(key, []).append(sc)
+        return self._scenes[(play, str(act_n), str(scene_n))]
+
+    def scene_rows(self, play: str, act_n: str, scene_n: str, occurrence: int = 0) -> range:
+        sc = self.scene_candidates(play, act_n, scene_n)[occurrence]
+        bounds = self.columns["scene_speeches"]
+        return range(bounds[sc], bounds[sc + 1])
+
+    def speech_row(self, play: str, act_n: str, scene_n: str, i: int) -> int:
+        """Row of the i-th speech (as in parse_play) of a scene."""
+        return self.scene_rows(play, act_n, scene_n)[i]
+
+    def dialog_context(
+        self, dialog: Dict[str, Any], before: int = 2, after: int = 2
+    ) -> List[Tuple[int, str, str]]:
+        """
+        (row, speaker, text) for a dialog from compute_dialogs_for_play plus
+        `before`/`after` speeches around it. The dialog's indices skip
+        speeches without a usable speaker name, as the dialog finder does.
+        When scene labels repeat, the scene whose speakers match is used.
+        """
+        norm = self.columns["speaker_norm"]
+        start, end = dialog["start_index"], dialog["end_index"]
+        pair = set(dialog["speakers"])
+        bounds = self.columns["scene_speeches"]
+        rows: List[int] = []
+        for sc in self.scene_candidates(dialog["play"], dialog["act"], dialog["scene"]):
+            rows = [r for r in range(bounds[sc], bounds[sc + 1]) if norm[r] != NO_SPEAKER]
+            if {self.strings[norm[r]] for r in rows[start:end + 1]} == pair:
+                break
+        lo = max(start - before, 0)
+        hi = end + after + 1
+        speakers = self.columns["speaker"]
+        return [(r, self.strings[speakers[r]], self.text(r)) for r in rows[lo:hi]]
+
+    def play_rows(self, p: int) -> range:
+        acts, scenes, speeches = self["play_acts"], self["act_scenes"], self["scene_speeches"]
+        return range(speeches[scenes[acts[p]]], speeches[scenes[acts[p + 1]]])
+
+    def play(self, p: int) -> Dict[str, Any]:
+        """Play p as parse_play returned it."""
+        s, c = self.strings, self.columns
+        speakers, words = c["speaker"], c["words"]
+        acts = []
+        for a in range(c["play_acts"][p], c["play_acts"][p + 1]):
+            scenes = []
+            for sc in range(c["act_scenes"][a], c["act_scenes"][a + 1]):
+                rows = range(c["scene_speeches"][sc], c["scene_speeches"][sc + 1])
+                speeches = [
+                    {"speaker": s[speakers[i]], "text": self.text(i), "length": words[i]} for i in rows
+                ]
+                scenes.append({
+                    "scene_n": s[c["scene_n"][sc]],
+                    "speakers_in_scene": sorted({sp["speaker"] for sp in speeches}),
+                    "speeches": speeches,
+                })
+            acts.append({"act_n": s[c["act_n"][a]], "scenes": scenes})
+        return {"title": s[c["play_title"][p]], "file": s[c["play_file"][p]], "acts": acts}
+
+    def iter_plays(self) -> Iterator[Dict[str, Any]]:
+        for p in range(self.n_plays):
+            yield self.play(p)
+
+    def to_nested(self) -> List[Dict[str, Any]]:
+        return list(self.iter_plays())
+
+    def close(self) -> None:
+        self._file.close()
+        self._text.close()
+
+    def __enter__(self) -> "SpeechTable":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def print_dialogs(table: SpeechTable, title: str, before: int = 2, after: int = 2) -> None:
+    """Print each (KQ)^n dialog of one play with its surrounding lines."""
+    from ibsen_networks_acts import compute_dialogs_for_play
+
+    for dialog in compute_dialogs_for_play(table.play(table.play_index(title))):
+        a, b = dialog["speakers"]
+        print(f"== Akt {dialog['act']}, scene {dialog['scene']}: {a} / {b} ({dialog['length']} replikker)")
+        inside = range(dialog["start_index"], dialog["end_index"] + 1)
+        first = max(dialog["start_index"] - before, 0)
+        for k, (_row, speaker, text) in enumerate(table.dialog_context(dialog, before, after), start=first):
+            print(f"{'>' if k in inside else ' '} {speaker}: {text}")
+
+
+if __name__ == "__main__":
+    out_dir = Path(__file__).resolve().parents[2] / "data" / "output"
+    args = sys.argv[1:]
+    if args[:1] == ["--context"]:
+        table_file = Path(args[2]) if len(args) > 2 else out_dir / "ibsen_speeches.bin"
+        with SpeechTable(table_file) as table:
+            print_dialogs(table, args[1])
+        sys.exit(0)
+    src = Path(args[0]) if args else out_dir / "ibsen_parsed.json"
+    dst = Path(args[1]) if len(args) > 1 else out_dir / "ibsen_speeches.bin"
+    convert_parsed(src, dst)
+    print(f"Wrote speech table: {dst}")
@@ -0,0 +1,63 @@
+"""
+lxml backend for parse_tei.py (--xml-backend lxml): the same element-level
+interface as parse_tei.EtreeBackend, on a tree built by libxml2.
+
+    parse        etree.parse, comments and processing instructions dropped
+                 (as ElementTree does)
+    acts         .//tei:div[@type='act']          compiled XPath
+    scene_divs   ./tei:div[@type='scene']         compiled XPath
+    child_divs   ./tei:div                        compiled XPath
+    speeches     node.iter("{*}sp", "{*}hisSp")   tag filter in C, node included
+    speakers     sp.iter("{*}speaker")
+    text_parts   the function passed in (parse_tei.collect_text)
+
+Tags are matched by local name in any namespace, like parse_tei.local(), so
+the output is the same as with ElementTree; parse_tei.py --check-backends
+compares the two. Speech text stays a Python walk over the skip set: the
+exact C-side alternatives (an XPath text() filter on skipped ancestors, an
+XSLT pass, clear() on a copy of each sp) were slower on these short speeches.
+
+lxml is optional and only imported when this backend is selected.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List
+
+from lxml import etree
+
+
+class LxmlBackend:
+    name = "lxml"
+
+    def __init__(
+        self,
+        ns: Dict[str, str],
+        speech_tags: Iterable[str],
+        text_parts: Callable[[Any], List[str]],
+    ) -> None:
+        self.parser = etree.XMLParser(remove_comments=True, remove_pis=True)
+        self._acts = etree.XPath(".//tei:div[@type='act']", namespaces=ns)
+        self._scene_divs = etree.XPath("./tei:div[@type='scene']", namespaces=ns)
+        self._child_divs = etree.XPath("./tei:div", namespaces=ns)
+        self._speech_tags = tuple(f"{{*}}{tag}" for tag in sorted(speech_tags))
+        self.text_parts = text_parts
+
+    def parse(self, xml_path: Path) -> Any:
+        return etree.parse(str(xml_path), self.parser).getroot()
+
+    def acts(self, root: Any) -> List[Any]:
+        return self._acts(root)
+
+    def scene_divs(self, act_div: Any) -> List[Any]:
+        return self._scene_divs(act_div)
+
+    def child_divs(self, act_div: Any) -> List[Any]:
+        return self._child_divs(act_div)
+
+    def speeches(self, node: Any) -> List[Any]:
+        return list(node.iter(*self._speech_tags))
+
+    def speaker_elements(self, sp: Any) -> Iterable[Any]:
+        return sp.iter("{*}speaker")
@@ -0,0 +1,197 @@
+"""
+Inverted token index over the speech table (speech_table.py).
+
+For every lowercased WORD_RE token, ibsen_tokens.bin holds a positional
+postings list: the speech rows it occurs in and its token position in each,
+sorted by row. The file is a column_file.py column file (magic "IBTI"):
+
+    str_off, str_blob   vocabulary, sorted
+    term_off            u64, n_terms + 1: term k owns postings term_off[k]:term_off[k + 1]
+    rows, positions     u32 postings
+
+TokenIndex answers term and phrase queries, optionally filtered by speaker
+(normalized name), gender (as gender_of gives it, so gender-map edits need
+no rebuild), play title or act label, and counts terms over a row range by
+bisecting the postings, so pronoun counts for a dialog are lookups instead
+of re-tokenizing its text.
+
+Run:
+    python data/scripts/token_index.py --build
+    python data/scripts/token_index.py "min mand" --gender F --play Et_dukkehjem_1879
+"""
+
+from __future__ import annotations
+
+import argparse
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from column_file import ColumnFile, string_columns, write_columns
+from ibsen_networks_acts import FEMALE_PRONOUNS, MALE_PRONOUNS, WORD_RE, gender_of
+from speech_table import NO_SPEAKER, SpeechTable
+
+MAGIC = b"IBTI"
+VERSION = 1
+
+
+def tokenize(text: str) -> List[str]:
+    return [tok.lower() for tok in WORD_RE.findall(text)]
+
+
+def build_token_index(table: SpeechTable, path: Union[str, Path]) -> None:
+    """Write the postings for every speech in `table` to `path`."""
+    postings: Dict[str, Tuple[array, array]] = {}
+    for row in range(len(table)):
+        for pos, tok in enumerate(tokenize(table.text(row))):
+            entry = postings.get(tok)
+            if entry is None:
+                entry = postings[tok] = (array("I"), array("I"))
+            entry[0].append(row)
+            entry[1].append(pos)
+
+    terms = sorted(postings)
+    term_off = array("Q", [0])
+    rows, positions = array("I"), array("I")
+    for term in terms:
+        term_rows, term_pos = postings[term]
+        rows.extend(term_rows)
+        positions.extend(term_pos)
+        term_off.append(len(rows))
+    columns = dict(string_columns(terms), term_off=term_off, rows=rows, positions=positions)
+    write_columns(path, MAGIC, VERSION, columns)
+
+
+class TokenIndex:
+    """Memory-mapped ibsen_tokens.bin, queried against its SpeechTable."""
+
+    def __init__(self, path: Union[str, Path], table: SpeechTable) -> None:
+        self._file = ColumnFile(path, MAGIC, VERSION)
+        self.table = table
+        self.terms = {term: k for k, term in enumerate(self._file.strings())}
+        cols = self._file.columns
+        self._term_off, self._rows, self._positions = cols["term_off"], cols["rows"], cols["positions"]
+        self._genders: Dict[Tuple[int, int], str] = {}
+
+    def occurrences(self, term: str) -> Tuple[Sequence[int], Sequence[int]]:
+        """(rows, positions) of every occurrence of `term`, sorted by row."""
+        k = self.terms.get(term.lower())
+        if k is None:
+            return (), ()
+        lo, hi = self._term_off[k], self._term_off[k + 1]
+        return self._rows[lo:hi], self._positions[lo:hi]
+
+    def term_rows(self, term: str) -> List[int]:
+        rows, _ = self.occurrences(term)
+        return sorted(set(rows))
+
+    def phrase_rows(self, phrase: str) -> List[int]:
+        """Rows containing the tokens of `phrase` consecutively."""
+        tokens = tokenize(phrase)
+        if not tokens:
+            return []
+        rows, positions = self.occurrences(tokens[0])
+        hits = {(r << 32) | p for r, p in zip(rows, positions)}
+        for offset, tok in enumerate(tokens[1:], start=1):
+            rows, positions = self.occurrences(tok)
+            hits &= {(r << 32) | (p - offset) for r, p in zip(rows, positions) if p >= offset}
+            if not hits:
+                return []
+        return sorted({h >> 32 for h in hits})
+
+    def count(self, terms: Iterable[str], start: int, end: int, speakers_only: bool = False) -> int:
+        """
+        Occurrences of any of `terms` in speech rows start..end (inclusive);
+        with speakers_only, rows without a speaker (NO_SPEAKER) are left out.
+        """
+        norm = self.table["speaker_norm"]
+        total = 0
+        for term in terms:
+            rows, _ = self.occurrences(term)
+            lo, hi = bisect_left(rows, start), bisect_right(rows, end)
+            if speakers_only:
+                total += sum(1 for r in rows[lo:hi] if norm[r] != NO_SPEAKER)
+            else:
+                total += hi - lo
+        return total
+
+    def pronoun_counts(self, start: int, end: int) -> Tuple[int, int]:
+        """
+        (male, female) pronoun counts over rows start..end. Rows without a
+        speaker are skipped, as the dialog and network code skip them.
+        """
+        return (
+            self.count(MALE_PRONOUNS, start, end, speakers_only=True),
+            self.count(FEMALE_PRONOUNS, start, end, speakers_only=True),
+        )
+
+    def gender(self, row: int) -> str:
+        t = self.table
+        norm, play = t["speaker_norm"][row], t["play"][row]
+        if norm == NO_SPEAKER:
+            return "?"
+        code = self._genders.get((norm, play))
+        if code is None:
+            code = gender_of(t.strings[norm], t.strings[t["play_title"][play]])
+            self._genders[(norm, play)] = code
+        return code
+
+    def search(
+        self,
+        query: str,
+        speaker: Optional[str] = None,
+        gender: Optional[str] = None,
+        play: Optional[str] = None,
+        act: Optional[str] = None,
+    ) -> List[int]:
+        """Rows matching a term or phrase, narrowed by the given filters."""
+        rows = self.phrase_rows(query)
+        t = self.table
+        s = t.strings
+        if play is not None:
+            p = t.play_index(play)
+            rows = [r for r in rows if t["play"][r] == p]
+        if act is not None:
+            rows = [r for r in rows if s[t["act_n"][t["act"][r]]] == str(act)]
+        if speaker is not None:
+            rows = [r for r in rows if t["speaker_norm"][r] != NO_SPEAKER and s[t["speaker_norm"][r]] == speaker]
+        if gender is not None:
+            rows = [r for r in rows if self.gender(r) == gender]
+        return rows
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "TokenIndex":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+if __name__ == "__main__":
+    out_dir = Path(__file__).resolve().parents[2] / "data" / "output"
+    parser = argparse.ArgumentParser()
+    parser.add_argument("query", nargs="?", help="Term or phrase to look up")
+    parser.add_argument("--build", action="store_true", help="(Re)build the index from the speech table first")
+    parser.add_argument("--table", type=Path, default=out_dir / "ibsen_speeches.bin")
+    parser.add_argument("--index", type=Path, default=out_dir / "ibsen_tokens.bin")
+    parser.add_argument("--speaker")
+    parser.add_argument("--gender", choices=["F", "M", "?"])
+    parser.add_argument("--play")
+    parser.add_argument("--act")
+    args = parser.parse_args()
+
+    with SpeechTable(args.table) as table:
+        if args.build:
+            build_token_index(table, args.index)
+            print(f"Wrote token index: {args.index}")
+        if args.query:
+            with TokenIndex(args.index, table) as index:
+                rows = index.search(args.query, args.speaker, args.gender, args.play, args.act)
+                for r in rows:
+                    title = table.strings[table["play_title"][table["play"][r]]]
+                    act_n = table.strings[table["act_n"][table["act"][r]]]
+                    print(f"{title} akt {act_n} – {table.strings[table['speaker'][r]]}: {table.text(r)}")
+                print(f"{len(rows)} treff")
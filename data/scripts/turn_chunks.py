@@ -0,0 +1,130 @@
+"""
+Compact, per-act chunks of an export block's scene_turns for the animated
+player, so it can fetch and start the first act while the rest load.
+
+    turns/index.json          {"plays": {play_id: "<stem>.json", ...}}
+    turns/<stem>.json         chunk index for one play
+    turns/<stem>.<k>.json     chunk k (1-based), one act
+
+Chunk index:
+
+    {"id": ..., "speakers": [name, ...],
+     "chunks": [{"act": "1", "file": "<stem>.1.json", "n_scenes": 4, "n_turns": 210}, ...]}
+
+Chunk:
+
+    {"act": "1", "scenes": ["1", "2", ...],
+     "scene_len": [turns per scene],       # delta-encoded scene offsets
+     "speaker": [index into speakers per turn], "words": [words per turn]}
+
+Speaker names are stored once per play instead of once per turn.
+decode_play() rebuilds the scene_turns list exactly.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+from shards import copy_shards, dumps_compact, shard_filename
+
+INDEX_NAME = "index.json"
+
+
+def encode_play(block: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """(chunk index, chunks) for one export block; chunk file names are set by the writer."""
+    speakers: Dict[str, int] = {}
+    chunks: List[Dict[str, Any]] = []
+    for st in block["scene_turns"]:
+        if not chunks or chunks[-1]["act"] != st["act"]:
+            chunks.append({"act": st["act"], "scenes": [], "scene_len": [], "speaker": [], "words": []})
+        chunk = chunks[-1]
+        chunk["scenes"].append(st["scene"])
+        chunk["scene_len"].append(len(st["turns"]))
+        for t in st["turns"]:
+            chunk["speaker"].append(speakers.setdefault(t["speaker"], len(speakers)))
+            chunk["words"].append(t["words"])
+    index = {
+        "id": block["id"],
+        "speakers": list(speakers),
+        "chunks": [
+            {"act": c["act"], "n_scenes": len(c["scenes"]), "n_turns": len(c["speaker"])}
+            for c in chunks
+        ],
+    }
+    return index, chunks
+
+
+def decode_chunk(speakers: List[str], chunk: Dict[str, Any]) -> List[Dict[str, Any]]:
+    out = []
+    pos = 0
+    for scene, n in zip(chunk["scenes"], chunk["scene_len"]):
+        turns = [
+            {"speaker": speakers[s], "words": w}
+            for s, w in zip(chunk["speaker"][pos:pos + n], chunk["words"][pos:pos + n])
+        ]
+        out.append({"act": chunk["act"], "scene": scene, "turns": turns})
+        pos += n
+    return out
+
+
+def decode_play(index: Dict[str, Any], chunks: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """scene_turns for a play from its chunk index and chunks (in order)."""
+    return [st for chunk in chunks for st in decode_chunk(index["speakers"], chunk)]
+
+
+class TurnChunkWriter:
+    """Incremental writer: one index + chunk files per add(), turns/index.json and cleanup on close()."""
+
+    def __init__(self, out_dir: Path) -> None:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        self.out_dir = out_dir
+        self.plays: Dict[str, str] = {}
+        self.written = {INDEX_NAME}
+        self.closed = False
+
+    def add(self, block: Dict[str, Any]) -> None:
+        index_file = shard_filename(block["id"])
+        if index_file in self.written:
+            raise ValueError(f"Turn chunk name collision for play id {block['id']!r}: {index_file}")
+        stem = index_file[: -len(".json")]
+        index, chunks = encode_play(block)
+        for k, (entry, chunk) in enumerate(zip(index["chunks"], chunks), start=1):
+            entry["file"] = f"{stem}.{k}.json"
+            if entry["file"] in self.written:
+                raise ValueError(f"Turn chunk name collision for play id {block['id']!r}: {entry['file']}")
+            (self.out_dir / entry["file"]).write_text(dumps_compact(chunk), encoding="utf-8")
+            self.written.add(entry["file"])
+        (self.out_dir / index_file).write_text(dumps_compact(index), encoding="utf-8")
+        self.written.add(index_file)
+        self.plays[block["id"]] = index_file
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        (self.out_dir / INDEX_NAME).write_text(dumps_compact({"plays": self.plays}), encoding="utf-8")
+        for stale in self.out_dir.glob("*.json"):
+            if stale.name not in self.written:
+                stale.unlink()
+
+    def __enter__(self) -> "TurnChunkWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, *exc: Any) -> None:
+        if exc_type is None:
+            self.close()
+
+
+def load_play_turns(turn_dir: Path, play_id: str) -> List[Dict[str, Any]]:
+    plays = json.loads((turn_dir / INDEX_NAME).read_text(encoding="utf-8"))["plays"]
+    index = json.loads((turn_dir / plays[play_id]).read_text(encoding="utf-8"))
+    chunks = (
+        json.loads((turn_dir / entry["file"]).read_text(encoding="utf-8")) for entry in index["chunks"]
+    )
+    return decode_play(index, chunks)
+
+
+# Same flat mirroring as the play shards.
+copy_turn_chunks = copy_shards
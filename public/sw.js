@@ -1,13 +1,88 @@
-// Minimal service worker – ingen cachinglogikk ennå,
-// men nok til at browseren ser appen som PWA-kandidat.
+// Service worker: cacher datafilene som står i data/manifest.json
+// (skrevet av `parse_tei.py --copy-to-public --hashed`, se data/scripts/artifacts.py).
+//
+// En forespørsel etter f.eks. ibsen_networks.json eller plays/Brand_1866.json
+// besvares med den innholdshashede kopien fra manifestet. Hashede filer endres
+// aldri, så de hentes fra cachen når de finnes der, og ellers hentes .gz-varianten
+// og pakkes ut i nettleseren (GitHub Pages sender ikke egne .gz-filer komprimert).
+// Etter en ny deploy gir nytt manifest nye navn bare for filene som er endret;
+// resten blir liggende i cachen. Manifestet selv revalideres ved hver sidelasting.
+
+const CACHE = 'ibsen-data-v1'
+const SCOPE = self.registration.scope
+const DATA_DIR = new URL('data/', SCOPE).href
+const MANIFEST_URL = DATA_DIR + 'manifest.json'
+// samme filer som artifacts.PUBLIC_PATTERNS
+const DATA_NAME = /^(ibsen_networks\.(json|bin)|(plays|turns|layout)\/[^/]+\.json)$/
+
+let manifestPromise = null
+
+const loadManifest = () => {
+  manifestPromise = fetch(MANIFEST_URL, { cache: 'no-cache' })
+    .then((res) => (res.ok ? res.json() : null))
+    .catch(() => null)
+  return manifestPromise
+}
+
+const getManifest = () => manifestPromise ?? loadManifest()
+
+const contentType = (name) => (name.endsWith('.json') ? 'application/json; charset=utf-8' : 'application/octet-stream')
+
+// Fjern hashede filer som ikke lenger står i manifestet
+const prune = async (manifest) => {
+  if (!manifest) return
+  const wanted = new Set(Object.values(manifest.files).map((e) => DATA_DIR + e.file))
+  const cache = await caches.open(CACHE)
+  for (const req of await cache.keys()) {
+    if (!wanted.has(req.url)) await cache.delete(req)
+  }
+}
+
+const fetchHashed = async (name, entry) => {
+  const url = DATA_DIR + entry.file
+  const cache = await caches.open(CACHE)
+  const hit = await cache.match(url)
+  if (hit) return hit
+
+  let body
+  if (entry.gzip && typeof DecompressionStream !== 'undefined') {
+    const res = await fetch(DATA_DIR + entry.gzip)
+    if (res.ok) body = await new Response(res.body.pipeThrough(new DecompressionStream('gzip'))).blob()
+  }
+  if (!body) {
+    const res = await fetch(url)
+    if (!res.ok) return res
+    body = await res.blob()
+  }
+  const headers = { 'Content-Type': contentType(name), 'Cache-Control': 'public, max-age=31536000, immutable' }
+  await cache.put(url, new Response(body, { headers }))
+  return new Response(body, { headers })
+}
 
 self.addEventListener('install', (event) => {
   self.skipWaiting()
+  event.waitUntil(loadManifest())
 })
 
 self.addEventListener('activate', (event) => {
-  clients.claim()
+  event.waitUntil(Promise.all([clients.claim(), getManifest().then(prune)]))
 })
 
-// Tom fetch-handler (kan fylles med caching senere)
-self.addEventListener('fetch', () => {})
+self.addEventListener('fetch', (event) => {
+  const { request } = event
+  if (request.method !== 'GET') return
+  if (request.mode === 'navigate') {
+    // ny sidelasting: hent manifestet på nytt i tilfelle det har vært en deploy
+    event.waitUntil(loadManifest().then(prune))
+    return
+  }
+  if (!request.url.startsWith(SCOPE) || request.url.startsWith(DATA_DIR)) return
+  const name = decodeURIComponent(new URL(request.url).pathname.slice(new URL(SCOPE).pathname.length))
+  if (!DATA_NAME.test(name)) return
+  event.respondWith(
+    getManifest().then((manifest) => {
+      const entry = manifest?.files?.[name]
+      return entry ? fetchHashed(name, entry).catch(() => fetch(request)) : fetch(request)
+    }),
+  )
+})
@@ -24,7 +24,7 @@ const displayTitle = (title) => (title ? String(title).replace(/_/g, ' ') : '')
 
 const computePositions = (nodes = [], width = 560, height = 560) => {
   if (!nodes.length) return new Map()
-  const sorted = [...nodes].sort((a, b) => (a.id || '').localeCompare(b.id || ''))
+  const sorted = [...nodes].sort((a, b) => (a.id || '').localeCompare(b.id || '', 'nb'))
   const cx = width / 2
   const cy = height / 2
   const radius = Math.min(width, height) * 0.35
@@ -8,5 +8,11 @@ ReactDOM.createRoot(document.getElementById('root')).render(
   </React.StrictMode>,
 )
 
-// Midlertidig: ikke registrer service worker for å unngå cache/stale i dev/Pages
-// Slå på igjen ved behov.
+// Service worker bare i produksjonsbygget. Den cacher kun datafilene i
+// data/manifest.json (innholdshashet, se public/sw.js), ikke selve appen,
+// så appen blir ikke stale.
+if (import.meta.env.PROD && 'serviceWorker' in navigator) {
+  window.addEventListener('load', () => {
+    navigator.serviceWorker.register(`${import.meta.env.BASE_URL}sw.js`).catch(() => {})
+  })
+}
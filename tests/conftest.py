@@ -0,0 +1,95 @@
+"""
+Shared fixtures: data/scripts on sys.path, a few hand-written TEI plays and
+a handful of real plays from data/raw/plays.
+"""
+
+import sys
+from pathlib import Path
+from typing import List
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS = ROOT / "data" / "scripts"
+sys.path.insert(0, str(SCRIPTS))
+
+RAW_DIR = ROOT / "data" / "raw" / "plays"
+# small and mid-sized plays, with and without scene divs
+CORPUS_SAMPLE = ("Norma_1851.xml", "Svanhild_1860.xml", "Et_dukkehjem_1879.xml")
+
+TEI = 'xmlns="http://www.tei-c.org/ns/1.0" xmlns:HIS="http://www.example.org/ns/HIS"'
+
+SAMPLES = {
+    # acts with scene divs, HIS speeches, skipped elements with tails, comments
+    "Namespaced_1900": f"""<?xml version="1.0" encoding="UTF-8"?>
+<TEI {TEI}>
+  <text><body>
+    <div type="act" n="1">
+      <div type="scene" n="1">
+        <sp who="NORA"><speaker>NORA.</speaker>
+          <p>Skjul <stage>(ler)</stage>juletræet<lb/>godt, Helene.<!-- kommentar --> Ja.</p>
+        </sp>
+        <HIS:hisSp who="HELMER">
+          <HIS:spOpener><speaker>HELMER</speaker><HIS:hisStage>inde</HIS:hisStage></HIS:spOpener>
+          <l><anchor xml:id="a1"/>Er det <note>(note)</note>lærkefuglen?</l>
+        </HIS:hisSp>
+        <sp><speaker>Fru <hi>Linde</hi></speaker><p>God dag<pb n="2"/>, Nora.</p></sp>
+        <sp><p>Ingen taler her.</p></sp>
+        <sp who="NORA"><p>Hun er min mand, han og hans.</p></sp>
+        <sp who="HELMER"><p>Hun sa det til ham.</p></sp>
+      </div>
+      <div type="scene"><sp who="NORA"><p>Andre scene.</p></sp></div>
+    </div>
+    <div type="act" n="2">
+      <div><sp who="HELMER"><p>Akt uten scenetype.</p></sp></div>
+    </div>
+    <div type="act">
+      <sp who="NORA"><p>Akt uten scener.</p></sp>
+    </div>
+  </body></text>
+</TEI>
+""",
+    # no namespace at all: no acts are found, sp/hisSp still are
+    "Unnamespaced_1900": """<?xml version="1.0" encoding="UTF-8"?>
+<TEI>
+  <text><body>
+    <div type="act" n="1">
+      <sp who="A"><speaker>A</speaker><p>Første <stage>(pause)</stage>replikk.</p></sp>
+      <hisSp><spOpener><speaker>B</speaker></spOpener><l>Svar<lb/>her.</l></hisSp>
+    </div>
+  </body></text>
+</TEI>
+""",
+    # a HIS-namespaced sp inside a plain TEI play without acts
+    "Mixed_1900": f"""<?xml version="1.0" encoding="UTF-8"?>
+<TEI {TEI}>
+  <text><body>
+    <sp who="A"><p>Uten akter.</p></sp>
+    <HIS:sp who="B"><p>Annet <HIS:stage>(x)</HIS:stage>navnerom.</p></HIS:sp>
+  </body></text>
+</TEI>
+""",
+}
+
+
+@pytest.fixture(scope="session")
+def sample_files(tmp_path_factory) -> List[Path]:
+    out = tmp_path_factory.mktemp("tei")
+    for name, xml in SAMPLES.items():
+        (out / f"{name}.xml").write_text(xml, encoding="utf-8")
+    return sorted(out.glob("*.xml"))
+
+
+@pytest.fixture(scope="session")
+def corpus_files() -> List[Path]:
+    files = [RAW_DIR / name for name in CORPUS_SAMPLE if (RAW_DIR / name).exists()]
+    if not files:
+        pytest.skip("sample plays not in data/raw/plays")
+    return files
+
+
+@pytest.fixture(scope="session")
+def parsed_plays(corpus_files, sample_files):
+    import parse_tei
+
+    return [parse_tei.parse_play(xml) for xml in corpus_files + sample_files]
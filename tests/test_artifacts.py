@@ -0,0 +1,65 @@
+"""
+parse_tei.py --copy-to-public with and without --hashed: public/data must
+never keep a manifest that points past the files this run copied.
+"""
+
+import json
+import shutil
+
+import pytest
+
+import artifacts
+import parse_tei
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch, sample_files):
+    """parse_tei's input, output and public/ paths moved under tmp_path."""
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    for xml in sample_files:
+        shutil.copy(xml, raw / xml.name)
+    public = tmp_path / "public"
+    public.mkdir()
+    monkeypatch.setattr(parse_tei, "ROOT", tmp_path)
+    monkeypatch.setattr(parse_tei, "RAW_DIR", raw)
+    monkeypatch.setattr(parse_tei, "OUT_DIR", tmp_path / "output")
+    monkeypatch.setattr(parse_tei, "PUBLIC_JSON", public / "ibsen_networks.json")
+    monkeypatch.setattr(parse_tei, "PUBLIC_BIN", public / "ibsen_networks.bin")
+    monkeypatch.setattr(parse_tei, "PUBLIC_SHARDS", public / "plays")
+    monkeypatch.setattr(parse_tei, "PUBLIC_TURNS", public / "turns")
+    monkeypatch.setattr(parse_tei, "PUBLIC_LAYOUT", public / "layout")
+    monkeypatch.setattr(parse_tei, "PUBLIC_ARTIFACTS", public / "data")
+    return public
+
+
+def build(*argv):
+    return parse_tei.build(parse_tei.parse_args(["--no-cache", "--jobs", "1", *argv]))
+
+
+def test_manifest_lists_only_copied_files(site):
+    (site / "layout").mkdir()
+    (site / "layout" / "Leftover.json").write_text("{}", encoding="utf-8")
+    build("--copy-to-public", "--hashed", "--shards")
+    manifest = json.loads((site / "data" / artifacts.MANIFEST_NAME).read_text(encoding="utf-8"))
+    names = set(manifest["files"])
+    assert "ibsen_networks.json" in names
+    assert any(name.startswith("plays/") for name in names)
+    assert not any(name.startswith("layout/") for name in names)
+    for entry in manifest["files"].values():
+        assert (site / "data" / entry["file"]).exists()
+        assert (site / "data" / entry["gzip"]).exists()
+
+
+def test_plain_run_drops_stale_manifest(site):
+    build("--copy-to-public", "--hashed", "--shards")
+    assert (site / "data" / artifacts.MANIFEST_NAME).exists()
+
+    build("--copy-to-public")
+    assert not (site / "data").exists()
+    assert (site / "ibsen_networks.json").exists()
+
+
+def test_hashed_needs_copy_to_public():
+    with pytest.raises(SystemExit):
+        parse_tei.parse_args(["--hashed"])
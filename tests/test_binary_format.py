@@ -0,0 +1,72 @@
+"""
+ibsen_networks.bin round trip: read_binary() gives back the JSON export, and
+damaged files are rejected with a ValueError.
+"""
+
+import json
+
+import pytest
+
+import binary_format
+from binary_format import BinaryNetworks, read_binary, write_binary
+from ibsen_networks_acts import export_play
+
+FEMALE = {"NORA": True, "Fru Linde": True, "HELMER": False}
+
+
+@pytest.fixture(scope="module")
+def exported(parsed_plays):
+    return [export_play(play) for play in parsed_plays]
+
+
+@pytest.fixture
+def bin_path(tmp_path, exported):
+    path = tmp_path / "ibsen_networks.bin"
+    write_binary(path, FEMALE, exported)
+    return path
+
+
+def as_json(value):
+    # the reader gives lists where export_play may hold tuples
+    return json.loads(json.dumps(value, ensure_ascii=False))
+
+
+def test_round_trip_matches_json_export(bin_path, exported):
+    assert read_binary(bin_path) == as_json({"FEMALE_CHARACTERS": FEMALE, "plays": exported})
+
+
+def test_random_access(bin_path, exported):
+    networks = BinaryNetworks(bin_path)
+    assert len(networks) == len(exported)
+    for i in reversed(range(len(exported))):
+        assert networks.play(i) == as_json(exported[i])
+
+
+def test_empty_file_list(tmp_path):
+    path = tmp_path / "empty.bin"
+    write_binary(path, {}, [])
+    assert read_binary(path) == {"FEMALE_CHARACTERS": {}, "plays": []}
+
+
+@pytest.mark.parametrize("keep", [0, 10, binary_format._HEADER.size, -1, -8])
+def test_truncated_file(bin_path, keep):
+    data = bin_path.read_bytes()
+    bin_path.write_bytes(data[:keep] if keep >= 0 else data[:len(data) + keep])
+    with pytest.raises(ValueError, match="Truncated"):
+        read_binary(bin_path)
+
+
+def test_wrong_version(bin_path):
+    data = bytearray(bin_path.read_bytes())
+    data[4:8] = (binary_format.VERSION - 1).to_bytes(4, "little")
+    bin_path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match=f"v{binary_format.VERSION}"):
+        read_binary(bin_path)
+
+
+def test_wrong_magic(bin_path):
+    data = bytearray(bin_path.read_bytes())
+    data[:4] = b"IBNX"
+    bin_path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="Not an ibsen_networks.bin"):
+        read_binary(bin_path)
@@ -0,0 +1,118 @@
+"""
+CompactGraph against the networkx builders it replaced: same nodes, same
+edges in the same order, same accumulated values.
+"""
+
+from itertools import combinations
+
+import pytest
+
+import ibsen_networks_acts as ina
+from ibsen_networks_acts import count_words, normalize_name
+
+nx = pytest.importorskip("networkx")
+
+
+def _sequence(scene):
+    seq = []
+    for sp in scene.get("speeches", []):
+        speaker = normalize_name(sp.get("speaker"))
+        if not speaker:
+            continue
+        length = sp.get("length")
+        if length is None:
+            length = count_words(sp.get("text", "") or "")
+        seq.append((speaker, length))
+    return seq
+
+
+def _add_scene(G, seq):
+    if len(seq) < 2:
+        return
+    for (a, len_a), (b, len_b) in zip(seq, seq[1:]):
+        if not G.has_node(a):
+            G.add_node(a)
+        if not G.has_node(b):
+            G.add_node(b)
+        if G.has_edge(a, b):
+            G[a][b]["count"] += 1
+            G[a][b]["len_A_sum"] += len_a
+            G[a][b]["len_B_sum"] += len_b
+        else:
+            G.add_edge(a, b, count=1, len_A_sum=len_a, len_B_sum=len_b)
+
+
+def _drop_loops(G):
+    G.remove_edges_from([(u, v) for u, v in G.edges() if u == v])
+    return G
+
+
+# the networkx builders as they were before CompactGraph
+
+
+def nx_speech_network(play):
+    G = nx.DiGraph()
+    for act in play.get("acts", []):
+        for scene in act.get("scenes", []):
+            _add_scene(G, _sequence(scene))
+    return _drop_loops(G)
+
+
+def nx_act_network(act):
+    G = nx.DiGraph()
+    for scene in act.get("scenes", []):
+        _add_scene(G, _sequence(scene))
+    return _drop_loops(G)
+
+
+def nx_cooccurrence_network(play):
+    G = nx.Graph()
+    for act in play.get("acts", []):
+        for scene in act.get("scenes", []):
+            speakers = sorted({normalize_name(s) for s in scene.get("speakers_in_scene", []) or [] if normalize_name(s)})
+            if len(speakers) < 2:
+                continue
+            for s in speakers:
+                if not G.has_node(s):
+                    G.add_node(s)
+            for a, b in combinations(speakers, 2):
+                if G.has_edge(a, b):
+                    G[a][b]["weight"] += 1
+                else:
+                    G.add_edge(a, b, weight=1)
+    return G
+
+
+def compact_edges(G):
+    return [(G.label(u), G.label(v), values) for u, v, values in G.edges()]
+
+
+def nx_edges(G, attrs):
+    return [(u, v, tuple(d[a] for a in attrs)) for u, v, d in G.edges(data=True)]
+
+
+def assert_same(compact, reference):
+    assert [compact.label(n) for n in compact.nodes] == list(reference.nodes())
+    assert compact_edges(compact) == nx_edges(reference, compact.attrs)
+    # to_networkx gives the reference graph back, in order
+    G = compact.to_networkx()
+    assert list(G.nodes()) == list(reference.nodes())
+    assert list(G.edges(data=True)) == list(reference.edges(data=True))
+
+
+def test_builders_match_networkx(parsed_plays):
+    for play in parsed_plays:
+        assert_same(ina.build_speech_network_and_transitions(play)[0], nx_speech_network(play))
+        assert_same(ina.build_cooccurrence_network(play), nx_cooccurrence_network(play))
+        for act in play.get("acts", []):
+            assert_same(ina.build_speech_network_for_act(act), nx_act_network(act))
+
+
+def test_analyze_play_matches_networkx(parsed_plays):
+    for play in parsed_plays:
+        analysis = ina.analyze_play(play)
+        assert len(analysis["acts"]) == len(play.get("acts", []))
+        assert_same(analysis["speech"], nx_speech_network(play))
+        assert_same(analysis["co"], nx_cooccurrence_network(play))
+        for act, entry in zip(play.get("acts", []), analysis["acts"]):
+            assert_same(entry["speech"], nx_act_network(act))
@@ -0,0 +1,67 @@
+"""
+data_server over a real socket: slices, keep-alive with request bodies, and
+405 closing the connection.
+"""
+
+import asyncio
+import gzip
+import json
+
+import pytest
+
+from data_server import DataService, PlayStore
+from ibsen_networks_acts import export_play
+from json_writer import fragment, write_plays_json
+
+
+@pytest.fixture(scope="module")
+def networks(tmp_path_factory, parsed_plays):
+    path = tmp_path_factory.mktemp("export") / "ibsen_networks.json"
+    write_plays_json(path, [fragment(export_play(play)) for play in parsed_plays], head={"FEMALE_CHARACTERS": {}})
+    return path
+
+
+async def exchange(store, raw):
+    """Send raw bytes on one connection; return everything read until it closes."""
+    server = await asyncio.start_server(DataService(store).handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(raw)
+        await writer.drain()
+        data = await asyncio.wait_for(reader.read(), 10)
+        writer.close()
+    return data
+
+
+def responses(data):
+    out = []
+    while data:
+        head, _, data = data.partition(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        headers = dict(line.split(": ", 1) for line in lines[1:])
+        n = int(headers["Content-Length"])
+        out.append((int(lines[0].split(" ")[1]), headers, data[:n]))
+        data = data[n:]
+    return out
+
+
+def test_slices_and_body_drain(networks, parsed_plays):
+    title = parsed_plays[0]["title"]
+    raw = (
+        b"GET /plays HTTP/1.1\r\nContent-Length: 5\r\n\r\nhello"
+        + f"GET /plays/{title}/co_network HTTP/1.1\r\nAccept-Encoding: gzip\r\n\r\n".encode()
+        + b"GET /plays/nope HTTP/1.1\r\nConnection: close\r\n\r\n"
+    )
+    (s1, _, index), (s2, h2, co), (s3, h3, _) = responses(asyncio.run(exchange(PlayStore(networks), raw)))
+    assert s1 == 200 and [e["id"] for e in json.loads(index)["plays"]] == [p["title"] for p in parsed_plays]
+    assert s2 == 200 and h2["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(co)) == json.loads(json.dumps(export_play(parsed_plays[0])["co_network"]))
+    assert s3 == 404 and h3["Connection"] == "close"
+
+
+def test_other_methods_close_the_connection(networks):
+    # the POST body must not be read as the next request
+    raw = b"POST /plays HTTP/1.1\r\nContent-Length: 18\r\n\r\nGET /plays HTTP/1.1\r\n\r\n"
+    [(status, headers, _)] = responses(asyncio.run(exchange(PlayStore(networks), raw)))
+    assert status == 405 and headers["Connection"] == "close"
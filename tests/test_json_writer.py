@@ -0,0 +1,29 @@
+import json
+
+import pytest
+
+from json_writer import PlaysJsonWriter, fragment, read_head_value, write_plays_json
+
+
+def test_output_matches_json_dump(tmp_path):
+    doc = {"FEMALE_CHARACTERS": {"Et_dukkehjem_1879": ["NORA"]}, "plays": [{"a": [1, 2]}, {"b": "ø"}]}
+    path = tmp_path / "out.json"
+    write_plays_json(path, [fragment(p) for p in doc["plays"]], head={"FEMALE_CHARACTERS": doc["FEMALE_CHARACTERS"]})
+    assert path.read_text(encoding="utf-8") == json.dumps(doc, ensure_ascii=False, indent=2)
+    assert read_head_value(path, "FEMALE_CHARACTERS") == doc["FEMALE_CHARACTERS"]
+    assert [p.name for p in tmp_path.iterdir()] == ["out.json"]
+
+
+def test_failed_write_keeps_previous_file(tmp_path):
+    path = tmp_path / "out.json"
+    write_plays_json(path, [fragment({"old": True})])
+    before = path.read_text(encoding="utf-8")
+
+    with pytest.raises(RuntimeError):
+        with PlaysJsonWriter(path) as out:
+            out.add(fragment({"new": True}))
+            assert path.read_text(encoding="utf-8") == before
+            raise RuntimeError("bad XML")
+
+    assert path.read_text(encoding="utf-8") == before
+    assert [p.name for p in tmp_path.iterdir()] == ["out.json"]
@@ -0,0 +1,30 @@
+"""
+layout_frames anchors: the start circle is in the order computePositions in
+App.jsx gives, localeCompare(..., "nb").
+"""
+
+import random
+
+from layout_frames import _anchors, collation_key
+
+# sorted with [...].sort((a, b) => a.localeCompare(b, "nb")) in Node 18+
+NB_ORDER = [
+    "A B", "AB", "Elan", "Élan", "emile", "Emile", "Émile", "Fru Linde", "Fru-Linde",
+    "Frue", "hans", "Hans", "Hansen", "ola", "Ola", "zed", "Zed", "ZED",
+    "Ærlig", "Ärlig", "Ølse", "Ölse", "Östen", "Øyvind", "Åse", "Aase",
+]
+
+
+def test_collation_matches_locale_compare():
+    names = list(NB_ORDER)
+    random.Random(3).shuffle(names)
+    assert sorted(names, key=collation_key) == NB_ORDER
+
+
+def test_anchors_follow_collation():
+    names = ["Åse", "NORA", "Ærlig", "helmer"]
+    anchors = _anchors(names)
+    # the first name in collation order sits at the top of the circle
+    top = min(range(len(names)), key=lambda i: anchors[i][1])
+    assert names[top] == "helmer"
+    assert len(set(anchors)) == len(names)
@@ -0,0 +1,121 @@
+"""
+scene_kernels against naive reference loops (the greedy scan the kernels
+replaced in ibsen_networks_acts.py).
+"""
+
+import random
+from itertools import product
+
+import pytest
+
+from scene_kernels import pair_runs, prefix_sums, transition_counts
+
+
+def naive_pair_runs(speakers, min_len=4):
+    runs = []
+    n = len(speakers)
+    i = 0
+    while i < n - 1:
+        a, b = speakers[i], speakers[i + 1]
+        if a == b:
+            i += 1
+            continue
+        j = i + 2
+        while j < n:
+            s = speakers[j]
+            if s != a and s != b:
+                break
+            if s == speakers[j - 1]:
+                break
+            j += 1
+        if j - i >= min_len:
+            runs.append((i, j - 1))
+        i = max(i + 1, j - 1)
+    return runs
+
+
+def naive_transition_counts(speakers, lengths):
+    counts = {}
+    for k in range(len(speakers) - 1):
+        a, b = speakers[k], speakers[k + 1]
+        if a == b:
+            continue
+        acc = counts.setdefault((a, b), [0, 0, 0])
+        acc[0] += 1
+        acc[1] += lengths[k]
+        acc[2] += lengths[k + 1]
+    return counts
+
+
+CASES = {
+    "empty": [],
+    "single speech": [1],
+    "single speaker": [1, 1, 1, 1, 1, 1],
+    "even run": [1, 2, 1, 2],
+    "odd run": [1, 2, 1, 2, 1],
+    "odd run, then other": [1, 2, 1, 2, 1, 3],
+    # the last speech of one run starts the next one
+    "overlapping pairs": [1, 2, 1, 2, 3, 2, 3, 2, 3],
+    "three alternate": [1, 2, 3, 1, 2, 3, 1, 2, 3],
+    "run broken by repeat": [1, 2, 1, 1, 2, 1, 2, 1],
+    "repeat inside": [1, 2, 2, 1, 2, 1, 2],
+}
+
+
+@pytest.mark.parametrize("min_len", range(1, 7))
+@pytest.mark.parametrize("name", list(CASES))
+def test_pair_runs_cases(name, min_len):
+    speakers = CASES[name]
+    assert pair_runs(speakers, min_len) == naive_pair_runs(speakers, min_len)
+
+
+def test_pair_runs_examples():
+    assert pair_runs([1, 2, 1, 2, 1], 4) == [(0, 4)]
+    assert pair_runs([1, 2, 1, 2, 3, 2, 3, 2, 3], 4) == [(0, 3), (3, 8)]
+    assert pair_runs([1, 1, 1, 1], 2) == []
+    assert pair_runs([], 4) == []
+
+
+@pytest.mark.parametrize("min_len", range(1, 7))
+def test_pair_runs_exhaustive(min_len):
+    # every sequence of up to 8 speeches over 3 speakers
+    for n in range(9):
+        for speakers in product(range(3), repeat=n):
+            assert pair_runs(speakers, min_len) == naive_pair_runs(speakers, min_len), speakers
+
+
+def test_pair_runs_random_names():
+    rng = random.Random(7)
+    for _ in range(2000):
+        cast = rng.sample(["NORA", "HELMER", "RANK", "KROGSTAD", "FRU LINDE"], rng.randint(1, 5))
+        speakers = [rng.choice(cast) for _ in range(rng.randint(0, 60))]
+        min_len = rng.randint(1, 8)
+        assert pair_runs(speakers, min_len) == naive_pair_runs(speakers, min_len)
+
+
+@pytest.mark.parametrize("name", list(CASES))
+def test_transition_counts_cases(name):
+    speakers = CASES[name]
+    lengths = [3 * k + 1 for k in range(len(speakers))]
+    counts = transition_counts(speakers, lengths)
+    expected = naive_transition_counts(speakers, lengths)
+    assert counts == expected
+    assert list(counts) == list(expected)  # order of first occurrence
+
+
+def test_transition_counts_random():
+    rng = random.Random(11)
+    for _ in range(500):
+        speakers = [rng.randrange(4) for _ in range(rng.randint(0, 40))]
+        lengths = [rng.randint(0, 50) for _ in speakers]
+        counts = transition_counts(speakers, lengths)
+        expected = naive_transition_counts(speakers, lengths)
+        assert counts == expected and list(counts) == list(expected)
+
+
+def test_prefix_sums_give_run_totals():
+    values = [4, 0, 7, 2, 9]
+    prefix = prefix_sums(values)
+    for start in range(len(values)):
+        for end in range(start, len(values)):
+            assert prefix[end + 1] - prefix[start] == sum(values[start:end + 1])
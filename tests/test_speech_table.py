@@ -0,0 +1,74 @@
+"""
+ibsen_speeches.bin round trip: SpeechTable gives back parse_play's output,
+and damaged files are rejected with a ValueError.
+"""
+
+import pytest
+
+import speech_table
+from ibsen_networks_acts import count_words, normalize_name
+from speech_table import NO_SPEAKER, SpeechTable, write_speech_table
+
+
+@pytest.fixture
+def table_path(tmp_path, parsed_plays):
+    path = tmp_path / "ibsen_speeches.bin"
+    write_speech_table(path, parsed_plays)
+    return path
+
+
+def test_round_trip_matches_parsed(table_path, parsed_plays):
+    with SpeechTable(table_path) as table:
+        assert table.n_plays == len(parsed_plays)
+        assert table.to_nested() == parsed_plays
+
+
+def test_rows(table_path, parsed_plays):
+    speeches = [
+        sp
+        for play in parsed_plays
+        for act in play["acts"]
+        for scene in act["scenes"]
+        for sp in scene["speeches"]
+    ]
+    with SpeechTable(table_path) as table:
+        assert len(table) == len(speeches)
+        s = table.strings
+        for row, sp in enumerate(speeches):
+            assert s[table["speaker"][row]] == sp["speaker"]
+            assert table.text(row) == sp["text"]
+            assert table["words"][row] == sp["length"] == count_words(sp["text"])
+            norm = table["speaker_norm"][row]
+            assert (s[norm] if norm != NO_SPEAKER else "") == normalize_name(sp["speaker"])
+        for p, play in enumerate(parsed_plays):
+            assert table.play_index(play["title"]) == p
+
+
+def test_empty_table(tmp_path):
+    path = tmp_path / "empty.bin"
+    write_speech_table(path, [])
+    with SpeechTable(path) as table:
+        assert len(table) == 0 and table.to_nested() == []
+
+
+@pytest.mark.parametrize("keep", [0, 10, 100, -1])
+def test_truncated_columns(table_path, keep):
+    data = table_path.read_bytes()
+    table_path.write_bytes(data[:keep] if keep >= 0 else data[:keep])
+    with pytest.raises(ValueError, match="Truncated"):
+        SpeechTable(table_path)
+
+
+def test_truncated_text(table_path):
+    text = speech_table.text_path(table_path)
+    text.write_bytes(text.read_bytes()[:-1])
+    with pytest.raises(ValueError, match="Truncated"):
+        SpeechTable(table_path)
+
+
+def test_wrong_version(table_path):
+    data = bytearray(table_path.read_bytes())
+    data[4:8] = (speech_table.VERSION + 1).to_bytes(4, "little")
+    table_path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match=f"IBST v{speech_table.VERSION}"):
+        SpeechTable(table_path)
@@ -0,0 +1,50 @@
+"""
+Parity of the TEI parser backends in data/scripts/parse_tei.py: streaming
+etree, whole-tree etree and lxml (tei_lxml.py) must give the same
+parse_play output.
+"""
+
+import pytest
+
+import parse_tei
+
+RAW_FILES = sorted(parse_tei.RAW_DIR.glob("*.xml"))
+
+
+def _variants():
+    yield "etree-tree", {"stream": False}
+    yield "lxml", {"backend": "lxml"}
+
+
+@pytest.mark.parametrize("label,kwargs", list(_variants()))
+def test_samples_match_streaming_etree(sample_files, label, kwargs):
+    if label == "lxml":
+        pytest.importorskip("lxml")
+    for xml in sample_files:
+        assert parse_tei.parse_play(xml, **kwargs) == parse_tei.parse_play(xml), xml.name
+
+
+def test_samples_are_parsed(sample_files):
+    plays = {xml.stem: parse_tei.parse_play(xml) for xml in sample_files}
+    first = plays["Namespaced_1900"]["acts"][0]["scenes"][0]["speeches"]
+    assert [sp["speaker"] for sp in first] == ["NORA", "HELMER", "Fru Linde", "NORA", "HELMER"]
+    assert first[0]["text"] == "Skjul juletræet godt, Helene. Ja."
+    assert first[1]["text"] == "Er det lærkefuglen?"
+    assert first[2]["text"] == "God dag , Nora."
+    speeches = plays["Unnamespaced_1900"]["acts"][0]["scenes"][0]["speeches"]
+    assert [(sp["speaker"], sp["text"]) for sp in speeches] == [("A", "Første replikk."), ("B", "Svar her.")]
+    speeches = plays["Mixed_1900"]["acts"][0]["scenes"][0]["speeches"]
+    assert [sp["text"] for sp in speeches] == ["Uten akter.", "Annet navnerom."]
+
+
+@pytest.mark.skipif(not RAW_FILES, reason="no TEI files in data/raw/plays")
+@pytest.mark.parametrize("label,kwargs", list(_variants()))
+def test_corpus_matches_streaming_etree(label, kwargs):
+    if label == "lxml":
+        pytest.importorskip("lxml")
+    for xml in RAW_FILES:
+        assert parse_tei.parse_play(xml, **kwargs) == parse_tei.parse_play(xml), xml.name
+
+
+def test_check_backends(sample_files):
+    assert parse_tei.check_backends(sample_files)